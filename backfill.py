@@ -0,0 +1,296 @@
+"""
+Rebuild the snapshot history from archived copies of the lifecycle page.
+
+    python backfill.py ARCHIVE [--workers N] [--export csv ndjson ...]
+    python scraper.py --backfill ARCHIVE
+
+ARCHIVE is a directory, searched recursively, or a tarball of saved HTML
+pages; a tarball is unpacked to a scratch directory first. A page's capture
+time comes from a timestamp in its path, or from its modification time if
+there is none. Recognized timestamps:
+
+- 20240131120000, as in Wayback Machine URLs
+- 20240131_120000
+- 2024-01-31T12:00:00
+- 2024-01-31
+- 20240131
+
+Pages are extracted on a process pool with extract_deprecated_models(), the
+same extraction the live scraper uses, and their dates are normalized as at
+ingest. The parent only reads results and writes them, so throughput grows
+with the number of worker processes. Results come back in capture order
+through a bounded window of in-flight pages, so memory stays flat however
+large the archive is. They are streamed into the history database as one
+capture per page; identical tables share storage. Pages without a
+recognizable table are skipped rather than recorded as empty snapshots.
+
+Progress is printed every few seconds. A checkpoint file records the last
+page done, in capture order, and rerunning the same command resumes after
+it. History writes are idempotent per page, so pages redone after an
+interruption are not recorded twice.
+
+With --export, the history over the archive's time span is then streamed
+into export files (see exporters.py).
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tarfile
+import tempfile
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from exporters import EXPORT_FIELDS, WRITERS, export_records
+from history_store import HistoryStore
+from model_dates import normalize_records
+
+HTML_SUFFIXES = ('.html', '.htm')
+
+# (pattern, strptime format of the concatenated groups), most specific first
+TIMESTAMP_PATTERNS = (
+    (re.compile(r'(?<!\d)(\d{8})[_-]?(\d{6})(?!\d)'), '%Y%m%d%H%M%S'),
+    (re.compile(r'(?<!\d)(\d{4}-\d{2}-\d{2})[T_ ](\d{2})[:-]?(\d{2})[:-]?(\d{2})(?!\d)'), '%Y-%m-%d%H%M%S'),
+    (re.compile(r'(?<!\d)(\d{4}-\d{2}-\d{2})(?!\d)'), '%Y-%m-%d'),
+    (re.compile(r'(?<!\d)(\d{8})(?!\d)'), '%Y%m%d')
+)
+
+# Pages extracted ahead of the one being written, per worker process
+WINDOW_PER_WORKER = 4
+CHECKPOINT_EVERY_PAGES = 100
+CHECKPOINT_EVERY_SECONDS = 10.0
+PROGRESS_INTERVAL = 5.0
+
+Page = namedtuple('Page', 'captured_at name path')
+
+
+def capture_time(name, mtime=None):
+    """Capture time from a timestamp in ``name``, else from ``mtime``"""
+    for pattern, fmt in TIMESTAMP_PATTERNS:
+        for match in pattern.finditer(name):
+            try:
+                return datetime.strptime(''.join(match.groups()), fmt)
+            except ValueError:
+                continue
+    return datetime.fromtimestamp(mtime) if mtime is not None else None
+
+
+def list_pages(directory):
+    """Every saved HTML page below ``directory``, in capture order"""
+    pages = []
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if filename.lower().endswith(HTML_SUFFIXES):
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, directory)
+                pages.append(Page(capture_time(name, os.path.getmtime(path)), name, path))
+    pages.sort(key=lambda page: (page.captured_at, page.name))
+    return pages
+
+
+def unpack(archive, scratch):
+    """Extract the HTML members of a tarball into ``scratch``"""
+    with tarfile.open(archive) as tar:
+        members = [member for member in tar if member.isfile() and member.name.lower().endswith(HTML_SUFFIXES)]
+        tar.extractall(scratch, members=members, filter='data')
+    return len(members)
+
+
+def _quiet_worker():
+    # The extractor reports fallbacks on stdout; thousands of pages would bury the progress lines
+    sys.stdout = open(os.devnull, 'w')
+
+
+def extract_page(path):
+    """Worker: extract and normalize one saved page. Returns ``(records, error)``"""
+    from scraper import extract_deprecated_models
+
+    try:
+        with open(path, 'rb') as f:
+            html = f.read().decode('utf-8', 'replace')
+        return normalize_records(extract_deprecated_models(html)), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def extract_pages(pages, workers):
+    """
+    Yield ``(page, records, error)`` in the order of ``pages``, keeping up to
+    WINDOW_PER_WORKER pages per worker in flight.
+    """
+    pages = iter(pages)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_quiet_worker) as pool:
+        in_flight = deque((page, pool.submit(extract_page, page.path))
+                          for page in islice(pages, workers * WINDOW_PER_WORKER))
+        while in_flight:
+            page, future = in_flight.popleft()
+            following = next(pages, None)
+            if following is not None:
+                in_flight.append((following, pool.submit(extract_page, following.path)))
+            records, error = future.result()
+            yield page, records, error
+
+
+class Checkpoint:
+    """Resume position for one archive, saved atomically as JSON"""
+
+    def __init__(self, path, archive):
+        self.path = path
+        self.archive = os.path.abspath(archive)
+        self._saved_at = time.monotonic()
+        self._unsaved = 0
+
+    def load(self):
+        """``(captured_at, name)`` of the last page done, or None to start over"""
+        if not self.path or not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('archive') != self.archive or not state.get('last_page'):
+            print(f"Checkpoint {self.path} is for another archive; starting over")
+            return None
+        return datetime.fromisoformat(state['last_captured_at']), state['last_page']
+
+    def advance(self, page, stats):
+        self._unsaved += 1
+        if (self._unsaved >= CHECKPOINT_EVERY_PAGES
+                or time.monotonic() - self._saved_at >= CHECKPOINT_EVERY_SECONDS):
+            self.save(page, stats)
+
+    def save(self, page, stats, complete=False):
+        if not self.path or page is None:
+            return
+        state = {
+            'archive': self.archive,
+            'last_page': page.name,
+            'last_captured_at': page.captured_at.isoformat(),
+            'complete': complete,
+            'stats': stats,
+            'saved_at': datetime.now().isoformat(timespec='seconds')
+        }
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(temporary, self.path)
+        self._saved_at = time.monotonic()
+        self._unsaved = 0
+
+
+class Progress:
+    """Prints a progress line every PROGRESS_INTERVAL seconds"""
+
+    def __init__(self, total, already_done=0):
+        self.total = total
+        self.done = already_done
+        self.stats = {'pages': 0, 'records': 0, 'skipped': 0, 'errors': 0}
+        self._started = time.monotonic()
+        self._printed = self._started
+
+    def update(self, records, error):
+        self.done += 1
+        self.stats['pages'] += 1
+        if error is not None:
+            self.stats['errors'] += 1
+        elif not records:
+            self.stats['skipped'] += 1
+        else:
+            self.stats['records'] += len(records)
+        if time.monotonic() - self._printed >= PROGRESS_INTERVAL:
+            self.report()
+
+    @property
+    def rate(self):
+        elapsed = time.monotonic() - self._started
+        return self.stats['pages'] / elapsed if elapsed else 0.0
+
+    def report(self):
+        self._printed = time.monotonic()
+        remaining = self.total - self.done
+        eta = f", ETA {remaining / self.rate:.0f} s" if self.rate and remaining else ""
+        print(f"{self.done}/{self.total} pages ({self.rate:.1f}/s{eta}); "
+              f"{self.stats['records']} records, {self.stats['skipped']} without a table, "
+              f"{self.stats['errors']} errors", flush=True)
+
+
+def backfill(archive, history, workers=None, checkpoint_path=None):
+    """
+    Record every page of ``archive`` in ``history`` (a HistoryStore) in
+    capture order, resuming after ``checkpoint_path`` if it exists.
+    Returns a summary dict.
+    """
+    workers = workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory(prefix='wxnotif-backfill-') as scratch:
+        if os.path.isdir(archive):
+            directory = archive
+        else:
+            print(f"Unpacking {archive}...")
+            unpack(archive, scratch)
+            directory = scratch
+        pages = list_pages(directory)
+
+        checkpoint = Checkpoint(checkpoint_path, archive)
+        resume_after = checkpoint.load()
+        todo = [page for page in pages if resume_after is None or (page.captured_at, page.name) > resume_after]
+        if resume_after is not None:
+            print(f"Resuming after {resume_after[1]} ({len(pages) - len(todo)} of {len(pages)} pages already done)")
+        print(f"Extracting {len(todo)} pages with {workers} worker processes")
+
+        progress = Progress(len(pages), len(pages) - len(todo))
+        recorded = 0
+        last = None
+        for page, records, error in extract_pages(todo, workers):
+            progress.update(records, error)
+            if error is not None:
+                print(f"Failed to extract {page.name}: {error}")
+            elif records:
+                origin = f"backfill:{page.name}"
+                if not history.has_capture(page.captured_at, origin):
+                    history.record(records, page.captured_at, origin=origin)
+                    recorded += 1
+            last = page
+            checkpoint.advance(page, progress.stats)
+        checkpoint.save(last, progress.stats, complete=True)
+        progress.report()
+
+    return dict(progress.stats, recorded=recorded, total_pages=len(pages),
+                first=pages[0].captured_at if pages else None, last=pages[-1].captured_at if pages else None)
+
+
+def default_checkpoint_path(archive):
+    return os.path.basename(os.path.normpath(archive)) + '.backfill-checkpoint.json'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the history from archived lifecycle pages')
+    parser.add_argument('archive', help='directory or tarball of saved HTML pages')
+    parser.add_argument('--history-db', default=os.environ.get('HISTORY_DB', 'wxnotif_history.db'))
+    parser.add_argument('--workers', type=int, default=None, help='extraction processes (default: CPU count)')
+    parser.add_argument('--checkpoint', default=None,
+                        help='resume file (default: <archive name>.backfill-checkpoint.json)')
+    parser.add_argument('--export', nargs='+', choices=sorted(WRITERS), metavar='FORMAT',
+                        help="also export the history over the archive's time span in these formats")
+    parser.add_argument('--output', default=None, help='export base path (default: ibm_deprecated_models_backfill_<timestamp>)')
+    args = parser.parse_args()
+
+    history = HistoryStore(args.history_db)
+    started = time.perf_counter()
+    summary = backfill(args.archive, history, args.workers, args.checkpoint or default_checkpoint_path(args.archive))
+    print(f"Backfill finished in {time.perf_counter() - started:.1f} s: {summary['recorded']} captures recorded "
+          f"in {args.history_db}")
+
+    if args.export and summary['first'] is not None:
+        base_path = args.output or f"ibm_deprecated_models_backfill_{datetime.now():%Y%m%d_%H%M%S}"
+        records = history.iter_records(summary['first'], summary['last'])
+        for name, result in export_records(records, args.export, base_path, ('captured_at',) + EXPORT_FIELDS).items():
+            if 'error' in result:
+                print(f"{name}: {result['error']}")
+            else:
+                print(f"{name}: {result['rows']} rows written to {result['path']}")
+
+
+if __name__ == '__main__':
+    main()
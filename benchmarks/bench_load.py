@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Load test for gunicorn worker configurations, for sizing WEB_CONCURRENCY.
+
+For every worker class and worker count, starts ``gunicorn wsgi:app`` with
+the repo's gunicorn.conf.py against benchmarks/upstream_stub.py, loads a
+snapshot with POST /api/update and then drives /feed.xml, /api/data,
+/api/status and / from simulated pollers for a fixed time. Each poller
+picks routes by weight (--mix) and, for --conditional-share of its requests,
+revalidates with the ETag / Last-Modified it last saw, as feed readers do.
+Every request accepts gzip. Pollers open a connection per request, like
+independent clients, unless --keep-alive is given.
+
+Reported per configuration:
+
+- requests per second, p50/p95/p99 latency, the 304 share and errors,
+  overall and per route
+- memory per process after the run: RSS and PSS from /proc (Linux only).
+  PSS splits pages shared copy-on-write with the master between the
+  processes sharing them, so the PSS total is the real footprint.
+
+    python benchmarks/bench_load.py [--worker-classes sync gthread gevent] [--workers 1 2 4]
+        [--concurrency 16] [--duration 10] [--conditional-share 0.7]
+        [--mix /feed.xml=60 /api/data=20 /api/status=10 /=10] [--client-processes 1] [--json]
+
+The load generator shares the machine with the server. On a multi-core box
+use --client-processes so the client is not the bottleneck, and compare
+configurations within one run rather than across machines.
+"""
+import argparse
+import contextlib
+import http.client
+import importlib.util
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from bench_startup import free_port, server_env, wait_for  # noqa: E402
+from harness import report_metadata, summarize  # noqa: E402
+from upstream_stub import UpstreamStub  # noqa: E402
+
+WORKER_CLASSES = ('sync', 'gthread', 'gevent')
+# Worker classes that need an extra package
+WORKER_MODULES = {'gevent': 'gevent', 'eventlet': 'eventlet', 'tornado': 'tornado'}
+
+# (route, weight): mostly feed polling, some API clients and dashboard views
+DEFAULT_MIX = (('/feed.xml', 60), ('/api/data', 20), ('/api/status', 10), ('/', 10))
+
+# Requests before the measured window, so every worker has synced the snapshot
+WARMUP_SECONDS = 2.0
+REQUEST_TIMEOUT = 30
+
+
+def parse_mix(items):
+    """``['/feed.xml=60', ...]`` -> ``(('/feed.xml', 60.0), ...)``"""
+    mix = []
+    for item in items:
+        route, _, weight = item.partition('=')
+        if not route.startswith('/'):
+            raise argparse.ArgumentTypeError(f"route must start with '/': {item}")
+        mix.append((route, float(weight) if weight else 1.0))
+    return tuple(mix)
+
+
+def drive(base, mix, concurrency, duration, conditional_share=0.7, keep_alive=False, warmup=WARMUP_SECONDS, seed=0):
+    """
+    Poll ``base`` from ``concurrency`` threads for ``warmup + duration``
+    seconds. Returns ``{route: (latencies, status counts)}`` for requests
+    started in the measured window; failed connections count as 'error'.
+    """
+    parts = urlsplit(base)
+    routes = [route for route, _ in mix]
+    weights = [weight for _, weight in mix]
+    measure_from = time.perf_counter() + warmup
+    stop_at = measure_from + duration
+    results = defaultdict(lambda: ([], Counter()))
+    lock = threading.Lock()
+
+    def poll(poller):
+        rng = random.Random(seed * 100003 + poller)
+        validators = {}
+        latencies = defaultdict(list)
+        statuses = defaultdict(Counter)
+        connection = None
+        while time.perf_counter() < stop_at:
+            route = rng.choices(routes, weights)[0]
+            headers = {'Accept-Encoding': 'gzip'}
+            if route in validators and rng.random() < conditional_share:
+                headers.update(validators[route])
+            started = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=REQUEST_TIMEOUT)
+                connection.request('GET', route, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                elapsed = time.perf_counter() - started
+                status = response.status
+                if status == 200:
+                    validators[route] = {
+                        header: response.getheader(source)
+                        for header, source in (('If-None-Match', 'ETag'), ('If-Modified-Since', 'Last-Modified'))
+                        if response.getheader(source)
+                    }
+                if not keep_alive or response.will_close:
+                    connection.close()
+                    connection = None
+            except (OSError, http.client.HTTPException):
+                if connection is not None:
+                    connection.close()
+                    connection = None
+                elapsed, status = None, 'error'
+            if started >= measure_from:
+                statuses[route][status] += 1
+                if elapsed is not None:
+                    latencies[route].append(elapsed)
+        if connection is not None:
+            connection.close()
+        with lock:
+            for route in statuses:
+                results[route][0].extend(latencies[route])
+                results[route][1].update(statuses[route])
+
+    threads = [threading.Thread(target=poll, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return dict(results)
+
+
+def generate_load(base, mix, concurrency, duration, conditional_share=0.7, keep_alive=False, client_processes=1):
+    """Run drive() in one or more client processes and summarize the merged results"""
+    if client_processes <= 1:
+        parts = [drive(base, mix, concurrency, duration, conditional_share, keep_alive)]
+    else:
+        shares = [concurrency // client_processes + (i < concurrency % client_processes)
+                  for i in range(client_processes)]
+        with ProcessPoolExecutor(max_workers=client_processes) as pool:
+            futures = [pool.submit(drive, base, mix, share, duration, conditional_share, keep_alive, seed=i)
+                       for i, share in enumerate(shares) if share]
+            parts = [future.result() for future in futures]
+
+    merged = defaultdict(lambda: ([], Counter()))
+    for part in parts:
+        for route, (latencies, statuses) in part.items():
+            merged[route][0].extend(latencies)
+            merged[route][1].update(statuses)
+
+    def stats(latencies, statuses):
+        total = sum(statuses.values())
+        errors = sum(count for status, count in statuses.items() if status == 'error' or status >= 500)
+        return summarize(latencies, duration, {
+            'requests': total,
+            'not_modified_share': round(statuses[304] / total, 3) if total else None,
+            'errors': errors,
+            'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)}
+        })
+
+    everything = ([], Counter())
+    for latencies, statuses in merged.values():
+        everything[0].extend(latencies)
+        everything[1].update(statuses)
+    result = stats(*everything)
+    result['routes'] = {route: stats(*merged[route]) for route, _ in mix if route in merged}
+    return result
+
+
+def child_pids(parent):
+    """Pids whose parent is ``parent`` (Linux /proc)"""
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Fields after the parenthesised command name: state, ppid, ...
+        if int(stat.rsplit(')', 1)[1].split()[1]) == parent:
+            pids.append(int(entry))
+    return sorted(pids)
+
+
+def process_memory(pid):
+    """``{'rss_kib', 'pss_kib'}`` of one process, or None where /proc has no smaps_rollup"""
+    values = {}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in ('Rss', 'Pss'):
+                    values[key.lower() + '_kib'] = int(rest.split()[0])
+    except OSError:
+        return None
+    return values or None
+
+
+def gunicorn_memory(master):
+    """Memory of the gunicorn master and each of its workers"""
+    if not os.path.isdir('/proc'):
+        return {'skipped': 'needs /proc'}
+    workers = [memory for memory in map(process_memory, child_pids(master)) if memory]
+    master_memory = process_memory(master)
+    if not workers or master_memory is None:
+        return {'skipped': 'no smaps_rollup'}
+    return {
+        'master': master_memory,
+        'workers': workers,
+        'worker_rss_mean_kib': round(sum(w['rss_kib'] for w in workers) / len(workers)),
+        'worker_pss_mean_kib': round(sum(w['pss_kib'] for w in workers) / len(workers)),
+        'total_pss_kib': master_memory['pss_kib'] + sum(w['pss_kib'] for w in workers)
+    }
+
+
+@contextlib.contextmanager
+def gunicorn_server(workdir, stub_url, worker_class, workers, threads=None):
+    """Start gunicorn with a loaded snapshot; yields ``(base url, master pid)``"""
+    port = free_port()
+    env = dict(server_env(workdir, stub_url), GUNICORN_WORKER_CLASS=worker_class)
+    if threads:
+        env['GUNICORN_THREADS'] = str(threads)
+    process = subprocess.Popen(
+        ['gunicorn', '--chdir', REPO_DIR, '--config', os.path.join(REPO_DIR, 'gunicorn.conf.py'),
+         '--workers', str(workers), '--bind', f"127.0.0.1:{port}", 'wsgi:app'],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f"http://127.0.0.1:{port}"
+        wait_for(base + '/')
+        try:
+            urllib.request.urlopen(urllib.request.Request(base + '/api/update', method='POST'), timeout=30).close()
+        except urllib.error.HTTPError:
+            pass
+        wait_for(base + '/feed.xml')
+        yield base, process.pid
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run(worker_classes=WORKER_CLASSES, workers=(1, 2, 4), concurrency=16, duration=10.0, conditional_share=0.7,
+        mix=DEFAULT_MIX, keep_alive=False, client_processes=1, threads=None):
+    """Load every configuration in turn; returns ``{'<class>x<workers>': result}``"""
+    if shutil.which('gunicorn') is None:
+        return {'gunicorn': {'skipped': 'gunicorn not installed'}}
+
+    results = {}
+    with UpstreamStub() as stub:
+        for worker_class in worker_classes:
+            module = WORKER_MODULES.get(worker_class)
+            missing = module if module and importlib.util.find_spec(module) is None else None
+            for count in workers:
+                name = f"{worker_class}x{count}"
+                if missing:
+                    results[name] = {'skipped': f"{missing} not installed"}
+                    continue
+                with tempfile.TemporaryDirectory() as workdir, \
+                        gunicorn_server(workdir, stub.url, worker_class, count, threads) as (base, master):
+                    result = generate_load(base, mix, concurrency, duration, conditional_share, keep_alive,
+                                           client_processes)
+                    result['memory'] = gunicorn_memory(master)
+                results[name] = dict(result, worker_class=worker_class, workers=count, concurrency=concurrency)
+    return results
+
+
+def _ms(value):
+    return f"{value:8.1f}" if value is not None else f"{'-':>8}"
+
+
+def _mib(kib):
+    return f"{kib / 1024:9.1f}" if kib is not None else f"{'-':>9}"
+
+
+def print_report(results, per_route=True):
+    print(f"{'config':<14}{'req/s':>9}{'p50 ms':>8}{'p95 ms':>8}{'p99 ms':>8}{'304':>6}{'errors':>8}"
+          f"{'RSS/wkr':>10}{'PSS/wkr':>10}{'PSS all':>10}  (MiB)")
+    for name, result in results.items():
+        if 'skipped' in result:
+            print(f"{name:<14} skipped: {result['skipped']}")
+            continue
+        memory = result['memory']
+        share = result['not_modified_share']
+        print(f"{name:<14}{result['throughput_per_s']:9.1f}{_ms(result['p50_ms'])}{_ms(result['p95_ms'])}"
+              f"{_ms(result['p99_ms'])}{(f'{share:.0%}' if share is not None else '-'):>6}{result['errors']:8d}"
+              f"{_mib(memory.get('worker_rss_mean_kib'))}{_mib(memory.get('worker_pss_mean_kib'))}"
+              f"{_mib(memory.get('total_pss_kib'))}")
+        if per_route:
+            for route, stats in result['routes'].items():
+                share = stats['not_modified_share']
+                print(f"  {route:<12}{stats['throughput_per_s']:9.1f}{_ms(stats['p50_ms'])}{_ms(stats['p95_ms'])}"
+                      f"{_ms(stats['p99_ms'])}{(f'{share:.0%}' if share is not None else '-'):>6}"
+                      f"{stats['errors']:8d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--worker-classes', nargs='+', default=list(WORKER_CLASSES))
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 2, 4], help='worker counts to try')
+    parser.add_argument('--threads', type=int, default=None, help='threads per gthread worker (default: config)')
+    parser.add_argument('--concurrency', type=int, default=16, help='simultaneous pollers')
+    parser.add_argument('--duration', type=float, default=10.0, help='measured seconds per configuration')
+    parser.add_argument('--conditional-share', type=float, default=0.7,
+                        help='fraction of repeat requests that revalidate with ETag / Last-Modified')
+    parser.add_argument('--mix', nargs='+', type=lambda item: parse_mix([item])[0], default=list(DEFAULT_MIX),
+                        metavar='ROUTE=WEIGHT', help='routes and their relative weights')
+    parser.add_argument('--keep-alive', action='store_true', help='reuse connections where the worker allows it')
+    parser.add_argument('--client-processes', type=int, default=1, help='load generator processes')
+    parser.add_argument('--json', action='store_true', help='print a machine-readable JSON report')
+    args = parser.parse_args()
+
+    results = run(args.worker_classes, args.workers, args.concurrency, args.duration, args.conditional_share,
+                  tuple(args.mix), args.keep_alive, args.client_processes, args.threads)
+    if args.json:
+        print(json.dumps({'meta': report_metadata(), 'results': results}, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Notification fan-out benchmark and acceptance check.
+
+Registers N subscribers (webhooks plus a share of email addresses) against
+local stand-ins: a threaded HTTP receiver and a minimal SMTP sink. One
+webhook endpoint answers only after --slow seconds. The run queues one diff
+for everyone and measures how long it takes to reach every subscriber except
+the slow one.
+
+It fails (exit status 1) unless all of these hold:
+
+- every fast subscriber is notified within --budget seconds
+- they are all reached before the slow endpoint answers, i.e. the slow
+  endpoint held nobody up
+- the slow endpoint's delivery completes too
+
+    python benchmarks/bench_notify.py [--subscribers 1000] [--email-share 0.2] [--slow 5] [--budget 10]
+"""
+import argparse
+import json
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_render import synthetic_models  # noqa: E402
+
+
+class ReceiverServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Listen backlog; deliveries arrive in bursts of the notifier's pool size
+    request_queue_size = 1024
+
+
+class WebhookReceiver:
+    """Threaded HTTP server recording when each path was first POSTed to"""
+
+    def __init__(self, slow_path='/slow', slow_latency=5.0, host='127.0.0.1', port=0):
+        self.slow_path = slow_path
+        self.slow_latency = slow_latency
+        self.received = {}
+        self._lock = threading.Lock()
+        self._server = ReceiverServer((host, port), self._handler())
+
+    def url_for(self, path):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, name='webhook-receiver', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.path == receiver.slow_path:
+                    time.sleep(receiver.slow_latency)
+                with receiver._lock:
+                    receiver.received.setdefault(self.path, (time.perf_counter(), len(json.loads(body)['events'])))
+                self.send_response(204)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class SmtpSink:
+    """Just enough SMTP to accept messages; records when each recipient got one"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.received = {}
+        self.messages = 0
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, name='smtp-sink', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode('ascii') + b'\r\n')
+
+            def handle(self):
+                self.reply('220 localhost SMTP sink')
+                recipients = []
+                for raw in self.rfile:
+                    command = raw.decode('utf-8', 'replace').strip()
+                    verb = command[:4].upper()
+                    if verb in ('HELO', 'EHLO', 'NOOP'):
+                        self.reply('250 OK')
+                    elif verb in ('MAIL', 'RSET'):
+                        recipients = []
+                        self.reply('250 OK')
+                    elif verb == 'RCPT':
+                        recipients.append(command.split(':', 1)[1].strip().strip('<>'))
+                        self.reply('250 OK')
+                    elif verb == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        for line in self.rfile:
+                            if line == b'.\r\n':
+                                break
+                        now = time.perf_counter()
+                        with sink._lock:
+                            sink.messages += 1
+                            for address in recipients:
+                                sink.received.setdefault(address, now)
+                        self.reply('250 OK')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('502 Command not implemented')
+
+        return Handler
+
+
+def sample_events(count=5):
+    """Change events as the server produces them for a diff"""
+    from changes import diff_events
+
+    models = synthetic_models(count * 2)
+    changed = [{'model': model, 'fields': {'withdrawal_date': ['1 March 2025', model['withdrawal_date']]}}
+               for model in models[count:]]
+    return diff_events({'added': models[:count], 'changed': changed, 'removed': []})
+
+
+def run(subscribers=1000, email_share=0.2, slow=5.0, budget=10.0, workers=32):
+    from notifications import NotificationStore, Notifier
+
+    receiver = WebhookReceiver(slow_latency=slow).start()
+    sink = SmtpSink().start()
+    workdir = tempfile.mkdtemp(prefix='wxnotif-notify-')
+    try:
+        store = NotificationStore(os.path.join(workdir, 'notify.db'))
+        emails = int(subscribers * email_share)
+        store.add_subscriber('webhook', receiver.url_for(receiver.slow_path))
+        webhooks = [f'/hook/{i}' for i in range(subscribers - emails - 1)]
+        for path in webhooks:
+            store.add_subscriber('webhook', receiver.url_for(path), secret='s3cret')
+        addresses = [f'user{i}@example.com' for i in range(emails)]
+        for address in addresses:
+            store.add_subscriber('email', address)
+
+        notifier = Notifier(store, max_workers=workers, timeout=slow * 2, smtp_host='127.0.0.1',
+                            smtp_port=sink.port, poll_interval=0.05)
+        events = sample_events()
+        started = time.perf_counter()
+        notifier.publish(events)
+
+        fast_expected = len(webhooks) + len(addresses)
+        deadline = started + max(budget, slow) * 2
+        while time.perf_counter() < deadline:
+            if len(receiver.received) - (receiver.slow_path in receiver.received) + len(sink.received) >= fast_expected:
+                break
+            time.sleep(0.005)
+        fast_times = [receiver.received[path][0] for path in webhooks if path in receiver.received]
+        fast_times += [sink.received[address] for address in addresses if address in sink.received]
+        fast_done = (max(fast_times) - started) if len(fast_times) == fast_expected else None
+
+        drained = notifier.drain(timeout=slow * 3)
+        slow_done = receiver.received.get(receiver.slow_path, (None,))[0]
+        result = {
+            'subscribers': subscribers,
+            'webhooks': len(webhooks) + 1,
+            'emails': len(addresses),
+            'events': len(events),
+            'workers': workers,
+            'fast_notified': len(fast_times),
+            'fast_all_notified_s': round(fast_done, 3) if fast_done is not None else None,
+            'slow_endpoint_s': round(slow_done - started, 3) if slow_done else None,
+            'smtp_messages': sink.messages,
+            'queue_after': store.counts(),
+            'budget_s': budget
+        }
+        result['passed'] = bool(
+            fast_done is not None and fast_done <= budget
+            and slow_done is not None and fast_done < slow_done - started
+            and drained and not result['queue_after']
+        )
+        return result
+    finally:
+        receiver.stop()
+        sink.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--subscribers', type=int, default=1000)
+    parser.add_argument('--email-share', type=float, default=0.2, help='fraction of subscribers that are email')
+    parser.add_argument('--slow', type=float, default=5.0, help='seconds the slow webhook takes to answer')
+    parser.add_argument('--budget', type=float, default=10.0, help='seconds allowed to reach every fast subscriber')
+    parser.add_argument('--workers', type=int, default=32, help='delivery threads')
+    args = parser.parse_args()
+
+    result = run(args.subscribers, args.email_share, args.slow, args.budget, args.workers)
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result['passed'] else 1)
+
+
+if __name__ == '__main__':
+    main()
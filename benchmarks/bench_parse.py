@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Parse benchmark: compare the scraper's parser backends on saved fixture pages.
+
+Runs every backend in scraper.PARSER_BACKENDS over the recorded IBM lifecycle
+page and a 10x page (the same page with its non-target content repeated),
+checks that all backends return identical records and prints timings.
+
+    python benchmarks/bench_parse.py [--repeat N] [--json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scraper import PARSER_BACKENDS, TABLE_PATTERN  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+FIXTURE_PAGE = os.path.join(FIXTURE_DIR, 'ibm_lifecycle.html')
+
+
+def load_fixture(path=FIXTURE_PAGE):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def scale_page(html, factor):
+    """
+    Grow a page by repeating its body ``factor - 1`` more times, with the
+    deprecated-models table removed from the copies so the expected records
+    stay the same.
+    """
+    if factor <= 1:
+        return html
+    body_start = html.index('>', html.index('<body')) + 1
+    body_end = html.rindex('</body>')
+    filler = TABLE_PATTERN.sub(
+        lambda m: '' if 'deprecated' in m.group(0).lower() else m.group(0),
+        html[body_start:body_end]
+    )
+    return html[:body_end] + filler * (factor - 1) + html[body_end:]
+
+
+def time_backend(extract, html, repeat):
+    """Return (records, list of per-run milliseconds)"""
+    timings = []
+    records = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            records = extract(html)
+            timings.append((time.perf_counter() - started) * 1000)
+    return records, timings
+
+
+def run(repeat=5, factors=(1, 10)):
+    base = load_fixture()
+    results = []
+    for factor in factors:
+        html = scale_page(base, factor)
+        reference = None
+        for name, extract in PARSER_BACKENDS.items():
+            records, timings = time_backend(extract, html, repeat)
+            if reference is None:
+                reference = records
+            results.append({
+                'page': f"{factor}x",
+                'bytes': len(html.encode('utf-8')),
+                'backend': name,
+                'records': len(records),
+                'matches_reference': records == reference,
+                'median_ms': statistics.median(timings),
+                'min_ms': min(timings)
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='runs per backend and page (default 5)')
+    parser.add_argument('--json', action='store_true', help='print machine-readable JSON')
+    args = parser.parse_args()
+
+    results = run(repeat=args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'page':>5} {'bytes':>10} {'backend':>8} {'records':>8} {'same':>5} {'median ms':>10} {'min ms':>8}")
+        for row in results:
+            print(f"{row['page']:>5} {row['bytes']:>10} {row['backend']:>8} {row['records']:>8} "
+                  f"{str(row['matches_reference']):>5} {row['median_ms']:>10.1f} {row['min_ms']:>8.1f}")
+
+    if not all(row['matches_reference'] for row in results):
+        print("Backends returned different records!", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Render benchmark: streaming RSS writer vs. the previous minidom round-trip.
+
+For synthetic datasets of 50 and 50,000 models, measures render time and
+peak Python memory (tracemalloc) of:
+
+- minidom:  ElementTree -> tostring -> minidom.parseString -> toprettyxml
+            (the old generate_rss_content path, kept here as a baseline)
+- render:   rss_writer.render_rss (whole document as one string)
+- stream:   rss_writer.write_rss into a file sink
+
+    python benchmarks/bench_render.py [--sizes 50 50000] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from xml.dom import minidom
+from xml.etree.ElementTree import Element, SubElement, tostring
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from model_dates import normalize_records  # noqa: E402
+from rss_writer import (FEED_DESCRIPTION, FEED_LINK, FEED_TITLE, item_fields,  # noqa: E402
+                        render_rss, rfc822_now, write_rss)
+
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December']
+
+
+def synthetic_models(count):
+    """Deterministic model records shaped like the scraper output"""
+    return normalize_records([
+        {
+            'foundation_model_name': f"synthetic-model-{i:06d}-instruct",
+            'availability_date': f"{i % 28 + 1} {MONTH_NAMES[i % 12]} 2023",
+            'deprecation_date': f"{(i + 3) % 28 + 1} {MONTH_NAMES[(i + 4) % 12]} 2024",
+            'withdrawal_date': f"{(i + 7) % 28 + 1} {MONTH_NAMES[(i + 8) % 12]} 2025" if i % 5 else '–',
+            'recommended_alternative': f"synthetic-model-{i + 1:06d}-instruct" if i % 3 else '–'
+        }
+        for i in range(count)
+    ])
+
+
+def render_minidom(data):
+    build_date = rfc822_now()
+    rss = Element("rss", version="2.0")
+    channel = SubElement(rss, "channel")
+    SubElement(channel, "title").text = FEED_TITLE
+    SubElement(channel, "link").text = FEED_LINK
+    SubElement(channel, "description").text = FEED_DESCRIPTION
+    SubElement(channel, "language").text = "en-us"
+    SubElement(channel, "lastBuildDate").text = build_date
+    for model in data:
+        item = SubElement(channel, "item")
+        for tag, text in item_fields(model, build_date):
+            SubElement(item, tag).text = text
+    return minidom.parseString(tostring(rss, 'unicode')).toprettyxml(indent="  ")
+
+
+def render_stream(data):
+    with tempfile.TemporaryFile('w', encoding='utf-8') as sink:
+        write_rss(data, sink)
+
+
+RENDERERS = {
+    'minidom': render_minidom,
+    'render': render_rss,
+    'stream': render_stream
+}
+
+
+def measure(func, data):
+    """
+    Return (milliseconds, peak bytes). Time and memory come from separate
+    calls because tracemalloc slows allocation-heavy code down considerably.
+    """
+    started = time.perf_counter()
+    func(data)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    tracemalloc.start()
+    func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(sizes=(50, 50000)):
+    results = []
+    for size in sizes:
+        data = synthetic_models(size)
+        for name, func in RENDERERS.items():
+            elapsed, peak = measure(func, data)
+            results.append({
+                'models': size,
+                'renderer': name,
+                'render_ms': elapsed,
+                'peak_kib': peak / 1024
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 50000], help='dataset sizes')
+    parser.add_argument('--json', action='store_true', help='print machine-readable JSON')
+    args = parser.parse_args()
+
+    results = run(args.sizes)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'models':>8} {'renderer':>9} {'render ms':>10} {'peak KiB':>10}")
+    for row in results:
+        print(f"{row['models']:>8} {row['renderer']:>9} {row['render_ms']:>10.1f} {row['peak_kib']:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import cost of the server and time to first /feed.xml.
+
+- import:  fresh interpreter, time to ``import rss_server`` (median of N)
+- dev:     ``python rss_server.py``; time from spawn until /feed.xml is 200
+- gunicorn: ``gunicorn wsgi:app``; time until / answers (health check),
+           then POST /api/update and time until /feed.xml is 200
+- gunicorn-warm: a restart with gunicorn.conf.py (preloaded app) where only
+           the snapshot file is left, as in a fresh container; time until
+           /feed.xml is 200 without any update request
+
+The upstream is replaced by benchmarks/upstream_stub.py, and all state
+(snapshot and history databases) lives in a temporary directory.
+
+    python benchmarks/bench_startup.py [--runs N] [--modes import dev gunicorn gunicorn-warm] [--json]
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from upstream_stub import UpstreamStub, write_sources_file  # noqa: E402
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import rss_server; print(time.perf_counter() - t)"
+REFRESH_SNIPPET = "import rss_server; assert rss_server.update_feed_data()[0]"
+MODES = ('import', 'dev', 'gunicorn', 'gunicorn-warm')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def server_env(workdir, stub_url):
+    env = dict(os.environ)
+    env.update({
+        'PYTHONPATH': REPO_DIR,
+        'SOURCES_FILE': write_sources_file(os.path.join(workdir, 'sources.json'), stub_url),
+        'SOURCES': 'stub',
+        'SNAPSHOT_DB': os.path.join(workdir, 'snapshot.db'),
+        'HISTORY_DB': os.path.join(workdir, 'history.db'),
+        'NOTIFY_DB': os.path.join(workdir, 'notify.db'),
+        'REFRESH_INTERVAL_SECONDS': '0'
+    })
+    return env
+
+
+def wait_for(url, timeout=60, method='GET'):
+    """Poll until ``url`` returns 200; returns the elapsed seconds"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, method=method), timeout=2) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} not ready after {timeout} s")
+
+
+def measure_import(workdir, env):
+    output = subprocess.run([sys.executable, '-c', IMPORT_SNIPPET], cwd=workdir, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1]) * 1000
+
+
+def measure_dev(workdir, env):
+    port = free_port()
+    env = dict(env, PORT=str(port))
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, 'rss_server.py')], cwd=workdir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(f"http://127.0.0.1:{port}/feed.xml")
+        return {'first_feed_ms': (time.perf_counter() - started) * 1000}
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def measure_gunicorn(workdir, env):
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(['gunicorn', '--chdir', REPO_DIR, '--bind', f"127.0.0.1:{port}", 'wsgi:app'],
+                               cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f"http://127.0.0.1:{port}"
+        wait_for(base + '/')
+        healthy = time.perf_counter() - started
+        try:
+            urllib.request.urlopen(urllib.request.Request(base + '/api/update', method='POST'), timeout=5).close()
+        except urllib.error.HTTPError:
+            pass
+        wait_for(base + '/feed.xml')
+        return {'healthy_ms': healthy * 1000, 'first_feed_ms': (time.perf_counter() - started) * 1000}
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def measure_gunicorn_warm(workdir, env):
+    # Leave a snapshot file behind, then drop the snapshot database
+    subprocess.run([sys.executable, '-c', REFRESH_SNIPPET], cwd=workdir, env=env,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    for name in os.listdir(workdir):
+        if name.startswith('snapshot.db') and not name.endswith('.snap'):
+            os.remove(os.path.join(workdir, name))
+
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(['gunicorn', '--chdir', REPO_DIR, '--config', os.path.join(REPO_DIR, 'gunicorn.conf.py'),
+                                '--bind', f"127.0.0.1:{port}", 'wsgi:app'],
+                               cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(f"http://127.0.0.1:{port}/feed.xml")
+        return {'first_feed_ms': (time.perf_counter() - started) * 1000}
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run(runs=5, modes=MODES):
+    results = {}
+    with UpstreamStub() as stub:
+        for mode in modes:
+            if mode.startswith('gunicorn') and shutil.which('gunicorn') is None:
+                results[mode] = {'skipped': 'gunicorn not installed'}
+                continue
+            samples = []
+            for _ in range(runs):
+                with tempfile.TemporaryDirectory() as workdir:
+                    env = server_env(workdir, stub.url)
+                    if mode == 'import':
+                        samples.append({'import_ms': measure_import(workdir, env)})
+                    elif mode == 'dev':
+                        samples.append(measure_dev(workdir, env))
+                    elif mode == 'gunicorn':
+                        samples.append(measure_gunicorn(workdir, env))
+                    else:
+                        samples.append(measure_gunicorn_warm(workdir, env))
+            results[mode] = {
+                key: statistics.median(sample[key] for sample in samples)
+                for key in samples[0]
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='runs per mode (median is reported)')
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=MODES)
+    parser.add_argument('--json', action='store_true', help='print machine-readable JSON')
+    args = parser.parse_args()
+
+    results = run(args.runs, args.modes)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for mode, values in results.items():
+        print(f"{mode:>13}: " + ', '.join(
+            f"{key} {value:.0f}" if isinstance(value, float) else f"{key} {value}" for key, value in values.items()
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Shared measurement helpers for the benchmark suite.
+
+measure() runs a callable repeatedly and reports throughput, latency
+percentiles and peak Python memory; report metadata ties results to a commit
+so JSON reports from different commits can be compared with compare().
+"""
+import contextlib
+import io
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, elapsed, extra=None):
+    """Stats dict from per-call latencies (seconds) and total wall time"""
+    latencies = sorted(latencies)
+    result = {
+        'iterations': len(latencies),
+        'throughput_per_s': len(latencies) / elapsed if elapsed else None,
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else None,
+        'p50_ms': percentile(latencies, 0.50) * 1000 if latencies else None,
+        'p95_ms': percentile(latencies, 0.95) * 1000 if latencies else None,
+        'p99_ms': percentile(latencies, 0.99) * 1000 if latencies else None
+    }
+    result.update(extra or {})
+    return result
+
+
+def peak_memory_kib(func):
+    """Peak traced Python allocations of one call"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def measure(func, iterations=20, warmup=2, quiet=True, memory=True):
+    """
+    Call ``func`` ``warmup + iterations`` times and summarize the timed runs.
+    ``quiet`` swallows anything the code under test prints.
+    """
+    sink = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    with sink:
+        for _ in range(warmup):
+            func()
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            call_started = time.perf_counter()
+            func()
+            latencies.append(time.perf_counter() - call_started)
+        elapsed = time.perf_counter() - started
+        extra = {'peak_kib': peak_memory_kib(func)} if memory else {}
+    return summarize(latencies, elapsed, extra)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report_metadata():
+    return {
+        'commit': git_commit(),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def compare(baseline, current, key='p50_ms'):
+    """
+    Rows of (benchmark, baseline value, current value, relative change) for
+    benchmarks present in both reports.
+    """
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name, {}).get(key)
+        after = result.get(key)
+        if before and after is not None:
+            rows.append((name, before, after, (after - before) / before))
+    return rows
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the scrape, render and serve stages.
+
+- scrape.*:  scrape_ibm_deprecated_models() against the recorded fixture page
+             served by upstream_stub (cold, conditional/304, with injected
+             latency, with injected errors)
+- render.*:  generate_rss_content() and convert_to_rss_xml() on synthetic
+             datasets of several sizes
+- routes.*:  Flask routes through the test client
+- gunicorn.*: the same routes over HTTP against ``gunicorn wsgi:app``
+- load.*:    a polling mix over HTTP against sync and gthread gunicorn
+             workers, with memory per worker (see bench_load.py)
+- notify.*:  change notification fan-out to 1,000 local webhook and SMTP
+             subscribers, one of them slow (see bench_notify.py)
+
+Nothing touches ibm.com. The report is JSON (throughput, p50/p99 latency and
+peak memory per benchmark, plus commit metadata), so runs on different
+commits can be compared:
+
+    python benchmarks/run_suite.py --output before.json
+    python benchmarks/run_suite.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_render import synthetic_models  # noqa: E402
+from bench_startup import free_port, server_env, wait_for  # noqa: E402
+from harness import compare, measure, report_metadata, summarize  # noqa: E402
+from upstream_stub import UpstreamStub  # noqa: E402
+
+SUITES = ('scrape', 'render', 'routes', 'gunicorn', 'load', 'notify')
+RENDER_SIZES = (50, 500, 5000)
+ROUTES = ('/', '/feed.xml', '/api/data', '/api/status')
+
+
+def bench_scrape(iterations):
+    import scraper
+
+    results = {}
+
+    def cold(url):
+        scraper.clear_upstream_cache()
+        return scraper.scrape_ibm_deprecated_models(url)
+
+    with UpstreamStub() as stub:
+        results['scrape.cold'] = measure(lambda: cold(stub.url), iterations)
+        results['scrape.conditional'] = measure(lambda: scraper.scrape_ibm_deprecated_models(stub.url), iterations)
+    with UpstreamStub(latency=0.05) as stub:
+        results['scrape.latency_50ms'] = measure(lambda: cold(stub.url), max(5, iterations // 4))
+    with UpstreamStub(error_rate=0.3) as stub:
+        results['scrape.errors_30pct'] = measure(lambda: cold(stub.url), iterations)
+        results['scrape.errors_30pct']['upstream_errors'] = stub.errors
+    return results
+
+
+def bench_render(iterations):
+    import rss_server
+    import scraper
+
+    results = {}
+    workdir = tempfile.mkdtemp()
+    try:
+        for size in RENDER_SIZES:
+            data = synthetic_models(size)
+            runs = max(3, iterations * 50 // size)
+            results[f'render.generate_rss_content.{size}'] = measure(
+                lambda: rss_server.generate_rss_content(data), runs)
+            base = os.path.join(workdir, 'feed')
+            results[f'render.convert_to_rss_xml.{size}'] = measure(
+                lambda: scraper.convert_to_rss_xml(data, base), runs)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def bench_routes(iterations):
+    import rss_server
+
+    data = synthetic_models(500)
+    with rss_server.app.app_context():
+        rss_server.publish_snapshot(data, rss_server.generate_rss_content(data))
+    client = rss_server.app.test_client()
+    etag = client.get('/feed.xml').headers['ETag']
+
+    results = {}
+    for route in ROUTES:
+        results[f'routes.{route}'] = measure(lambda: client.get(route), iterations * 10, memory=False)
+    results['routes./feed.xml.gzip'] = measure(
+        lambda: client.get('/feed.xml', headers={'Accept-Encoding': 'gzip'}), iterations * 10, memory=False)
+    results['routes./feed.xml.304'] = measure(
+        lambda: client.get('/feed.xml', headers={'If-None-Match': etag}), iterations * 10, memory=False)
+    return results
+
+
+def http_load(url, requests_count, concurrency, headers=None):
+    """Fire ``requests_count`` GETs with ``concurrency`` threads; returns summary stats"""
+    latencies = []
+    lock = threading.Lock()
+    errors = [0]
+
+    def one(_):
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {}), timeout=10) as response:
+                response.read()
+        except Exception:
+            with lock:
+                errors[0] += 1
+            return
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests_count)))
+    return summarize(latencies, time.perf_counter() - started, {'errors': errors[0], 'concurrency': concurrency})
+
+
+def bench_gunicorn(iterations, workers=2, concurrency=8):
+    import subprocess
+
+    if shutil.which('gunicorn') is None:
+        return {'gunicorn': {'skipped': 'gunicorn not installed'}}
+
+    results = {}
+    with UpstreamStub() as stub, tempfile.TemporaryDirectory() as workdir:
+        port = free_port()
+        env = server_env(workdir, stub.url)
+        process = subprocess.Popen(
+            ['gunicorn', '--chdir', os.path.dirname(BENCH_DIR), '--workers', str(workers),
+             '--bind', f"127.0.0.1:{port}", 'wsgi:app'],
+            cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            base = f"http://127.0.0.1:{port}"
+            wait_for(base + '/')
+            urllib.request.urlopen(urllib.request.Request(base + '/api/update', method='POST'), timeout=10).close()
+            wait_for(base + '/feed.xml')
+            for route in ROUTES:
+                results[f'gunicorn.{route}'] = http_load(base + route, iterations * 20, concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+    return results
+
+
+def bench_load(iterations):
+    import bench_load
+
+    results = bench_load.run(('sync', 'gthread'), (2,), duration=max(2.0, iterations / 4))
+    return {f'load.{name}': result for name, result in results.items()}
+
+
+def bench_notify(iterations):
+    import bench_notify
+
+    return {'notify.fanout_1000': bench_notify.run(subscribers=1000, slow=2.0)}
+
+
+BENCHMARKS = {
+    'scrape': bench_scrape,
+    'render': bench_render,
+    'routes': bench_routes,
+    'gunicorn': bench_gunicorn,
+    'load': bench_load,
+    'notify': bench_notify
+}
+
+
+def run(suites=SUITES, iterations=20):
+    # Keep the server's databases out of the working tree
+    workdir = tempfile.mkdtemp(prefix='wxnotif-bench-')
+    os.environ.setdefault('SNAPSHOT_DB', os.path.join(workdir, 'snapshot.db'))
+    os.environ.setdefault('HISTORY_DB', os.path.join(workdir, 'history.db'))
+    os.environ.setdefault('NOTIFY_DB', os.path.join(workdir, 'notify.db'))
+    os.environ.setdefault('REFRESH_INTERVAL_SECONDS', '0')
+
+    report = {'meta': report_metadata(), 'results': {}}
+    try:
+        for suite in suites:
+            report['results'].update(BENCHMARKS[suite](iterations))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--suites', nargs='+', default=list(SUITES), choices=SUITES)
+    parser.add_argument('--iterations', type=int, default=20, help='base iteration count per benchmark')
+    parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+    parser.add_argument('--compare', metavar='BASELINE', help='print p50 changes against an earlier report')
+    args = parser.parse_args()
+
+    report = run(args.suites, args.iterations)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\np50 vs {baseline['meta'].get('commit')}:", file=sys.stderr)
+        for name, before, after, change in compare(baseline, report):
+            print(f"  {name:<45} {before:>9.2f} ms -> {after:>9.2f} ms  {change:+.0%}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
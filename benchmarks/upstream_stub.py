@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the IBM docs site.
+
+Serves recorded fixture pages over HTTP with optional injected latency and
+errors, and answers conditional requests (ETag / If-None-Match) like the real
+site, so benchmarks never touch ibm.com.
+
+    python benchmarks/upstream_stub.py --port 8099 --latency 0.2 --error-rate 0.1
+
+In code, use it as a context manager and point the server at it with
+write_sources_file() + SOURCES_FILE/SOURCES=stub:
+
+    with UpstreamStub() as stub:
+        ... stub.url ...
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+DEFAULT_PAGE = os.path.join(FIXTURE_DIR, 'ibm_lifecycle.html')
+
+
+class UpstreamStub:
+    """Threaded HTTP server serving fixture pages"""
+
+    def __init__(self, pages=None, latency=0.0, jitter=0.0, error_rate=0.0, error_status=500,
+                 host='127.0.0.1', port=0):
+        if pages is None:
+            with open(DEFAULT_PAGE, 'rb') as f:
+                pages = {'/lifecycle': f.read()}
+        self.pages = {path: body.encode('utf-8') if isinstance(body, str) else body for path, body in pages.items()}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """URL of the first page"""
+        return self.url_for(next(iter(self.pages)))
+
+    def url_for(self, path):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def set_page(self, path, body):
+        """Replace a page (e.g. to simulate an upstream change)"""
+        self.pages[path] = body.encode('utf-8') if isinstance(body, str) else body
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='upstream-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, attribute):
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                stub._count('requests')
+                delay = stub.latency + random.uniform(0, stub.jitter)
+                if delay:
+                    time.sleep(delay)
+
+                path = self.path.split('?', 1)[0]
+                body = stub.pages.get(path)
+                if body is None:
+                    return self._send(404, b'not found')
+                if stub.error_rate and random.random() < stub.error_rate:
+                    stub._count('errors')
+                    return self._send(stub.error_status, b'injected error')
+
+                etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    stub._count('not_modified')
+                    return self._send(304, b'', {'ETag': etag})
+                return self._send(200, body, {'ETag': etag, 'Content-Type': 'text/html; charset=utf-8'})
+
+            def _send(self, status, body, headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def write_sources_file(path, url, name='stub'):
+    """
+    Write a SOURCES_FILE that points the server at the stub. The stub source
+    uses the default page extraction, like the SaaS source.
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([{'name': name, 'url': url, 'locator': None, 'timeout': 10}], f)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve fixture pages as a stand-in for the IBM docs site')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random extra seconds (uniform)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with an error')
+    parser.add_argument('--error-status', type=int, default=500)
+    args = parser.parse_args()
+
+    stub = UpstreamStub(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        error_status=args.error_status, host=args.host, port=args.port)
+    print(f"Serving {stub.url} (Ctrl+C to stop)")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
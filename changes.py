@@ -0,0 +1,107 @@
+"""
+Model identity and snapshot diffing.
+
+Models are identified by their normalized name, and GUIDs are derived from a
+SHA-256 digest of that identity, so they are the same in every process and
+across restarts (unlike Python's randomized ``hash()``).
+
+diff_snapshots() compares two scrapes and classifies each model as added,
+changed (with the fields that changed) or removed; record_changes() turns a
+diff into change events for the /changes.xml feed.
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+
+# Fields whose changes are reported; 'sources' (provenance) is not a change
+TRACKED_FIELDS = (
+    'availability_date',
+    'deprecation_date',
+    'withdrawal_date',
+    'recommended_alternative'
+)
+
+# How many change events the change feed keeps
+MAX_CHANGE_EVENTS = 200
+
+
+def model_key(record):
+    """Identity of a model: its name, lowercased with whitespace collapsed"""
+    return ' '.join(record['foundation_model_name'].lower().split())
+
+
+def _digest(*parts):
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+def model_guid(record):
+    """Deterministic RSS GUID for a model"""
+    return f"ibm-model-{_digest(model_key(record))}"
+
+
+def diff_snapshots(old, new):
+    """
+    Compare two lists of model records. Returns a dict with 'added' and
+    'removed' record lists and 'changed', a list of
+    ``{'model': record, 'fields': {field: [old, new]}}``.
+    """
+    old_by_key = {model_key(record): record for record in old or []}
+    new_by_key = {model_key(record): record for record in new or []}
+
+    added = [record for key, record in new_by_key.items() if key not in old_by_key]
+    removed = [record for key, record in old_by_key.items() if key not in new_by_key]
+    changed = []
+    for key, record in new_by_key.items():
+        previous = old_by_key.get(key)
+        if previous is None:
+            continue
+        fields = {
+            field: [previous.get(field, ''), record.get(field, '')]
+            for field in TRACKED_FIELDS
+            if previous.get(field, '') != record.get(field, '')
+        }
+        if fields:
+            changed.append({'model': record, 'fields': fields})
+
+    return {'added': added, 'changed': changed, 'removed': removed}
+
+
+def summarize_diff(diff):
+    """Counts per kind, e.g. {'added': 1, 'changed': 0, 'removed': 2}"""
+    return {kind: len(entries) for kind, entries in diff.items()}
+
+
+def diff_events(diff, detected_at=None):
+    """
+    Turn a diff into change events (newest-first order is up to the caller).
+    Event ids are digests of the change and its detection time, so every
+    worker serving the same snapshot emits the same GUIDs.
+    """
+    detected_at = detected_at or datetime.now(timezone.utc).replace(microsecond=0)
+    stamp = detected_at.isoformat()
+    events = []
+    for record in diff['added']:
+        events.append({'kind': 'added', 'model': record, 'fields': {}})
+    for entry in diff['changed']:
+        events.append({'kind': 'changed', 'model': entry['model'], 'fields': entry['fields']})
+    for record in diff['removed']:
+        events.append({'kind': 'removed', 'model': record, 'fields': {}})
+
+    for event in events:
+        event['detected_at'] = detected_at
+        event['id'] = f"ibm-change-{_digest(model_key(event['model']), event['kind'], event['fields'], stamp)}"
+    return events
+
+
+def record_changes(previous_events, old, new, detected_at=None):
+    """
+    Diff ``old`` against ``new`` and prepend the resulting events to
+    ``previous_events``, keeping at most MAX_CHANGE_EVENTS.
+    Returns ``(events, diff)``. Nothing is recorded for the very first
+    snapshot, which would otherwise report every model as added.
+    """
+    if not old:
+        return list(previous_events or []), {'added': [], 'changed': [], 'removed': []}
+    diff = diff_snapshots(old, new)
+    events = diff_events(diff, detected_at) + list(previous_events or [])
+    return events[:MAX_CHANGE_EVENTS], diff
@@ -0,0 +1,53 @@
+"""
+SQLite connections for the stores: one per OS thread and per process.
+
+A connection must not be used from two threads at once or carried across
+fork(). threading.local() would do, but gevent's monkey-patching turns it
+into a greenlet-local, and gevent workers run every client connection in
+its own greenlet: each request would open a database connection and set up
+WAL just to check the snapshot version. Connections are therefore keyed by
+the OS thread, which all greenlets of a gevent worker share. A greenlet
+only switches when it waits for I/O, never in the middle of a statement or
+between the statements of a store's transaction, so sharing is safe.
+"""
+import os
+import sqlite3
+import sys
+import threading
+
+
+def native_thread_id():
+    """Identifier of the running OS thread, also under gevent's monkey-patching"""
+    monkey = sys.modules.get('gevent.monkey')
+    if monkey is not None and monkey.is_module_patched('threading'):
+        return monkey.get_original('_thread', 'get_ident')()
+    return threading.get_ident()
+
+
+class ThreadConnections:
+    """Connections to one database in WAL mode, opened on first use in each thread"""
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.timeout = timeout
+        self._connections = {}
+        self._pid = None
+
+    def get(self):
+        """This thread's connection"""
+        if self._pid != os.getpid():
+            # Inherited from the parent process; never touch them here
+            self._connections = {}
+            self._pid = os.getpid()
+        thread_id = native_thread_id()
+        conn = self._connections.get(thread_id)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._connections[thread_id] = conn
+        return conn
+
+    def __len__(self):
+        """Connections opened in this process"""
+        return len(self._connections)
@@ -0,0 +1,264 @@
+"""
+Lead-time alerts for upcoming deprecation and withdrawal dates.
+
+DeadlineScheduler keeps two structures over the dates in the installed
+snapshot, and neither is rescanned on a timer:
+
+- a heap of pending alerts, ``(alert_at, deadline, model, field, lead)``.
+  One thread sleeps until the earliest alert is due, then fires it.
+- a date-ordered list of deadlines, which /api/upcoming slices with a
+  binary search
+
+sync() compares a new snapshot's dates with the current ones and touches
+only the deadlines that appeared, moved or disappeared. Alerts for a moved
+or removed deadline stay in the heap and are skipped when they come up.
+
+Alerts fire ALERT_LEAD_DAYS before each date (default 30, 7 and 1 days), at
+00:00 UTC. If several lead times have already passed, e.g. after downtime or
+for a newly listed model, only the most recent one fires. An alert id names
+the model, field, date and lead time. The on_alert callback is expected to
+record ids so that each alert goes out once across workers and restarts;
+the server uses NotificationStore.enqueue_once(). A changed date therefore
+gets a fresh set of alerts. If on_alert raises, e.g. because the database
+is locked, its alerts go back on the heap and are retried RETRY_SECONDS
+later.
+"""
+import bisect
+import heapq
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from changes import model_guid, model_key
+from model_dates import date_epoch
+
+DAY = 86400
+
+ALERT_LEAD_DAYS = tuple(sorted(
+    {int(days) for days in os.environ.get('ALERT_LEAD_DAYS', '30,7,1').split(',') if days.strip()},
+    reverse=True
+))
+
+# Dates that get alerts, with the verb used in alert titles
+ALERT_FIELDS = {
+    'deprecation_date': 'deprecated',
+    'withdrawal_date': 'withdrawn'
+}
+
+# Longest sleep between heap checks (a safety net; updates wake the thread)
+MAX_SLEEP = 3600
+
+# Delay before alerts whose on_alert call failed are tried again
+RETRY_SECONDS = 60
+
+DEFAULT_UPCOMING_DAYS = 90
+MAX_UPCOMING_DAYS = 3650
+
+
+def _iso(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).date().isoformat()
+
+
+def _days_left(deadline, now):
+    """Whole calendar days (UTC) from ``now`` until ``deadline``"""
+    return (datetime.fromtimestamp(deadline, timezone.utc).date()
+            - datetime.fromtimestamp(now, timezone.utc).date()).days
+
+
+def _in_days(days):
+    if days <= 0:
+        return 'today'
+    return 'tomorrow' if days == 1 else f"in {days} days"
+
+
+class DeadlineScheduler:
+    """Heap of pending lead-time alerts and an ordered list of deadlines"""
+
+    def __init__(self, on_alert=None, lead_days=ALERT_LEAD_DAYS):
+        self.on_alert = on_alert
+        self.lead_days = tuple(sorted(set(lead_days), reverse=True))
+        self._deadlines = {}   # (model key, field) -> deadline epoch
+        self._models = {}      # model key -> record
+        self._by_date = []     # sorted (deadline, model key, field)
+        self._heap = []        # (alert_at, deadline, model key, field, lead days)
+        self._pending = {}     # (model key, field) -> lead days still to fire
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def sync(self, data, now=None):
+        """Bring the deadlines in line with a snapshot; returns how many changed"""
+        now = time.time() if now is None else now
+        models = {}
+        current = {}
+        for record in data or []:
+            key = model_key(record)
+            models[key] = record
+            for field in ALERT_FIELDS:
+                epoch = date_epoch(record, field)
+                if epoch is not None:
+                    current[(key, field)] = epoch
+
+        with self._lock:
+            self._models = models
+            gone = [slot for slot, deadline in self._deadlines.items() if current.get(slot) != deadline]
+            for slot in gone:
+                self._remove(slot)
+            added = [(slot, deadline) for slot, deadline in current.items() if slot not in self._deadlines]
+            for slot, deadline in added:
+                self._add(slot, deadline, now)
+            if len(self._heap) > 2 * sum(len(leads) for leads in self._pending.values()) + 64:
+                # Drop the entries of moved and removed deadlines
+                self._heap = [entry for entry in self._heap if self._live(entry)]
+                heapq.heapify(self._heap)
+        if gone or added:
+            self._wake.set()
+        return len(set(gone) | {slot for slot, _ in added})
+
+    def _add(self, slot, deadline, now):
+        # Caller holds self._lock
+        self._deadlines[slot] = deadline
+        bisect.insort(self._by_date, (deadline,) + slot)
+        if deadline <= now:
+            return
+        leads = set()
+        overdue = None
+        for lead in self.lead_days:
+            alert_at = deadline - lead * DAY
+            if alert_at > now:
+                leads.add(lead)
+                heapq.heappush(self._heap, (alert_at, deadline) + slot + (lead,))
+            else:
+                # Lead days are in descending order; keep the latest passed one
+                overdue = (alert_at, lead)
+        if overdue is not None:
+            alert_at, lead = overdue
+            leads.add(lead)
+            heapq.heappush(self._heap, (alert_at, deadline) + slot + (lead,))
+        self._pending[slot] = leads
+
+    def _remove(self, slot):
+        # Caller holds self._lock
+        deadline = self._deadlines.pop(slot)
+        index = bisect.bisect_left(self._by_date, (deadline,) + slot)
+        del self._by_date[index]
+        self._pending.pop(slot, None)
+
+    def _live(self, entry):
+        _, deadline, key, field, lead = entry
+        slot = (key, field)
+        return self._deadlines.get(slot) == deadline and lead in self._pending.get(slot, ())
+
+    def due(self, now=None):
+        """Pop and return the alerts due at ``now``"""
+        now = time.time() if now is None else now
+        return self._pop_due(now)[1]
+
+    def fire(self, now=None, retry_delay=RETRY_SECONDS):
+        """
+        Pass the alerts due at ``now`` to on_alert and return them. If
+        on_alert raises, the alerts are put back, due ``retry_delay``
+        seconds later, and the error is raised.
+        """
+        now = time.time() if now is None else now
+        entries, alerts = self._pop_due(now)
+        if not alerts or self.on_alert is None:
+            return alerts
+        try:
+            self.on_alert(alerts)
+        except Exception:
+            self._retry(entries, now + retry_delay)
+            raise
+        return alerts
+
+    def _pop_due(self, now):
+        entries = []
+        alerts = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                if not self._live(entry):
+                    continue
+                _, deadline, key, field, lead = entry
+                self._pending[(key, field)].discard(lead)
+                entries.append(entry)
+                alerts.append(self._alert(self._models[key], field, deadline, lead, now))
+        return entries, alerts
+
+    def _retry(self, entries, retry_at):
+        with self._lock:
+            for _, deadline, key, field, lead in entries:
+                slot = (key, field)
+                # Unless a sync moved or removed the deadline in the meantime
+                if self._deadlines.get(slot) == deadline:
+                    self._pending.setdefault(slot, set()).add(lead)
+                    heapq.heappush(self._heap, (retry_at, deadline, key, field, lead))
+
+    def _alert(self, record, field, deadline, lead, now):
+        """Notification payload for one alert (same shape as change events)"""
+        name = record['foundation_model_name']
+        days = _days_left(deadline, now)
+        date = _iso(deadline)
+        return {
+            'id': f"{model_guid(record)}-{field.replace('_', '-')}-{date}-{lead}d",
+            'kind': 'deadline',
+            'title': f"{name} will be {ALERT_FIELDS[field]} {_in_days(days)} ({record.get(field) or date})",
+            'model': name,
+            'guid': model_guid(record),
+            'fields': {},
+            'deadline': {'field': field, 'date': date, 'lead_days': lead, 'days_left': days},
+            'detected_at': datetime.fromtimestamp(now, timezone.utc).isoformat(timespec='seconds'),
+            'record': record
+        }
+
+    def upcoming(self, days=DEFAULT_UPCOMING_DAYS, field=None, now=None):
+        """Deadlines from today through the next ``days`` days, soonest first"""
+        now = time.time() if now is None else now
+        today = now - now % DAY
+        with self._lock:
+            start = bisect.bisect_left(self._by_date, (today,))
+            end = bisect.bisect_left(self._by_date, (today + (days + 1) * DAY,))
+            result = []
+            for deadline, key, slot_field in self._by_date[start:end]:
+                if field is not None and slot_field != field:
+                    continue
+                record = self._models[key]
+                leads = self._pending.get((key, slot_field))
+                next_lead = max(leads) if leads else None
+                result.append({
+                    'model': record['foundation_model_name'],
+                    'field': slot_field,
+                    'date': _iso(deadline),
+                    'days_left': _days_left(deadline, now),
+                    'recommended_alternative': record.get('recommended_alternative'),
+                    'next_alert': None if next_lead is None else {
+                        'lead_days': next_lead,
+                        'at': datetime.fromtimestamp(max(deadline - next_lead * DAY, now), timezone.utc)
+                        .isoformat(timespec='seconds')
+                    }
+                })
+        return result
+
+    def start(self):
+        """Start the alert thread in this process (idempotent)"""
+        with self._lock:
+            # Threads do not survive fork(); each worker runs its own
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='deadline-alerts', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                next_at = self._heap[0][0] if self._heap else None
+            delay = MAX_SLEEP if next_at is None else min(MAX_SLEEP, max(0.0, next_at - time.time()))
+            self._wake.wait(delay)
+            self._wake.clear()
+            try:
+                self.fire()
+            except Exception as e:
+                print(f"❌ Error firing deadline alerts, retrying in {RETRY_SECONDS} s: {e}")
@@ -0,0 +1,140 @@
+"""
+Server-sent events for /api/events.
+
+Events are appended to the shared snapshot store, so a scrape running in one
+gunicorn worker reaches listeners connected to any other. Each worker runs
+one EventBroadcaster thread that polls the store for new rows while it has
+listeners and fans them out to per-connection queues; an idle connection
+costs a queue and a blocked reader, not a poll of its own.
+
+Idle SSE connections hold their worker for as long as they are open, so
+serve them with the gevent (or gthread) worker class - see gunicorn.conf.py
+- rather than sync workers.
+"""
+import json
+import queue
+import threading
+
+# Event types
+SCRAPE_STARTED = 'scrape-started'
+SCRAPE_FINISHED = 'scrape-finished'
+SNAPSHOT_CHANGED = 'snapshot-changed'
+DEADLINE_ALERT = 'deadline-alert'
+
+POLL_INTERVAL = 0.5
+HEARTBEAT_INTERVAL = 15
+# Events a listener may fall behind by before it is disconnected (it will
+# reconnect and resume from its Last-Event-ID)
+LISTENER_QUEUE_SIZE = 100
+# Reconnect delay suggested to clients, in milliseconds
+RETRY_MS = 5000
+
+
+def format_event(event_id, event_type, data):
+    """One SSE message; ``data`` is a JSON string without newlines"""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+class Listener:
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=LISTENER_QUEUE_SIZE)
+        self.overflowed = False
+
+
+class EventBroadcaster:
+    """Publishes events to the store and streams them to local listeners"""
+
+    def __init__(self, store, poll_interval=POLL_INTERVAL, heartbeat_interval=HEARTBEAT_INTERVAL):
+        self.store = store
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._listeners = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._last_id = None
+
+    def publish(self, event_type, **data):
+        """Record an event for every worker's listeners; returns its id"""
+        event_id = self.store.append_event(event_type, json.dumps(data, separators=(',', ':')))
+        # Deliver locally without waiting for the next poll
+        self._wake.set()
+        return event_id
+
+    @property
+    def listener_count(self):
+        return len(self._listeners)
+
+    def _start(self):
+        # Caller holds self._lock; threads do not survive fork(), so this
+        # runs lazily in whichever process serves the first listener
+        if self._thread is None:
+            self._last_id = self.store.last_event_id()
+            self._thread = threading.Thread(target=self._run, name='event-broadcaster', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                self._poll()
+            except Exception as e:
+                print(f"❌ Error reading events: {e}")
+
+    def _poll(self):
+        with self._lock:
+            if not self._listeners:
+                # Nobody to deliver to; just keep up with the log
+                self._last_id = self.store.last_event_id()
+                return
+        rows = self.store.events_after(self._last_id)
+        for row in rows:
+            # Delivery and the position move together, so a listener
+            # joining concurrently sees each event exactly once
+            with self._lock:
+                for listener in self._listeners:
+                    try:
+                        listener.queue.put_nowait(row)
+                    except queue.Full:
+                        listener.overflowed = True
+                self._last_id = row[0]
+        if rows:
+            # More may be waiting beyond the page just read
+            self._wake.set()
+
+    def stream(self, last_event_id=None):
+        """
+        Generate the SSE response body for one client: events after
+        ``last_event_id`` still in the store, then live events, with comment
+        heartbeats so proxies keep idle connections open.
+        """
+        listener = Listener()
+        with self._lock:
+            self._start()
+            self._listeners.add(listener)
+            # Everything after this id will be delivered to the queue
+            seen = self._last_id
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            # Replay what the client missed before it (re)connected
+            replayed = last_event_id
+            while replayed is not None and replayed < seen:
+                rows = [row for row in self.store.events_after(replayed) if row[0] <= seen]
+                if not rows:
+                    break
+                for event_id, event_type, data in rows:
+                    yield format_event(event_id, event_type, data)
+                replayed = rows[-1][0]
+
+            while not listener.overflowed:
+                try:
+                    event_id, event_type, data = listener.queue.get(timeout=self.heartbeat_interval)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if event_id > seen:
+                    yield format_event(event_id, event_type, data)
+        finally:
+            with self._lock:
+                self._listeners.discard(listener)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Streaming, pandas-free export pipeline.
+
+Records are read once from any iterable (the scraper's list, or a generator
+over the history database) and fanned out in batches to one writer thread per
+format through bounded queues, so formats are written in parallel and memory
+stays bounded by ``QUEUE_BATCHES * BATCH_SIZE`` records however many rows are
+exported.
+
+Writers: csv, ndjson, json, xlsx (openpyxl write-only mode) and parquet
+(optional, needs pyarrow).
+
+    python exporters.py --history-db wxnotif_history.db --formats csv ndjson xlsx
+"""
+import argparse
+import csv
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+
+EXPORT_FIELDS = (
+    'foundation_model_name',
+    'availability_date',
+    'deprecation_date',
+    'withdrawal_date',
+    'recommended_alternative',
+    'sources'
+)
+
+BATCH_SIZE = 1000
+QUEUE_BATCHES = 4
+
+
+def cell_value(value):
+    """Flatten a record value for tabular formats"""
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return '; '.join(str(item) for item in value)
+    return value
+
+
+class CsvWriter:
+    extension = 'csv'
+
+    def __init__(self, path, fields):
+        self.fields = fields
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(fields)
+
+    def write_batch(self, records):
+        self.writer.writerows([[cell_value(record.get(field)) for field in self.fields] for record in records])
+
+    def close(self):
+        self.file.close()
+
+
+class NdjsonWriter:
+    extension = 'ndjson'
+
+    def __init__(self, path, fields):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write_batch(self, records):
+        self.file.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+
+    def close(self):
+        self.file.close()
+
+
+class JsonWriter:
+    """A JSON array, formatted like json.dump(data, indent=2)"""
+    extension = 'json'
+
+    def __init__(self, path, fields):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write('[')
+        self.first = True
+
+    def write_batch(self, records):
+        chunks = []
+        for record in records:
+            body = json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+            chunks.append(('\n  ' if self.first else ',\n  ') + body)
+            self.first = False
+        self.file.write(''.join(chunks))
+
+    def close(self):
+        self.file.write(']' if self.first else '\n]')
+        self.file.close()
+
+
+class XlsxWriter:
+    """openpyxl in write-only mode: rows are streamed to disk, not kept as cells"""
+    extension = 'xlsx'
+
+    def __init__(self, path, fields):
+        from openpyxl import Workbook
+
+        self.path = path
+        self.fields = fields
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet('models')
+        self.sheet.append(list(fields))
+
+    def write_batch(self, records):
+        for record in records:
+            self.sheet.append([cell_value(record.get(field)) for field in self.fields])
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+class ParquetWriter:
+    """Columnar output; one row group per batch"""
+    extension = 'parquet'
+
+    def __init__(self, path, fields):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.fields = fields
+        self.schema = pa.schema([(field, pa.string()) for field in fields])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write_batch(self, records):
+        columns = {field: [str(cell_value(record.get(field))) for record in records] for field in self.fields}
+        self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {
+    'csv': CsvWriter,
+    'ndjson': NdjsonWriter,
+    'json': JsonWriter,
+    'xlsx': XlsxWriter,
+    'parquet': ParquetWriter
+}
+
+_DONE = object()
+
+
+def _batches(records, size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _writer_thread(writer, batches, outcome):
+    """Consume batches until _DONE; keep draining after an error so the producer never blocks"""
+    failed = False
+    while True:
+        batch = batches.get()
+        if batch is _DONE:
+            break
+        if failed:
+            continue
+        try:
+            writer.write_batch(batch)
+        except Exception as e:
+            outcome['error'] = str(e)
+            failed = True
+    try:
+        writer.close()
+    except Exception as e:
+        outcome.setdefault('error', str(e))
+
+
+def export_records(records, formats, base_path, fields=EXPORT_FIELDS, batch_size=BATCH_SIZE):
+    """
+    Stream ``records`` into ``{base_path}.{extension}`` for every format.
+    Returns ``{format: {'path': ..., 'rows': ...}}``, with an 'error' entry
+    for formats that could not be written (e.g. a missing optional package).
+    """
+    results = {}
+    threads = []
+    queues = []
+    for name in formats:
+        writer_class = WRITERS[name]
+        path = f"{base_path}.{writer_class.extension}"
+        results[name] = {'path': path, 'rows': 0}
+        try:
+            writer = writer_class(path, fields)
+        except ImportError as e:
+            results[name]['error'] = f"{name} export not available ({e.name} not installed)"
+            continue
+        except OSError as e:
+            results[name]['error'] = str(e)
+            continue
+        batches = queue.Queue(maxsize=QUEUE_BATCHES)
+        thread = threading.Thread(target=_writer_thread, args=(writer, batches, results[name]),
+                                  name=f"export-{name}", daemon=True)
+        thread.start()
+        threads.append(thread)
+        queues.append((name, batches))
+
+    rows = 0
+    try:
+        for batch in _batches(records, batch_size):
+            rows += len(batch)
+            for _, batches in queues:
+                batches.put(batch)
+    finally:
+        for _, batches in queues:
+            batches.put(_DONE)
+        for thread in threads:
+            thread.join()
+
+    for name, _ in queues:
+        results[name]['rows'] = rows
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the snapshot history')
+    parser.add_argument('--history-db', default=os.environ.get('HISTORY_DB', 'wxnotif_history.db'))
+    parser.add_argument('--formats', nargs='+', default=['csv', 'ndjson'], choices=sorted(WRITERS))
+    parser.add_argument('--output', default=None, help='output base path (default: ibm_deprecated_models_history_<timestamp>)')
+    parser.add_argument('--latest', action='store_true', help='export only the latest snapshot')
+    args = parser.parse_args()
+
+    from history_store import HistoryStore
+
+    history = HistoryStore(args.history_db)
+    base_path = args.output or f"ibm_deprecated_models_history_{datetime.now():%Y%m%d_%H%M%S}"
+    if args.latest:
+        latest = history.latest()
+        records, fields = (latest[1] if latest else []), EXPORT_FIELDS
+    else:
+        records, fields = history.iter_records(), ('captured_at',) + EXPORT_FIELDS
+
+    for name, result in export_records(records, args.formats, base_path, fields).items():
+        if 'error' in result:
+            print(f"{name}: {result['error']}")
+        else:
+            print(f"{name}: {result['rows']} rows written to {result['path']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Pre-encoded response bodies for the RSS feed server.
+
+Each data snapshot is turned into immutable byte bodies (identity, gzip and,
+when the optional ``brotli`` package is installed, brotli) exactly once.
+Serving a request is then only content negotiation and a dictionary lookup.
+"""
+import gzip
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+# Preferred order when the client accepts several encodings equally
+ENCODING_PREFERENCE = ('br', 'gzip', 'identity')
+
+
+class CachedResponse:
+    """
+    An immutable, pre-encoded representation of one response body.
+    """
+
+    def __init__(self, body, content_type, last_modified=None):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+
+        self.content_type = content_type
+        self.last_modified = None
+        self.last_modified_header = None
+        if last_modified is not None:
+            # HTTP dates only have second resolution
+            self.last_modified = last_modified.astimezone(timezone.utc).replace(microsecond=0)
+            self.last_modified_header = format_datetime(self.last_modified, usegmt=True)
+
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.bodies = {'identity': body}
+        self.etags = {'identity': f'"{digest}"'}
+
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) < len(body):
+            self.bodies['gzip'] = compressed
+            self.etags['gzip'] = f'"{digest}-gzip"'
+
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            if len(compressed) < len(body):
+                self.bodies['br'] = compressed
+                self.etags['br'] = f'"{digest}-br"'
+
+        self._index()
+
+    @classmethod
+    def from_encoded(cls, content_type, last_modified, bodies, etags):
+        """Rebuild a response from bodies and ETags encoded earlier, without compressing again"""
+        response = cls.__new__(cls)
+        response.content_type = content_type
+        response.last_modified = last_modified
+        response.last_modified_header = format_datetime(last_modified, usegmt=True) if last_modified else None
+        response.bodies = dict(bodies)
+        response.etags = dict(etags)
+        response._index()
+        return response
+
+    def _index(self):
+        self.available = tuple(enc for enc in ENCODING_PREFERENCE if enc in self.bodies)
+        # Bytes held, for size-bounded caches of responses
+        self.size = sum(len(encoded) for encoded in self.bodies.values())
+
+    def matches_etag(self, if_none_match):
+        """Check an If-None-Match header against any of our encodings"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        candidates = {tag.strip() for tag in if_none_match.split(',')}
+        # Clients (and proxies) may send back the weak form of our tag
+        candidates |= {tag[2:] for tag in candidates if tag.startswith('W/')}
+        return any(etag in candidates for etag in self.etags.values())
+
+    def not_modified_since(self, if_modified_since):
+        """Check an If-Modified-Since header against our Last-Modified"""
+        if not if_modified_since or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return self.last_modified <= since
+
+    def is_not_modified(self, if_none_match, if_modified_since):
+        """
+        Evaluate conditional request headers (RFC 9110 section 13.2.2).
+        If-Modified-Since is ignored when If-None-Match is present.
+        """
+        if if_none_match:
+            return self.matches_etag(if_none_match)
+        return self.not_modified_since(if_modified_since)
+
+    def select(self, accept_encoding):
+        """
+        Return (encoding, body, etag) for an Accept-Encoding header, or None
+        if it refuses every encoding we have (identity included).
+        """
+        encoding = negotiate_encoding(accept_encoding or '', self.available)
+        if encoding is None:
+            return None
+        return encoding, self.bodies[encoding], self.etags[encoding]
+
+
+@lru_cache(maxsize=256)
+def negotiate_encoding(accept_encoding, available):
+    """
+    Pick the best content-coding from ``available`` for an Accept-Encoding
+    header, or None if none is acceptable: identity is only refused by
+    ``identity;q=0``, or by ``*;q=0`` without an identity entry (RFC 9110
+    section 12.5.3). Results are memoized because clients send a handful of
+    distinct header values.
+    """
+    qualities = {}
+    for part in accept_encoding.lower().split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[token] = quality
+
+    wildcard = qualities.get('*')
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = qualities.get(encoding, wildcard)
+        if quality is None:
+            # identity is always acceptable unless explicitly refused
+            quality = 0.001 if encoding == 'identity' else 0.0
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
@@ -0,0 +1,262 @@
+"""
+Atom, JSON Feed and iCalendar renderings of the model feed.
+
+A snapshot is compiled once into format-neutral FeedItems (the same titles,
+GUIDs, descriptions and dates as the RSS feed), and each format is rendered
+from them the first time it is requested. LazyFeeds holds both for one
+installed snapshot, so formats nobody asks for cost nothing per refresh or
+per request, and a requested format is rendered once per snapshot.
+
+    /feed.atom  Atom 1.0
+    /feed.json  JSON Feed 1.1
+    /feed.ics   iCalendar; all-day events on each model's deprecation and
+                withdrawal dates
+
+Any feed, RSS included, can be narrowed with the model_query filter
+parameters. Filtered renderings are cached on the LazyFeeds of the snapshot
+they were rendered from, keyed by format and canonical filter, in an LRU
+bounded by total body size; installing a new snapshot drops them all.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from xml.sax.saxutils import escape, quoteattr
+
+from changes import model_guid
+from feed_cache import CachedResponse
+from metrics import RENDER_SECONDS
+from model_dates import date_value
+from model_query import ModelIndex
+from rss_writer import FEED_CATEGORY, FEED_DESCRIPTION, FEED_LINK, FEED_TITLE, item_description, render_rss, rfc822_date
+
+TAG_AUTHORITY = 'tag:wxnotif,2025:'
+FEED_AUTHOR = 'WxNotif'
+
+# Dates that become calendar events, with their summary prefix
+CALENDAR_DATES = (
+    ('deprecation_date', 'Deprecated'),
+    ('withdrawal_date', 'Withdrawn')
+)
+
+ICAL_LINE_OCTETS = 75
+
+# Total encoded bytes of filtered feeds kept per snapshot
+FILTERED_CACHE_BYTES = int(os.environ.get('FILTERED_FEED_CACHE_BYTES', 64 * 1024 * 1024))
+
+
+class FeedItem:
+    """One model, independent of any output format"""
+    __slots__ = ('id', 'title', 'content_html', 'published', 'category', 'model')
+
+    def __init__(self, model):
+        self.id = model_guid(model)
+        self.title = model['foundation_model_name']
+        self.content_html = item_description(model)
+        # Same rule as the RSS pubDate: the withdrawal date when known
+        withdrawal = date_value(model, 'withdrawal_date')
+        self.published = datetime.fromtimestamp(withdrawal['epoch'], timezone.utc) if withdrawal else None
+        self.category = FEED_CATEGORY
+        self.model = model
+
+
+def build_items(data):
+    return [FeedItem(model) for model in data or []]
+
+
+def _iso(when):
+    return when.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def render_atom(items, updated):
+    """Atom 1.0 document"""
+    updated = _iso(updated)
+    chunks = [
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom">\n'
+        f'  <id>{TAG_AUTHORITY}deprecated-models</id>\n'
+        f'  <title>{escape(FEED_TITLE)}</title>\n'
+        f'  <subtitle>{escape(FEED_DESCRIPTION)}</subtitle>\n'
+        f'  <link rel="alternate" href={quoteattr(FEED_LINK)}/>\n'
+        f'  <updated>{updated}</updated>\n'
+        f'  <author><name>{FEED_AUTHOR}</name></author>\n'
+    ]
+    for item in items:
+        chunks.append(
+            '  <entry>\n'
+            f'    <id>{TAG_AUTHORITY}{item.id}</id>\n'
+            f'    <title>{escape(item.title)}</title>\n'
+            f'    <link rel="alternate" href={quoteattr(FEED_LINK)}/>\n'
+            f'    <updated>{_iso(item.published) if item.published else updated}</updated>\n'
+            f'    <category term={quoteattr(item.category)}/>\n'
+            f'    <content type="html">{escape(item.content_html)}</content>\n'
+            '  </entry>\n'
+        )
+    chunks.append('</feed>\n')
+    return ''.join(chunks)
+
+
+def _json_feed_item(item):
+    entry = {
+        'id': item.id,
+        'title': item.title,
+        'url': FEED_LINK,
+        'content_html': item.content_html,
+        'tags': [item.category],
+        '_wxnotif': {'model': item.model}
+    }
+    if item.published:
+        entry['date_published'] = _iso(item.published)
+    return entry
+
+
+def render_json_feed(items, updated):
+    """JSON Feed 1.1 document; the raw record is kept under ``_wxnotif``"""
+    return json.dumps({
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': FEED_TITLE,
+        'home_page_url': FEED_LINK,
+        'description': FEED_DESCRIPTION,
+        'authors': [{'name': FEED_AUTHOR}],
+        'items': [_json_feed_item(item) for item in items]
+    }, ensure_ascii=False) + "\n"
+
+
+def _ical_text(value):
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _ical_fold(line):
+    """Fold a content line at 75 octets (RFC 5545 3.1) without splitting characters"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= ICAL_LINE_OCTETS:
+        return line
+    parts = []
+    limit = ICAL_LINE_OCTETS
+    while encoded:
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        # Continuation lines start with a space, which counts toward the limit
+        limit = ICAL_LINE_OCTETS - 1
+    return '\r\n '.join(parts)
+
+
+def render_ical(items, updated):
+    """iCalendar document with one all-day event per known lifecycle date"""
+    stamp = updated.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//WxNotif//IBM watsonx model lifecycle//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_ical_text(FEED_TITLE)}'
+    ]
+    for item in items:
+        model = item.model
+        alternative = model.get('recommended_alternative') or '–'
+        for field, label in CALENDAR_DATES:
+            value = date_value(model, field)
+            if value is None:
+                continue
+            day = datetime.fromtimestamp(value['epoch'], timezone.utc).date()
+            lines += [
+                'BEGIN:VEVENT',
+                f'UID:{item.id}-{field.replace("_", "-")}@wxnotif',
+                f'DTSTAMP:{stamp}',
+                f'DTSTART;VALUE=DATE:{day:%Y%m%d}',
+                f'DTEND;VALUE=DATE:{day + timedelta(days=1):%Y%m%d}',
+                f'SUMMARY:{_ical_text(f"{label}: {item.title}")}',
+                f'DESCRIPTION:{_ical_text(f"Recommended alternative: {alternative}")}',
+                f'URL:{FEED_LINK}',
+                f'CATEGORIES:{_ical_text(item.category)}',
+                'TRANSP:TRANSPARENT',
+                'END:VEVENT'
+            ]
+    lines.append('END:VCALENDAR')
+    return ''.join(_ical_fold(line) + '\r\n' for line in lines)
+
+
+def render_rss_items(items, updated):
+    """RSS 2.0 via the streaming writer, for filtered subsets of the feed"""
+    return render_rss([item.model for item in items], build_date=rfc822_date(int(updated.timestamp())))
+
+
+FORMATS = {
+    'rss': (render_rss_items, 'application/rss+xml; charset=utf-8'),
+    'atom': (render_atom, 'application/atom+xml; charset=utf-8'),
+    'json': (render_json_feed, 'application/feed+json; charset=utf-8'),
+    'ics': (render_ical, 'text/calendar; charset=utf-8')
+}
+
+
+class LazyFeeds:
+    """Per-snapshot items and rendered formats, each built on first use"""
+
+    def __init__(self, data, updated_at=None, index=None):
+        self.data = data
+        self.updated_at = updated_at or datetime.now(timezone.utc)
+        self.index = index if index is not None else ModelIndex(data)
+        self._items = None
+        self._responses = {}
+        self._filtered = OrderedDict()
+        self._filtered_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def items(self):
+        if self._items is None:
+            with self._lock:
+                if self._items is None:
+                    self._items = build_items(self.data)
+        return self._items
+
+    def _render(self, name, items):
+        render, content_type = FORMATS[name]
+        with RENDER_SECONDS.time(feed=name):
+            body = render(items, self.updated_at)
+        return CachedResponse(body, content_type, self.updated_at)
+
+    def response(self, name):
+        """CachedResponse for format ``name``, rendering it on first request"""
+        cached = self._responses.get(name)
+        if cached is not None:
+            return cached
+        items = self.items
+        with self._lock:
+            cached = self._responses.get(name)
+            if cached is None:
+                cached = self._responses[name] = self._render(name, items)
+        return cached
+
+    def filtered_response(self, name, query):
+        """CachedResponse for format ``name`` restricted to the models ``query`` selects"""
+        key = (name, query.filter_key)
+        with self._lock:
+            cached = self._filtered.get(key)
+            if cached is not None:
+                self._filtered.move_to_end(key)
+                return cached
+
+        positions = self.index.matching(query)
+        items = self.items
+        if positions is not None:
+            # Keep the feed's own (upstream table) order
+            items = [items[position] for position in sorted(positions)]
+        cached = self._render(name, items)
+
+        with self._lock:
+            previous = self._filtered.pop(key, None)
+            if previous is not None:
+                self._filtered_bytes -= previous.size
+            self._filtered[key] = cached
+            self._filtered_bytes += cached.size
+            while self._filtered_bytes > FILTERED_CACHE_BYTES and len(self._filtered) > 1:
+                _, evicted = self._filtered.popitem(last=False)
+                self._filtered_bytes -= evicted.size
+        return cached
@@ -0,0 +1,57 @@
+"""
+Gunicorn settings (picked up automatically from the working directory).
+
+/api/events keeps a connection open per dashboard tab, which would pin a
+sync worker each. Use gevent when it is installed, so one worker serves
+thousands of idle streams, and fall back to threaded workers otherwise.
+Override with GUNICORN_WORKER_CLASS, WEB_CONCURRENCY (workers),
+GUNICORN_THREADS and GUNICORN_WORKER_CONNECTIONS.
+
+The app is preloaded: the master imports it, warm-starting from the last
+good snapshot, and forked workers share that memory copy-on-write instead
+of each loading their own. Background threads start in each worker as it
+begins serving. gevent workers would monkey-patch only after the fork, too
+late for a preloaded app, so the master patches here, before it imports
+the app; its own loop then runs on gevent too. eventlet is not patched and
+imports the app in each worker. GUNICORN_PRELOAD=0 or 1 overrides this
+(with preloading, a HUP no longer reloads the code).
+"""
+import gc
+import importlib.util
+import os
+
+if os.environ.get('GUNICORN_WORKER_CLASS'):
+    worker_class = os.environ['GUNICORN_WORKER_CLASS']
+elif importlib.util.find_spec('gevent') is not None:
+    worker_class = 'gevent'
+else:
+    worker_class = 'gthread'
+
+if worker_class == 'gevent':
+    from gevent import monkey
+
+    monkey.patch_all()
+
+# gevent: concurrent connections per worker
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+# gthread: threads per worker, each holding one connection (gunicorn turns
+# sync workers into gthread ones when threads > 1, so only set it there)
+threads = int(os.environ.get('GUNICORN_THREADS', 32)) if worker_class == 'gthread' else 1
+
+if os.environ.get('GUNICORN_PRELOAD'):
+    preload_app = os.environ['GUNICORN_PRELOAD'] != '0'
+else:
+    preload_app = worker_class != 'eventlet'
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # Keep the collector off everything loaded so far; collections in the
+        # workers would otherwise write to those objects and un-share their pages
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    from rss_server import start_background_tasks
+
+    start_background_tasks()
@@ -0,0 +1,202 @@
+"""
+Persistent, indexed history of scraped snapshots.
+
+Replaces the ever-growing ``ibm_deprecated_models_<timestamp>.{csv,json,xlsx}``
+files. Every published snapshot is recorded as a capture (a timestamp pointing
+at a content hash); identical snapshots share one stored copy. Indexes make
+"latest snapshot", "state as of a date" and "history of a model" single index
+lookups instead of directory scans.
+
+import_legacy_files() migrates the existing timestamped files.
+"""
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+from changes import model_key
+from db_connections import ThreadConnections
+
+LEGACY_PATTERN = 'ibm_deprecated_models_*.json'
+LEGACY_TIMESTAMP = re.compile(r'_(\d{8}_\d{6})\.json$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contents (
+    content_hash TEXT PRIMARY KEY,
+    models_count INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY,
+    captured_at REAL NOT NULL,
+    content_hash TEXT NOT NULL REFERENCES contents (content_hash),
+    origin TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS captures_by_time ON captures (captured_at);
+CREATE INDEX IF NOT EXISTS captures_by_content ON captures (content_hash, captured_at);
+CREATE TABLE IF NOT EXISTS model_records (
+    content_hash TEXT NOT NULL REFERENCES contents (content_hash),
+    model_key TEXT NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (content_hash, model_key)
+);
+CREATE INDEX IF NOT EXISTS model_records_by_model ON model_records (model_key);
+"""
+
+
+def snapshot_hash(data):
+    """Content hash of a list of records, independent of key order"""
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _epoch(when):
+    if when is None:
+        return time.time()
+    if isinstance(when, datetime):
+        return when.timestamp()
+    return float(when)
+
+
+class HistoryStore:
+    """SQLite-backed snapshot history"""
+
+    def __init__(self, path):
+        self.path = path
+        self._connections = ThreadConnections(path)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        return self._connections.get()
+
+    def record(self, data, captured_at=None, origin='scrape'):
+        """
+        Record a snapshot. Returns ``(content_hash, is_new_content)``; the
+        records themselves are only stored the first time a hash is seen.
+        """
+        digest = snapshot_hash(data)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO contents (content_hash, models_count, payload) VALUES (?, ?, ?)",
+                (digest, len(data), json.dumps(data, ensure_ascii=False))
+            ).rowcount == 1
+            if inserted:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO model_records (content_hash, model_key, record) VALUES (?, ?, ?)",
+                    [(digest, model_key(record), json.dumps(record, ensure_ascii=False)) for record in data]
+                )
+            conn.execute(
+                "INSERT INTO captures (captured_at, content_hash, origin) VALUES (?, ?, ?)",
+                (_epoch(captured_at), digest, origin)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return digest, inserted
+
+    def has_capture(self, captured_at, origin):
+        """True if a capture with this time and origin was already recorded"""
+        return self._connect().execute(
+            "SELECT 1 FROM captures WHERE captured_at = ? AND origin = ?", (_epoch(captured_at), origin)
+        ).fetchone() is not None
+
+    def _snapshot_at(self, where, params):
+        row = self._connect().execute(
+            f"SELECT c.captured_at, s.payload FROM captures c JOIN contents s USING (content_hash) "
+            f"{where} ORDER BY c.captured_at DESC LIMIT 1",
+            params
+        ).fetchone()
+        if row is None:
+            return None
+        return datetime.fromtimestamp(row[0]), json.loads(row[1])
+
+    def latest(self):
+        """Return ``(captured_at, data)`` of the newest capture, or None"""
+        return self._snapshot_at("", ())
+
+    def as_of(self, when):
+        """Return ``(captured_at, data)`` as it was at ``when``, or None"""
+        return self._snapshot_at("WHERE c.captured_at <= ?", (_epoch(when),))
+
+    def captures(self, start=None, end=None):
+        """List ``(captured_at, content_hash, models_count)`` between two dates"""
+        rows = self._connect().execute(
+            "SELECT c.captured_at, c.content_hash, s.models_count FROM captures c JOIN contents s USING (content_hash) "
+            "WHERE c.captured_at >= ? AND c.captured_at <= ? ORDER BY c.captured_at",
+            (_epoch(start) if start is not None else 0, _epoch(end))
+        ).fetchall()
+        return [(datetime.fromtimestamp(at), digest, count) for at, digest, count in rows]
+
+    def iter_records(self, start=None, end=None):
+        """
+        Stream every model record of every capture between two dates, oldest
+        first, each with a 'captured_at' ISO timestamp. Rows come straight
+        from the cursor, so memory use does not grow with history size.
+        """
+        cursor = self._connect().execute(
+            "SELECT c.captured_at, m.record FROM captures c JOIN model_records m USING (content_hash) "
+            "WHERE c.captured_at >= ? AND c.captured_at <= ? ORDER BY c.captured_at, c.id",
+            (_epoch(start) if start is not None else 0, _epoch(end))
+        )
+        for captured_at, record in cursor:
+            yield dict(json.loads(record), captured_at=datetime.fromtimestamp(captured_at).isoformat())
+
+    def model_history(self, name):
+        """
+        Return the distinct versions of one model over time as a list of
+        ``{'first_seen': datetime, 'record': dict}``; a version with
+        ``record`` None means the model was absent from the table.
+
+        Only the captures listing the model are read, through the model
+        index, each with the capture that followed it: when that one does
+        not list the model, the model dropped out of the table there.
+        """
+        key = model_key({'foundation_model_name': name})
+        rows = self._connect().execute(
+            "SELECT c.captured_at, c.content_hash, m.record, n.captured_at, n.content_hash "
+            "FROM model_records m JOIN captures c USING (content_hash) "
+            "LEFT JOIN captures n ON n.id = ("
+            "    SELECT id FROM captures WHERE (captured_at, id) > (c.captured_at, c.id) "
+            "    ORDER BY captured_at, id LIMIT 1"
+            ") "
+            "WHERE m.model_key = ? ORDER BY c.captured_at, c.id",
+            (key,)
+        ).fetchall()
+        listed = {digest for _, digest, _, _, _ in rows}
+
+        history = []
+        for captured_at, _, record, next_at, next_digest in rows:
+            record = json.loads(record)
+            if not history or history[-1]['record'] != record:
+                history.append({'first_seen': datetime.fromtimestamp(captured_at), 'record': record})
+            if next_digest is not None and next_digest not in listed:
+                history.append({'first_seen': datetime.fromtimestamp(next_at), 'record': None})
+        return history
+
+    def import_legacy_files(self, directory='.', pattern=LEGACY_PATTERN):
+        """
+        Import timestamped JSON exports, oldest first, using the timestamp in
+        the file name as the capture time. Returns the number of files imported.
+        """
+        files = []
+        for path in glob.glob(os.path.join(directory, pattern)):
+            match = LEGACY_TIMESTAMP.search(path)
+            if match:
+                files.append((datetime.strptime(match.group(1), "%Y%m%d_%H%M%S"), path))
+
+        imported = 0
+        for captured_at, path in sorted(files):
+            if self.has_capture(captured_at, 'import:' + os.path.basename(path)):
+                continue  # Already migrated
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data:
+                self.record(data, captured_at, origin='import:' + os.path.basename(path))
+                imported += 1
+        return imported
@@ -0,0 +1,190 @@
+"""
+Minimal Prometheus metrics (text exposition format 0.0.4).
+
+Counters, gauges and histograms with labels, plus the application's metric
+definitions. Values are per process: under gunicorn every worker exposes its
+own series, and Prometheus aggregates them across scrapes of each worker as
+usual (add a ``pid``/instance label at the scrape config if needed).
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return str(value)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines += self._samples()
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self._function = None
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function):
+        """Compute the (unlabelled) value when metrics are collected"""
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            value = self._function()
+            return [] if value is None else [f"{self.name} {_format_value(value)}"]
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][index] += 1
+                    break
+            state['sum'] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with-block in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self):
+        with self._lock:
+            items = [(key, list(state['counts']), state['sum']) for key, state in self._values.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self):
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+# Scrape pipeline
+UPSTREAM_FETCH_SECONDS = Histogram(
+    'wxnotif_upstream_fetch_seconds', 'Time to fetch an upstream lifecycle page', ['source'])
+UPSTREAM_BYTES = Histogram(
+    'wxnotif_upstream_response_bytes', 'Size of upstream lifecycle page responses', ['source'],
+    buckets=BYTES_BUCKETS)
+PARSE_SECONDS = Histogram(
+    'wxnotif_parse_seconds', 'Time to parse an HTML page into a document tree', ['backend'])
+EXTRACTION_SECONDS = Histogram(
+    'wxnotif_extraction_seconds', 'Time to locate tables and extract model records', ['backend'])
+RENDER_SECONDS = Histogram(
+    'wxnotif_render_seconds', 'Time to render a feed for a snapshot', ['feed'])
+UPSTREAM_RETRIES = Counter(
+    'wxnotif_upstream_retries_total', 'Upstream fetch attempts retried after a transient failure', ['source'])
+CIRCUIT_OPEN = Gauge(
+    'wxnotif_upstream_circuit_open', '1 while the circuit breaker for a source is open', ['source'])
+SCRAPES = Counter(
+    'wxnotif_scrapes_total', 'Refresh attempts by result (changed, unchanged, failure)', ['result'])
+
+# Notifications
+NOTIFICATIONS = Counter(
+    'wxnotif_notifications_total', 'Notification deliveries by channel and result (delivered, retried, failed)',
+    ['channel', 'result'])
+NOTIFY_SECONDS = Histogram(
+    'wxnotif_notification_seconds', 'Time to deliver one webhook request or SMTP batch', ['channel'])
+NOTIFY_QUEUE = Gauge('wxnotif_notification_queue', 'Notification deliveries waiting to be sent or retried')
+
+# HTTP
+REQUEST_SECONDS = Histogram(
+    'wxnotif_http_request_duration_seconds', 'HTTP request latency', ['route', 'method'])
+REQUESTS = Counter(
+    'wxnotif_http_requests_total', 'HTTP requests by route and status code', ['route', 'method', 'status'])
+
+# Snapshot
+SNAPSHOT_AGE = Gauge('wxnotif_snapshot_age_seconds', 'Seconds since the served snapshot was last verified upstream')
+MODELS = Gauge('wxnotif_models', 'Number of models in the served snapshot')
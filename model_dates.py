@@ -0,0 +1,89 @@
+"""
+Lifecycle date normalization.
+
+The lifecycle tables give dates as free text ('3 February 2025', '–' for
+none). normalize_records() parses them once at ingest and stores the typed
+values on each record under 'dates':
+
+    {'withdrawal_date': {'iso': '2025-02-03', 'epoch': 1738540800}, ...}
+
+with None for empty or unparseable cells. Raw strings repeat heavily between
+models and between scrapes, so parsing is memoized on the raw string.
+Renderers, queries and alerts read the values through date_value() and
+date_epoch(), which fall back to the memoized parser for records that were
+never normalized (e.g. snapshots published by an older version).
+"""
+from datetime import datetime, timezone
+from functools import lru_cache
+
+DATE_FIELDS = ('availability_date', 'deprecation_date', 'withdrawal_date')
+
+# Placeholder IBM uses for empty cells
+MISSING = '–'
+
+DATE_FORMATS = (
+    '%d %B %Y',
+    '%d %b %Y',
+    '%d %B, %Y',
+    '%B %d, %Y',
+    '%b %d, %Y',
+    '%Y-%m-%d',
+    '%B %Y',
+    '%b %Y'
+)
+
+
+@lru_cache(maxsize=4096)
+def parse_date(raw):
+    """
+    Parse a table date. Returns a shared ``{'iso': ..., 'epoch': ...}`` dict
+    (epoch at 00:00 UTC; do not mutate it), or None for empty cells and
+    anything without a year - a missing year is never guessed.
+    """
+    text = ' '.join((raw or '').split())
+    if not text or text == MISSING:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+        return {'iso': parsed.date().isoformat(), 'epoch': int(parsed.timestamp())}
+    return None
+
+
+def normalize_record(record):
+    """Attach parsed dates to one record (in place) and return it"""
+    record['dates'] = {field: _copy(parse_date(record.get(field))) for field in DATE_FIELDS}
+    return record
+
+
+def normalize_records(records):
+    """Attach parsed dates to every record (in place) and return the list"""
+    for record in records or []:
+        normalize_record(record)
+    return records
+
+
+def _copy(value):
+    # Records are mutable and end up in JSON and pickles; never hand out
+    # the memoized dict itself
+    return dict(value) if value is not None else None
+
+
+def date_value(record, field):
+    """The normalized ``{'iso', 'epoch'}`` value of a date field, or None"""
+    dates = record.get('dates')
+    if dates is not None and field in dates:
+        return dates[field]
+    return parse_date(record.get(field))
+
+
+def date_epoch(record, field):
+    value = date_value(record, field)
+    return value['epoch'] if value is not None else None
+
+
+def date_iso(record, field):
+    value = date_value(record, field)
+    return value['iso'] if value is not None else None
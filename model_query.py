@@ -0,0 +1,345 @@
+"""
+Filtering, sorting and pagination for /api/data.
+
+A ModelIndex is built once per installed snapshot: lower-cased names sorted
+for prefix lookups, every date column as a sorted array searched with
+bisect, the with/without alternative partitions and one sort order per sort
+key. A request is normalized into a ModelQuery whose key identifies it
+regardless of parameter order or spelling, answered from the indexes and the
+rendered response cached on the index, so identical queries against the same
+snapshot are served without touching the data again.
+
+    /api/data?prefix=granite&withdrawal_from=2025-01-01&withdrawal_to=2025-06-30
+    /api/data?has_alternative=false&sort=-withdrawal_date&limit=20&fields=foundation_model_name,withdrawal_date
+    /api/data?sort=name&limit=50&cursor=<next_cursor from the previous page>
+
+The filter parameters also select subsets of the feeds, e.g.
+/feed.xml?model=granite*&withdrawal_within=90d&has_alternative=false.
+Feeds read only those (filter_args()); sort, limit, cursor and fields belong
+to /api/data paging and are ignored on feed URLs.
+"""
+import base64
+import binascii
+import json
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from fnmatch import fnmatchcase
+
+from exporters import EXPORT_FIELDS
+from model_dates import DATE_FIELDS, MISSING, date_epoch
+
+NAME_FIELD = 'foundation_model_name'
+ALTERNATIVE_FIELD = 'recommended_alternative'
+SORT_KEYS = ('name',) + DATE_FIELDS
+# Fields fields= may project; 'dates' holds the normalized date values
+QUERY_FIELDS = EXPORT_FIELDS + ('dates',)
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_CACHED_QUERIES = 256
+
+# Parameters that select models (for /api/data and the feeds)
+FILTER_PARAMS = {'name', 'prefix', 'model', 'has_alternative'} | {
+    f"{field[:-len('_date')]}_{bound}" for field in DATE_FIELDS for bound in ('from', 'to', 'within')
+}
+# Parameters that turn /api/data into a query; anything else is ignored
+QUERY_PARAMS = FILTER_PARAMS | {'sort', 'limit', 'cursor', 'fields'}
+
+# Relative windows: 90d, 12w or a plain number of days
+WITHIN_PATTERN = re.compile(r'^(\d{1,4})\s*([dw]?)$')
+GLOB_CHARACTERS = re.compile(r'[*?\[]')
+
+
+class QueryError(ValueError):
+    """Invalid query parameters (reported as 400)"""
+
+
+def has_alternative(record):
+    value = (record.get(ALTERNATIVE_FIELD) or '').strip()
+    return bool(value) and value != MISSING
+
+
+def _parse_bool(name, value):
+    lowered = value.strip().lower()
+    if lowered in ('true', '1', 'yes'):
+        return True
+    if lowered in ('false', '0', 'no'):
+        return False
+    raise QueryError(f"{name} must be true or false")
+
+
+def _parse_iso_date(name, value):
+    """An ISO date parameter as the epoch of its 00:00 UTC, like model_dates"""
+    try:
+        parsed = date.fromisoformat(value.strip())
+    except ValueError:
+        raise QueryError(f"{name} must be an ISO 8601 date (YYYY-MM-DD)")
+    return int(datetime(parsed.year, parsed.month, parsed.day, tzinfo=timezone.utc).timestamp())
+
+
+def _parse_within(name, value, today):
+    """A relative window like '90d' as an inclusive epoch range from today"""
+    match = WITHIN_PATTERN.match(value.strip().lower())
+    if not match:
+        raise QueryError(f"{name} must be a number of days or weeks, e.g. 90d or 12w")
+    days = int(match.group(1)) * (7 if match.group(2) == 'w' else 1)
+    start = datetime(today.year, today.month, today.day, tzinfo=timezone.utc)
+    return int(start.timestamp()), int((start + timedelta(days=days)).timestamp())
+
+
+def encode_cursor(sort, key):
+    payload = json.dumps([sort, list(key)], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        decoded = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        # Anything but [sort, [scalar, ...]] was not made by encode_cursor()
+        if not isinstance(decoded, list) or len(decoded) != 2:
+            raise ValueError("not a [sort, key] pair")
+        cursor_sort, key = decoded
+        if not isinstance(key, list) or not all(isinstance(part, (str, int, float)) for part in key):
+            raise ValueError("key is not a list of scalars")
+        key = tuple(key)
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise QueryError("Invalid cursor")
+    if cursor_sort != sort:
+        raise QueryError("cursor belongs to a different sort order")
+    return key
+
+
+class ModelQuery:
+    """A validated, normalized /api/data query"""
+
+    def __init__(self, args, today=None):
+        self.name = (args.get('name') or '').strip().lower() or None
+        self.prefix = (args.get('prefix') or '').strip().lower() or None
+        # Comma-separated shell-style patterns, any of which may match
+        patterns = {pattern.strip().lower() for pattern in (args.get('model') or '').split(',')}
+        self.models = tuple(sorted(pattern for pattern in patterns if pattern)) or None
+
+        value = args.get('has_alternative')
+        self.has_alternative = _parse_bool('has_alternative', value) if value not in (None, '') else None
+
+        # Inclusive epoch ranges per date column. Relative windows are
+        # resolved against today's date, so their cache keys roll over daily
+        today = today or datetime.now(timezone.utc).date()
+        self.date_ranges = []
+        for field in DATE_FIELDS:
+            stem = field[:-len('_date')]
+            low, high = args.get(f"{stem}_from"), args.get(f"{stem}_to")
+            if low or high:
+                low = _parse_iso_date(f"{stem}_from", low) if low else None
+                high = _parse_iso_date(f"{stem}_to", high) if high else None
+                if low is not None and high is not None and low > high:
+                    raise QueryError(f"{stem}_from is after {stem}_to")
+                self.date_ranges.append((field, low, high))
+            within = args.get(f"{stem}_within")
+            if within:
+                self.date_ranges.append((field,) + _parse_within(f"{stem}_within", within, today))
+
+        self.sort = (args.get('sort') or 'name').strip()
+        if self.sort.lstrip('-') not in SORT_KEYS:
+            raise QueryError(f"sort must be one of {', '.join(SORT_KEYS)} (prefix with - for descending)")
+
+        try:
+            self.limit = int(args.get('limit') or DEFAULT_LIMIT)
+        except ValueError:
+            raise QueryError("limit must be an integer")
+        if not 1 <= self.limit <= MAX_LIMIT:
+            raise QueryError(f"limit must be between 1 and {MAX_LIMIT}")
+
+        cursor = args.get('cursor')
+        self.cursor = decode_cursor(cursor, self.sort) if cursor else None
+
+        fields = [field.strip() for field in (args.get('fields') or '').split(',') if field.strip()]
+        unknown = [field for field in fields if field not in QUERY_FIELDS]
+        if unknown:
+            raise QueryError(f"Unknown fields: {', '.join(unknown)}")
+        self.fields = tuple(dict.fromkeys(fields)) or None
+
+    @property
+    def filter_key(self):
+        """Canonical form of the filters alone; equal for queries selecting the same models"""
+        return (self.name, self.prefix, self.models, self.has_alternative, tuple(self.date_ranges))
+
+    @property
+    def key(self):
+        """Cache key; equal for queries that must return the same response"""
+        return self.filter_key + (self.sort, self.limit, self.cursor, self.fields)
+
+
+def is_query(args):
+    """True if the request asks for anything but the full data set"""
+    return any(param in args for param in QUERY_PARAMS)
+
+
+def has_filters(args):
+    """True if the request selects a subset of the models"""
+    return any(args.get(param) for param in FILTER_PARAMS)
+
+
+def filter_args(args):
+    """Only the filter parameters of ``args``, for building a feed's ModelQuery"""
+    return {param: args.get(param) for param in FILTER_PARAMS if param in args}
+
+
+class SortOrder:
+    """Record positions sorted by a key, with the keys kept for bisecting cursors"""
+
+    def __init__(self, keyed_positions, descending):
+        keyed_positions.sort()
+        self.keys = [key for key, _ in keyed_positions]
+        self.positions = [position for _, position in keyed_positions]
+        self.descending = descending
+
+    def walk(self, after=None):
+        """Yield (key, position) in order, starting after the cursor key"""
+        try:
+            if after is not None:
+                bisect_left(self.keys[:1], after)
+        except TypeError:
+            raise QueryError("Invalid cursor")
+        if self.descending:
+            end = len(self.keys) if after is None else bisect_left(self.keys, after)
+            for index in range(end - 1, -1, -1):
+                yield self.keys[index], self.positions[index]
+        else:
+            start = 0 if after is None else bisect_right(self.keys, after)
+            for index in range(start, len(self.keys)):
+                yield self.keys[index], self.positions[index]
+
+
+class ModelIndex:
+    """Read-only indexes over one snapshot's records"""
+
+    def __init__(self, data):
+        self.data = data or []
+        self.names = [(record.get(NAME_FIELD) or '').lower() for record in self.data]
+
+        # Prefix lookups: bisect over the sorted lower-cased names
+        by_name = sorted((name, position) for position, name in enumerate(self.names))
+        self.sorted_names = [name for name, _ in by_name]
+        self.sorted_name_positions = [position for _, position in by_name]
+
+        # Range lookups: one sorted epoch array per date column, from the
+        # dates normalized at ingest
+        self.epochs = {}
+        self.date_index = {}
+        for field in DATE_FIELDS:
+            epochs = [date_epoch(record, field) for record in self.data]
+            self.epochs[field] = epochs
+            dated = sorted((epoch, position) for position, epoch in enumerate(epochs) if epoch is not None)
+            self.date_index[field] = ([epoch for epoch, _ in dated], [position for _, position in dated])
+
+        with_alternative = frozenset(position for position, record in enumerate(self.data) if has_alternative(record))
+        self.alternative = {
+            True: with_alternative,
+            False: frozenset(range(len(self.data))) - with_alternative
+        }
+
+        # Sort orders; undated records come last in either direction, and
+        # name then position break ties so cursor keys are unique
+        self.sort_orders = {
+            'name': SortOrder([((name, position), position) for position, name in enumerate(self.names)], False),
+            '-name': SortOrder([((name, position), position) for position, name in enumerate(self.names)], True)
+        }
+        for field in DATE_FIELDS:
+            epochs = self.epochs[field]
+            self.sort_orders[field] = SortOrder([
+                ((epoch is None, epoch or 0, self.names[position], position), position)
+                for position, epoch in enumerate(epochs)
+            ], False)
+            self.sort_orders['-' + field] = SortOrder([
+                ((epoch is not None, epoch or 0, self.names[position], position), position)
+                for position, epoch in enumerate(epochs)
+            ], True)
+
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prefix_positions(self, prefix):
+        start = bisect_left(self.sorted_names, prefix)
+        end = bisect_left(self.sorted_names, prefix + '\uffff', start)
+        return set(self.sorted_name_positions[start:end])
+
+    def _glob_positions(self, patterns):
+        positions = set()
+        for pattern in patterns:
+            # Narrow to the pattern's literal prefix with the name index
+            literal = GLOB_CHARACTERS.split(pattern, 1)[0]
+            candidates = self._prefix_positions(literal) if literal else range(len(self.data))
+            positions.update(position for position in candidates if fnmatchcase(self.names[position], pattern))
+        return positions
+
+    def _range_positions(self, field, low, high):
+        epochs, positions = self.date_index[field]
+        start = 0 if low is None else bisect_left(epochs, low)
+        end = len(epochs) if high is None else bisect_right(epochs, high)
+        return set(positions[start:end])
+
+    def matching(self, query):
+        """Positions matching every filter of ``query``, or None for all records"""
+        candidates = []
+        if query.prefix:
+            candidates.append(self._prefix_positions(query.prefix))
+        if query.models:
+            candidates.append(self._glob_positions(query.models))
+        for field, low, high in query.date_ranges:
+            candidates.append(self._range_positions(field, low, high))
+        if query.has_alternative is not None:
+            candidates.append(self.alternative[query.has_alternative])
+        if not candidates and not query.name:
+            return None
+
+        candidates.sort(key=len)
+        matches = set(candidates[0]) if candidates else set(range(len(self.data)))
+        for other in candidates[1:]:
+            matches &= other
+        if query.name:
+            # No index serves arbitrary substrings; scan only what is left
+            matches = {position for position in matches if query.name in self.names[position]}
+        return matches
+
+    def execute(self, query):
+        """Return (total matches, page of records, next cursor or None)"""
+        matches = self.matching(query)
+        total = len(self.data) if matches is None else len(matches)
+
+        page = []
+        last_key = None
+        has_more = False
+        for key, position in self.sort_orders[query.sort].walk(query.cursor):
+            if matches is not None and position not in matches:
+                continue
+            if len(page) == query.limit:
+                has_more = True
+                break
+            page.append(self.data[position])
+            last_key = key
+
+        if query.fields:
+            page = [{field: record.get(field) for field in query.fields} for record in page]
+        next_cursor = encode_cursor(query.sort, last_key) if has_more else None
+        return total, page, next_cursor
+
+    def cached_response(self, query, render):
+        """Return the response for ``query``, rendering it with ``render`` on a miss"""
+        key = query.key
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self._responses.move_to_end(key)
+                return response
+
+        response = render(*self.execute(query))
+        with self._lock:
+            self._responses[key] = response
+            while len(self._responses) > MAX_CACHED_QUERIES:
+                self._responses.popitem(last=False)
+        return response
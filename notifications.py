@@ -0,0 +1,610 @@
+"""
+Push notifications of lifecycle changes to webhooks and email.
+
+Each snapshot diff becomes a batch of change events, queued for every
+subscriber in a SQLite database (NOTIFY_DB). Deliveries therefore survive
+restarts and are shared by all gunicorn workers:
+
+- webhook subscribers get one JSON POST per batch. When the subscriber has a
+  secret, the body is signed with HMAC-SHA256 (X-WxNotif-Signature).
+- email subscribers waiting for the same batch are grouped, up to
+  SMTP_BATCH_RECIPIENTS per message, and each group is sent over one SMTP
+  connection
+
+A Notifier thread in each process claims due deliveries under a lease and
+sends them on a bounded thread pool. A slow or dead endpoint therefore ties
+up one pool thread until its timeout while the others keep going.
+
+Transient failures are retried with jittered exponential backoff, up to
+NOTIFY_ATTEMPTS. They are connection errors, timeouts, HTTP 429/5xx and
+SMTP 4xx. Events that arrive while a subscriber's delivery is waiting are
+merged into it rather than queued separately. Permanent failures are kept,
+with their error, for inspection.
+
+If a worker dies mid-delivery, its lease expires and the delivery is sent
+again. Delivery is thus at least once; event ids let receivers deduplicate.
+
+enqueue_once() remembers event ids, so an event that several workers or a
+restarted process offer again (deadline alerts) is queued only once.
+
+Subscribers can be registered in two ways:
+
+- the JSON file named by NOTIFY_SUBSCRIBERS_FILE, a list of
+  ``{"webhook": url, "secret": ...}`` or ``{"email": address}``
+- the command line:
+
+    python notifications.py add webhook https://example.com/hook [--secret S]
+    python notifications.py add email ops@example.com
+    python notifications.py list
+    python notifications.py status
+    python notifications.py send       # deliver everything due, then exit
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import smtplib
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.message import EmailMessage
+from email.utils import formatdate
+
+from changes import model_guid
+from db_connections import ThreadConnections
+from metrics import NOTIFICATIONS, NOTIFY_SECONDS
+from resilience import RetryPolicy, is_retryable
+from rss_writer import FEED_LINK, FIELD_LABELS, change_title
+
+CHANNELS = ('webhook', 'email')
+
+# Parallel deliveries per process, and the per-request timeout
+NOTIFY_WORKERS = int(os.environ.get('NOTIFY_WORKERS', 32))
+NOTIFY_TIMEOUT_SECONDS = float(os.environ.get('NOTIFY_TIMEOUT_SECONDS', 10))
+
+RETRY_POLICY = RetryPolicy(
+    attempts=int(os.environ.get('NOTIFY_ATTEMPTS', 8)),
+    base_delay=float(os.environ.get('NOTIFY_BACKOFF_SECONDS', 30)),
+    max_delay=float(os.environ.get('NOTIFY_BACKOFF_MAX_SECONDS', 3600))
+)
+
+SMTP_HOST = os.environ.get('SMTP_HOST')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', 25))
+SMTP_USERNAME = os.environ.get('SMTP_USERNAME')
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+SMTP_STARTTLS = os.environ.get('SMTP_STARTTLS', '').lower() in ('1', 'true', 'yes')
+SMTP_BATCH_RECIPIENTS = int(os.environ.get('SMTP_BATCH_RECIPIENTS', 50))
+NOTIFY_FROM = os.environ.get('NOTIFY_FROM', 'wxnotif@localhost')
+
+USER_AGENT = 'WxNotif-Webhook/1.0'
+
+# A pending delivery absorbs new events up to this many
+MAX_BATCH_EVENTS = 500
+# Seconds between queue polls when nothing wakes the dispatcher
+POLL_INTERVAL = 5.0
+# Permanently failed deliveries kept for inspection
+MAX_FAILED = 1000
+# How long enqueue_once() remembers an event id
+SENT_EVENTS_RETENTION = 400 * 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscribers (
+    id INTEGER PRIMARY KEY,
+    channel TEXT NOT NULL,
+    target TEXT NOT NULL,
+    secret TEXT,
+    created_at REAL NOT NULL,
+    UNIQUE (channel, target)
+);
+CREATE TABLE IF NOT EXISTS deliveries (
+    id INTEGER PRIMARY KEY,
+    subscriber_id INTEGER NOT NULL REFERENCES subscribers (id),
+    events TEXT NOT NULL,
+    events_count INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    lease_until REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS deliveries_due ON deliveries (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS deliveries_by_subscriber ON deliveries (subscriber_id, status);
+CREATE TABLE IF NOT EXISTS sent_events (
+    id TEXT PRIMARY KEY,
+    sent_at REAL NOT NULL
+);
+"""
+
+Delivery = namedtuple('Delivery', 'id channel target secret events events_count attempts')
+
+
+class DeliveryError(Exception):
+    """A delivery was refused; ``retryable`` says whether trying again may help"""
+
+    def __init__(self, message, retryable):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def delivery_retryable(error):
+    if isinstance(error, DeliveryError):
+        return error.retryable
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return is_retryable(error)
+
+
+def event_payload(event):
+    """JSON-ready form of a change event from changes.diff_events()"""
+    model = event['model']
+    detected_at = event['detected_at']
+    return {
+        'id': event['id'],
+        'kind': event['kind'],
+        'title': change_title(event),
+        'model': model['foundation_model_name'],
+        'guid': model_guid(model),
+        'fields': event['fields'],
+        'detected_at': detected_at.isoformat() if isinstance(detected_at, datetime) else detected_at,
+        'record': model
+    }
+
+
+def email_text(events):
+    lines = []
+    for event in events:
+        lines.append(event['title'])
+        for field, (old, new) in event['fields'].items():
+            lines.append(f"    {FIELD_LABELS.get(field, field)}: {old or '–'} → {new or '–'}")
+    lines += ['', f"Lifecycle page: {FEED_LINK}", '']
+    return '\n'.join(lines)
+
+
+def email_message(events, sender=NOTIFY_FROM):
+    """One message for a batch of events; recipients go in the envelope only"""
+    message = EmailMessage()
+    if len(events) == 1:
+        message['Subject'] = f"[WxNotif] {events[0]['title']}"
+    else:
+        message['Subject'] = f"[WxNotif] {len(events)} foundation model lifecycle changes"
+    message['From'] = sender
+    message['To'] = sender
+    message['Date'] = formatdate(usegmt=True)
+    message.set_content(email_text(events))
+    return message
+
+
+def webhook_signature(secret, body):
+    return 'sha256=' + hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+
+
+class NotificationStore:
+    """SQLite-backed subscribers and delivery queue"""
+
+    def __init__(self, path):
+        self.path = path
+        self._connections = ThreadConnections(path)
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        return self._connections.get()
+
+    def add_subscriber(self, channel, target, secret=None):
+        """Register (or update the secret of) a subscriber; returns its id"""
+        if channel not in CHANNELS:
+            raise ValueError(f"Unknown channel {channel!r}; expected one of {', '.join(CHANNELS)}")
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO subscribers (channel, target, secret, created_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (channel, target) DO UPDATE SET secret = excluded.secret",
+            (channel, target, secret, time.time())
+        )
+        return conn.execute(
+            "SELECT id FROM subscribers WHERE channel = ? AND target = ?", (channel, target)
+        ).fetchone()[0]
+
+    def remove_subscriber(self, channel, target):
+        """Unregister a subscriber and drop its queued deliveries"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id FROM subscribers WHERE channel = ? AND target = ?", (channel, target)
+            ).fetchone()
+            if row is not None:
+                conn.execute("DELETE FROM deliveries WHERE subscriber_id = ?", row)
+                conn.execute("DELETE FROM subscribers WHERE id = ?", row)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return row is not None
+
+    def subscribers(self):
+        return [
+            {'id': row[0], 'channel': row[1], 'target': row[2], 'signed': row[3] is not None}
+            for row in self._connect().execute("SELECT id, channel, target, secret FROM subscribers ORDER BY id")
+        ]
+
+    def load_file(self, path):
+        """Register the subscribers listed in a NOTIFY_SUBSCRIBERS_FILE; returns how many"""
+        if not path:
+            return 0
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        for entry in entries:
+            channel = next((name for name in CHANNELS if name in entry), None)
+            if channel is None:
+                raise ValueError(f"Subscriber entry needs a 'webhook' or 'email' key: {entry!r}")
+            self.add_subscriber(channel, entry[channel], entry.get('secret'))
+        return len(entries)
+
+    def enqueue(self, events):
+        """
+        Queue ``events`` (payload dicts) for every subscriber, merging them
+        into a subscriber's delivery that is still waiting to be sent.
+        Returns the number of deliveries created or extended.
+        """
+        if not events:
+            return 0
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            queued = self._enqueue(conn, events)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return queued
+
+    def enqueue_once(self, events):
+        """
+        Like enqueue(), but an event id is only ever queued once, however
+        many processes offer it and across restarts. Returns the events that
+        were new.
+        """
+        if not events:
+            return []
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            new = [
+                event for event in events
+                if conn.execute("INSERT OR IGNORE INTO sent_events (id, sent_at) VALUES (?, ?)",
+                                (event['id'], now)).rowcount == 1
+            ]
+            conn.execute("DELETE FROM sent_events WHERE sent_at < ?", (now - SENT_EVENTS_RETENTION,))
+            if new:
+                self._enqueue(conn, new)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return new
+
+    def _enqueue(self, conn, events):
+        # Caller holds the write transaction
+        now = time.time()
+        encoded = json.dumps(events, ensure_ascii=False)
+        waiting = {
+            subscriber_id: (delivery_id, payload)
+            for delivery_id, subscriber_id, payload in conn.execute(
+                "SELECT id, subscriber_id, events FROM deliveries "
+                "WHERE status = 'pending' AND lease_until <= ? AND events_count + ? <= ?",
+                (now, len(events), MAX_BATCH_EVENTS)
+            )
+        }
+        inserts, updates = [], []
+        for (subscriber_id,) in conn.execute("SELECT id FROM subscribers"):
+            if subscriber_id in waiting:
+                delivery_id, payload = waiting[subscriber_id]
+                merged = json.loads(payload) + events
+                updates.append((json.dumps(merged, ensure_ascii=False), len(merged), delivery_id))
+            else:
+                inserts.append((subscriber_id, encoded, len(events), now, now))
+        conn.executemany("UPDATE deliveries SET events = ?, events_count = ? WHERE id = ?", updates)
+        conn.executemany(
+            "INSERT INTO deliveries (subscriber_id, events, events_count, next_attempt_at, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            inserts
+        )
+        return len(inserts) + len(updates)
+
+    def claim(self, limit, lease_seconds):
+        """
+        Lease up to ``limit`` due deliveries to the caller. Leased rows are
+        invisible to other claims until they are settled or the lease expires.
+        """
+        now = time.time()
+        conn = self._connect()
+        due = ("FROM deliveries d JOIN subscribers s ON s.id = d.subscriber_id "
+               "WHERE d.status = 'pending' AND d.next_attempt_at <= ? AND d.lease_until <= ?")
+        # Idle polls stay read-only
+        if conn.execute(f"SELECT 1 {due} LIMIT 1", (now, now)).fetchone() is None:
+            return []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT d.id, s.channel, s.target, s.secret, d.events, d.events_count, d.attempts "
+                f"{due} ORDER BY d.next_attempt_at LIMIT ?",
+                (now, now, limit)
+            ).fetchall()
+            conn.executemany("UPDATE deliveries SET lease_until = ? WHERE id = ?",
+                             [(now + lease_seconds, row[0]) for row in rows])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [Delivery(*row) for row in rows]
+
+    def settle(self, delivered, retries, failures):
+        """
+        Record delivery outcomes in one transaction: ``delivered`` ids are
+        removed, ``retries`` ``(id, attempts, delay, error)`` are rescheduled
+        and ``failures`` ``(id, attempts, error)`` are kept as failed.
+        """
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("DELETE FROM deliveries WHERE id = ?", [(i,) for i in delivered])
+            conn.executemany(
+                "UPDATE deliveries SET attempts = ?, next_attempt_at = ?, lease_until = 0, last_error = ? WHERE id = ?",
+                [(attempts, now + delay, error, i) for i, attempts, delay, error in retries]
+            )
+            conn.executemany(
+                "UPDATE deliveries SET status = 'failed', attempts = ?, lease_until = 0, last_error = ? WHERE id = ?",
+                [(attempts, error, i) for i, attempts, error in failures]
+            )
+            if failures:
+                conn.execute(
+                    "DELETE FROM deliveries WHERE status = 'failed' AND id NOT IN "
+                    "(SELECT id FROM deliveries WHERE status = 'failed' ORDER BY id DESC LIMIT ?)",
+                    (MAX_FAILED,)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def counts(self):
+        """Deliveries by status, e.g. {'pending': 3, 'failed': 1}"""
+        return dict(self._connect().execute("SELECT status, COUNT(*) FROM deliveries GROUP BY status").fetchall())
+
+    def pending_count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM deliveries WHERE status = 'pending'").fetchone()[0]
+
+    def due_count(self):
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM deliveries WHERE status = 'pending' AND next_attempt_at <= ?", (time.time(),)
+        ).fetchone()[0]
+
+
+class Notifier:
+    """Sends queued deliveries on a bounded thread pool"""
+
+    def __init__(self, store, max_workers=NOTIFY_WORKERS, timeout=NOTIFY_TIMEOUT_SECONDS, retry_policy=RETRY_POLICY,
+                 smtp_host=SMTP_HOST, smtp_port=SMTP_PORT, poll_interval=POLL_INTERVAL):
+        self.store = store
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._in_flight = 0
+        self._outcomes = []
+        self._thread = None
+        self._pool = None
+        self._pid = None
+        self._sessions = threading.local()
+
+    def publish(self, change_events):
+        """Queue change events for every subscriber; returns the number of deliveries queued"""
+        queued = self.store.enqueue([event_payload(event) for event in change_events])
+        if queued:
+            self._kick()
+        return queued
+
+    def publish_once(self, payloads):
+        """Queue payloads whose ids were never queued before; returns those payloads"""
+        new = self.store.enqueue_once(payloads)
+        if new:
+            self._kick()
+        return new
+
+    def _kick(self):
+        self.start()
+        self._wake.set()
+
+    def start(self):
+        """Start the dispatcher thread in this process (idempotent)"""
+        with self._lock:
+            # Threads and pools do not survive fork(); each worker runs its own
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._in_flight = 0
+            self._outcomes = []
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='notify')
+            self._thread = threading.Thread(target=self._run, name='notifier', daemon=True)
+            self._thread.start()
+
+    def drain(self, timeout=None):
+        """Deliver until nothing is due or in flight; returns False on timeout"""
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            with self._lock:
+                in_flight = self._in_flight
+            if not in_flight and not self.store.due_count():
+                return True
+            self._wake.set()
+            time.sleep(0.01)
+        return False
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                self._settle()
+                self._dispatch()
+            except Exception as e:
+                print(f"❌ Error dispatching notifications: {e}")
+
+    def _dispatch(self):
+        with self._lock:
+            if self._in_flight >= self.max_workers:
+                return
+        # Claim enough to keep the pool busy and to fill SMTP batches; a
+        # lease covers the wait behind the tasks already queued
+        deliveries = self.store.claim(self.max_workers * 4, lease_seconds=self.timeout * 10)
+        emails = {}
+        for delivery in deliveries:
+            if delivery.channel == 'webhook':
+                self._submit(self._send_webhook, 'webhook', [delivery])
+            else:
+                emails.setdefault(delivery.events, []).append(delivery)
+        for group in emails.values():
+            for start in range(0, len(group), SMTP_BATCH_RECIPIENTS):
+                self._submit(self._send_email, 'email', group[start:start + SMTP_BATCH_RECIPIENTS])
+        if deliveries:
+            # More may be due beyond this claim
+            self._wake.set()
+
+    def _submit(self, send, channel, batch):
+        with self._lock:
+            self._in_flight += 1
+        self._pool.submit(self._deliver, send, channel, batch)
+
+    def _deliver(self, send, channel, batch):
+        try:
+            with NOTIFY_SECONDS.time(channel=channel):
+                failures = send(batch)
+        except Exception as e:
+            failures = {delivery.id: e for delivery in batch}
+        # Outcomes are written by the dispatcher thread, one transaction per
+        # round, instead of every pool thread contending for the database
+        with self._lock:
+            self._outcomes.append((channel, batch, failures))
+            self._in_flight -= 1
+        self._wake.set()
+
+    def _settle(self):
+        with self._lock:
+            outcomes, self._outcomes = self._outcomes, []
+        if not outcomes:
+            return
+        delivered, retries, failures = [], [], []
+        for channel, batch, errors in outcomes:
+            succeeded = [delivery.id for delivery in batch if delivery.id not in errors]
+            delivered += succeeded
+            if succeeded:
+                NOTIFICATIONS.inc(len(succeeded), channel=channel, result='delivered')
+            for delivery in batch:
+                error = errors.get(delivery.id)
+                if error is None:
+                    continue
+                attempts = delivery.attempts + 1
+                if delivery_retryable(error) and attempts < self.retry_policy.attempts:
+                    delay = self.retry_policy.delay(attempts)
+                    retries.append((delivery.id, attempts, delay, str(error)))
+                    NOTIFICATIONS.inc(channel=channel, result='retried')
+                    print(f"Retrying {channel} {delivery.target} in {delay:.0f} s (attempt {attempts} failed: {error})")
+                else:
+                    failures.append((delivery.id, attempts, str(error)))
+                    NOTIFICATIONS.inc(channel=channel, result='failed')
+                    print(f"❌ Giving up on {channel} {delivery.target} after {attempts} attempts: {error}")
+        self.store.settle(delivered, retries, failures)
+
+    def _session(self):
+        # One keep-alive session per pool thread
+        session = getattr(self._sessions, 'session', None)
+        if session is None:
+            import requests
+
+            session = self._sessions.session = requests.Session()
+            session.headers.update({'User-Agent': USER_AGENT, 'Content-Type': 'application/json'})
+        return session
+
+    def _send_webhook(self, batch):
+        delivery = batch[0]
+        body = json.dumps({
+            'delivery_id': delivery.id,
+            'events': json.loads(delivery.events)
+        }, ensure_ascii=False).encode('utf-8')
+        headers = {'X-WxNotif-Delivery': str(delivery.id)}
+        if delivery.secret:
+            headers['X-WxNotif-Signature'] = webhook_signature(delivery.secret, body)
+        response = self._session().post(delivery.target, data=body, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return {}
+
+    def _send_email(self, batch):
+        """Send one message to every recipient of ``batch``; returns refused recipients' errors"""
+        if not self.smtp_host:
+            raise DeliveryError("SMTP_HOST is not configured", retryable=False)
+        by_address = {delivery.target: delivery for delivery in batch}
+        message = email_message(json.loads(batch[0].events))
+        with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=self.timeout) as smtp:
+            if SMTP_STARTTLS:
+                smtp.starttls()
+            if SMTP_USERNAME:
+                smtp.login(SMTP_USERNAME, SMTP_PASSWORD or '')
+            try:
+                refused = smtp.send_message(message, from_addr=NOTIFY_FROM, to_addrs=list(by_address))
+            except smtplib.SMTPRecipientsRefused as e:
+                refused = e.recipients
+        return {
+            by_address[address].id: DeliveryError(
+                f"{code} {reply.decode('utf-8', 'replace') if isinstance(reply, bytes) else reply}",
+                retryable=400 <= code < 500
+            )
+            for address, (code, reply) in refused.items()
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage change notification subscribers and deliveries')
+    parser.add_argument('--db', default=os.environ.get('NOTIFY_DB', 'wxnotif_notify.db'))
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help='register a webhook or email subscriber')
+    add.add_argument('channel', choices=CHANNELS)
+    add.add_argument('target', help='webhook URL or email address')
+    add.add_argument('--secret', help='webhook signing secret')
+    remove = commands.add_parser('remove', help='unregister a subscriber')
+    remove.add_argument('channel', choices=CHANNELS)
+    remove.add_argument('target')
+    commands.add_parser('list', help='list subscribers')
+    commands.add_parser('status', help='count queued and failed deliveries')
+    commands.add_parser('send', help='deliver everything that is due, then exit')
+    args = parser.parse_args()
+
+    store = NotificationStore(args.db)
+    if args.command == 'add':
+        print(f"Subscriber {store.add_subscriber(args.channel, args.target, args.secret)}: {args.channel} {args.target}")
+    elif args.command == 'remove':
+        print("Removed" if store.remove_subscriber(args.channel, args.target) else "No such subscriber")
+    elif args.command == 'list':
+        for subscriber in store.subscribers():
+            signed = ' (signed)' if subscriber['signed'] else ''
+            print(f"{subscriber['id']:>6}  {subscriber['channel']:<8} {subscriber['target']}{signed}")
+    elif args.command == 'status':
+        print(json.dumps(store.counts()))
+    else:
+        Notifier(store).drain()
+        print(json.dumps(store.counts()))
+
+
+if __name__ == '__main__':
+    main()
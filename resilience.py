@@ -0,0 +1,161 @@
+"""
+Fault handling for upstream fetches.
+
+- RetryPolicy: bounded exponential backoff with full jitter, retrying only
+  transient failures (connection errors, timeouts, 429 and 5xx responses)
+- CircuitBreaker: after repeated failures, stop calling a source for a while
+  and then let a single trial request decide whether to close again
+- Budget: a deadline shared by everything one refresh does, so retries and
+  slow sources cannot stretch a refresh indefinitely
+- check_plausible(): refuse a parsed result that is empty or much smaller
+  than the last good one (a redesigned or half-served page), so it never
+  replaces good data
+
+Breaker state is per process; every worker learns about a failing upstream
+on its own.
+"""
+import os
+import random
+import threading
+import time
+
+MIN_RESULT_RATIO = float(os.environ.get('MIN_RESULT_RATIO', 0.5))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """The source's circuit breaker is open; the call was not attempted"""
+
+
+class ImplausibleResultError(ValueError):
+    """A parsed result was rejected by check_plausible()"""
+
+
+def is_retryable(error):
+    """True for failures that may succeed if simply tried again"""
+    if isinstance(error, (CircuitOpenError, ImplausibleResultError)):
+        return False
+    response = getattr(error, 'response', None)
+    if response is not None:
+        return response.status_code in RETRYABLE_STATUS
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    import requests
+
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def check_plausible(previous, current, min_ratio=MIN_RESULT_RATIO):
+    """Raise ImplausibleResultError if ``current`` shrank too much against ``previous``"""
+    if previous and len(current) < len(previous) * min_ratio:
+        raise ImplausibleResultError(
+            f"parsed {len(current)} records where the last good result had {len(previous)}"
+        )
+
+
+class Budget:
+    """A deadline for one refresh"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+
+class RetryPolicy:
+    def __init__(self, attempts=4, base_delay=0.5, max_delay=8.0):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt):
+        """Full-jitter backoff before retry number ``attempt`` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(self, func, budget=None, on_retry=None):
+        """
+        Call ``func`` until it succeeds, fails permanently, runs out of
+        attempts or the retry would not fit in ``budget``; the last error is
+        raised. ``on_retry(attempt, delay, error)`` is called before sleeping.
+        """
+        attempt = 0
+        while True:
+            try:
+                return func()
+            except Exception as e:
+                attempt += 1
+                if attempt >= self.attempts or not is_retryable(e):
+                    raise
+                delay = self.delay(attempt)
+                if budget is not None and budget.remaining() <= delay:
+                    raise
+                if on_retry is not None:
+                    on_retry(attempt, delay, e)
+                time.sleep(delay)
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through and failures are counted. Open (after
+    ``failure_threshold`` consecutive failures): calls fail fast with
+    CircuitOpenError for ``reset_timeout`` seconds. Half-open: one trial
+    call; success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=120.0, on_change=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_change = on_change
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may be made now"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return
+            if state == 'half-open' and not self._trial_running:
+                self._trial_running = True
+                return
+        retry_in = max(0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        raise CircuitOpenError(f"circuit open for {self.name}; next attempt in {retry_in:.0f} s")
+
+    def record_success(self):
+        with self._lock:
+            was_open = self.opened_at is not None
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+        if was_open and self.on_change:
+            self.on_change(self, 'closed')
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            opening = self._trial_running or (self.opened_at is None and self.failures >= self.failure_threshold)
+            if opening:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+        if opening:
+            print(f"⚡ Circuit opened for {self.name} after {self.failures} failures")
+            if self.on_change:
+                self.on_change(self, 'open')
@@ -1,11 +1,26 @@
-from flask import Flask, render_template_string, request, jsonify, send_file
+from flask import Flask, Response, g, request, jsonify
 import os
-import json
-from datetime import datetime
+from datetime import datetime, timezone
 import threading
 import time
-import glob
-from scraper import scrape_ibm_deprecated_models, convert_to_rss_xml
+from collections import OrderedDict
+from functools import lru_cache
+from scraper import describe_fetch, get_upstream_state, restore_upstream_cache, seed_upstream_cache
+from sources import fetch_all_sources
+from feed_cache import CachedResponse
+from feed_formats import LazyFeeds
+from rss_writer import render_rss, render_changes_rss
+from changes import record_changes, summarize_diff
+from scheduler import RefreshScheduler
+from snapshot_store import SnapshotStore
+from snapshot_file import SnapshotFileError, read_snapshot_file, touch_snapshot_file, write_snapshot_file
+from history_store import HistoryStore
+from events import EventBroadcaster, DEADLINE_ALERT, SCRAPE_STARTED, SCRAPE_FINISHED, SNAPSHOT_CHANGED
+from model_dates import normalize_records
+from model_query import ModelIndex, ModelQuery, QueryError, filter_args, has_filters, is_query
+from notifications import NotificationStore, Notifier
+from deadlines import ALERT_FIELDS, DEFAULT_UPCOMING_DAYS, MAX_UPCOMING_DAYS, DeadlineScheduler
+import metrics
 
 app = Flask(__name__)
 
@@ -15,6 +30,48 @@ latest_rss_content = ""
 last_update_time = None
 is_scraping = False
 
+# Recent change events (newest first) for /changes.xml
+latest_changes = []
+
+# Pre-encoded response bodies for the current snapshot, keyed by route.
+# The whole dict is replaced on every update, never mutated in place.
+latest_responses = {}
+
+# Query indexes (and cached query responses) for the current snapshot
+latest_index = ModelIndex([])
+
+# Atom, JSON Feed and iCalendar renderings, built on first request
+latest_feeds = LazyFeeds([])
+
+# Dashboard statistics for the current snapshot, and rendered dashboard
+# pages keyed by (snapshot version, URL root the page links the feed at)
+latest_stats = {}
+dashboard_pages = OrderedDict()
+dashboard_lock = threading.Lock()
+MAX_DASHBOARD_PAGES = 32
+
+# Snapshots are shared between gunicorn workers through this store; each
+# worker keeps the version it last installed and reloads when it changes
+snapshot_store = SnapshotStore(os.environ.get('SNAPSHOT_DB', 'wxnotif_snapshot.db'))
+snapshot_version = 0
+
+# Compact copy of the installed snapshot, read at import when the store is
+# empty so a fresh deployment serves the last good feed at once (see
+# snapshot_file.py); an empty SNAPSHOT_FILE turns it off
+SNAPSHOT_FILE = os.environ.get('SNAPSHOT_FILE', snapshot_store.path + '.snap')
+
+# Pushes scrape and snapshot events to /api/events listeners in every worker
+event_broadcaster = EventBroadcaster(snapshot_store)
+
+# Every published snapshot is also recorded in the (deduplicated) history
+history_store = HistoryStore(os.environ.get('HISTORY_DB', 'wxnotif_history.db'))
+
+# Changes are pushed to webhook and email subscribers through a persistent
+# delivery queue that every worker helps drain
+notification_store = NotificationStore(os.environ.get('NOTIFY_DB', 'wxnotif_notify.db'))
+notification_store.load_file(os.environ.get('NOTIFY_SUBSCRIBERS_FILE'))
+notifier = Notifier(notification_store)
+
 # HTML template for the web interface
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -137,15 +194,15 @@ HTML_TEMPLATE = """
 
         <div class="stats">
             <div class="stat-card">
-                <div class="stat-number">{{ models_count }}</div>
+                <div id="modelsCount" class="stat-number">{{ models_count }}</div>
                 <div class="stat-label">Models Found</div>
             </div>
             <div class="stat-card">
-                <div class="stat-number">{{ models_with_alternatives }}</div>
+                <div id="withAlternatives" class="stat-number">{{ models_with_alternatives }}</div>
                 <div class="stat-label">With Alternatives</div>
             </div>
             <div class="stat-card">
-                <div class="stat-number">{{ models_without_alternatives }}</div>
+                <div id="withoutAlternatives" class="stat-number">{{ models_without_alternatives }}</div>
                 <div class="stat-label">Without Alternatives</div>
             </div>
         </div>
@@ -155,6 +212,8 @@ HTML_TEMPLATE = """
             <p>Use this URL in your RSS reader:</p>
             <div class="feed-url">{{ feed_url }}</div>
             <p><strong>Supported RSS Readers:</strong> Feedly, Inoreader, Feedbro, QuiteRSS, and most others.</p>
+            <p><strong>Other formats:</strong> <a href="/feed.atom">Atom</a>, <a href="/feed.json">JSON Feed</a>,
+                <a href="/feed.ics">iCalendar</a> (deprecation and withdrawal dates as calendar events)</p>
         </div>
 
         <div style="text-align: center;">
@@ -164,6 +223,9 @@ HTML_TEMPLATE = """
             <a href="/feed.xml" class="button secondary" target="_blank">
                 📄 View RSS XML
             </a>
+            <a href="/changes.xml" class="button secondary" target="_blank">
+                🔔 View Changes Feed
+            </a>
             <a href="/api/data" class="button secondary" target="_blank">
                 📊 View JSON Data
             </a>
@@ -206,14 +268,17 @@ HTML_TEMPLATE = """
             status.textContent = 'Updating feed...';
             
             fetch('/api/update', { method: 'POST' })
-                .then(response => response.json())
+                .then(checkResponse)
+                .then(job => waitForJob(job.status_url))
                 .then(data => {
-                    if (data.success) {
+                    if (data.status === 'succeeded') {
                         status.className = 'status success';
                         status.textContent = `Feed updated successfully! Found ${data.models_count} models.`;
-                        setTimeout(() => {
-                            location.reload();
-                        }, 2000);
+                        if (!window.EventSource) {
+                            setTimeout(() => {
+                                location.reload();
+                            }, 2000);
+                        }
                     } else {
                         status.className = 'status error';
                         status.textContent = 'Error updating feed: ' + data.error;
@@ -229,16 +294,69 @@ HTML_TEMPLATE = """
                 });
         }
 
-        // Auto-refresh status every 30 seconds
-        setInterval(() => {
-            fetch('/api/status')
-                .then(response => response.json())
+        function checkResponse(response) {
+            if (!response.ok) {
+                throw new Error(`${response.url} returned HTTP ${response.status}`);
+            }
+            return response.json();
+        }
+
+        function waitForJob(statusUrl) {
+            return fetch(statusUrl)
+                .then(checkResponse)
                 .then(data => {
-                    if (data.is_scraping) {
-                        document.getElementById('status').textContent = 'Currently scraping...';
+                    if (data.status === 'succeeded' || data.status === 'failed' || data.status === 'skipped') {
+                        return data;
                     }
+                    return new Promise(resolve => setTimeout(resolve, 1000))
+                        .then(() => waitForJob(statusUrl));
                 });
-        }, 30000);
+        }
+
+        function showSnapshot(snapshot) {
+            document.getElementById('modelsCount').textContent = snapshot.models_count;
+            document.getElementById('withAlternatives').textContent = snapshot.models_with_alternatives;
+            document.getElementById('withoutAlternatives').textContent = snapshot.models_without_alternatives;
+            const status = document.getElementById('status');
+            const diff = snapshot.diff;
+            status.className = 'status success';
+            status.textContent = `Last updated: ${snapshot.last_update} ` +
+                `(${diff.added} added, ${diff.changed} changed, ${diff.removed} removed)`;
+        }
+
+        if (window.EventSource) {
+            // Pushed updates; the browser reconnects and resumes on its own
+            const events = new EventSource('/api/events');
+            events.addEventListener('scrape-started', () => {
+                const status = document.getElementById('status');
+                status.className = 'status info';
+                status.textContent = 'Currently scraping...';
+            });
+            events.addEventListener('scrape-finished', event => {
+                const result = JSON.parse(event.data);
+                const status = document.getElementById('status');
+                if (!result.success) {
+                    status.className = 'status error';
+                    status.textContent = 'Error updating feed: ' + result.error;
+                } else if (status.textContent === 'Currently scraping...') {
+                    // No snapshot-changed event came first: nothing changed
+                    status.className = 'status success';
+                    status.textContent = `Feed is up to date (${result.detail})`;
+                }
+            });
+            events.addEventListener('snapshot-changed', event => showSnapshot(JSON.parse(event.data)));
+        } else {
+            // Auto-refresh status every 30 seconds
+            setInterval(() => {
+                fetch('/api/status')
+                    .then(response => response.json())
+                    .then(data => {
+                        if (data.is_scraping) {
+                            document.getElementById('status').textContent = 'Currently scraping...';
+                        }
+                    });
+            }, 30000);
+        }
     </script>
 </body>
 </html>
@@ -246,224 +364,634 @@ HTML_TEMPLATE = """
 
 def update_feed_data():
     """Update the feed data by running the scraper"""
-    global latest_data, latest_rss_content, last_update_time, is_scraping
+    global is_scraping
     
-    is_scraping = True
+    requested_at = time.time()
+    with snapshot_store.scrape_lock():
+        # Diff against the latest shared snapshot, not a stale local one
+        sync_snapshot()
+        # Another worker may have finished a refresh while we waited
+        published_at = snapshot_store.get_published_at()
+        if published_at and published_at >= requested_at:
+            sync_snapshot()
+            print("♻️ Feed was refreshed by another worker")
+            return True, len(latest_data), "refreshed by another worker"
+
+        is_scraping = True
+        notify(SCRAPE_STARTED, started_at=datetime.now(timezone.utc).isoformat(timespec='seconds'))
+        outcome = (False, "Scrape interrupted", None)
+        try:
+            outcome = scrape_and_publish()
+            if not outcome[0] and not latest_data:
+                # Upstream is down and this worker has nothing to serve yet
+                print("🔄 Trying to load from history...")
+                load_data_from_files()
+            return outcome
+        finally:
+            is_scraping = False
+            success, result, detail = outcome
+            notify(SCRAPE_FINISHED, success=success, models_count=result if success else None,
+                   error=None if success else result, detail=detail)
+
+def scrape_and_publish():
+    """Scrape all sources and publish a snapshot if anything changed"""
+    # The fetches below update the upstream cache as they go; if nothing
+    # gets published, the next fetch must not see the page as unchanged
+    upstream_state = get_upstream_state()
     try:
         print("🔄 Running scraper...")
         # Run the scraper
-        latest_data = scrape_ibm_deprecated_models()
+        # Checked against the snapshot being served, which a warm start
+        # installs before anything was fetched in this process
+        result = fetch_all_sources(served=latest_data)
+        data = result['data']
+        detail = describe_fetch(result)
         
-        print(f"📊 Scraper returned {len(latest_data) if latest_data else 0} models")
+        print(f"📊 Scraper returned {len(data) if data else 0} models ({detail})")
         
-        if latest_data:
+        if data and not result['changed'] and latest_data:
+            # Nothing to render; just record that upstream was checked
+            snapshot_store.touch()
+            if SNAPSHOT_FILE:
+                touch_snapshot_file(SNAPSHOT_FILE)
+            metrics.SCRAPES.inc(result='unchanged')
+            print("✅ Upstream unchanged, keeping current feed")
+            return True, len(latest_data), detail
+        elif data:
             # Generate RSS content
             print("📝 Generating RSS content...")
-            latest_rss_content = generate_rss_content(latest_data)
-            last_update_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            snapshot = publish_snapshot(data, generate_rss_content(data))
+            metrics.SCRAPES.inc(result='changed')
+            diff = snapshot['diff_summary']
+            detail += f"; {diff['added']} added, {diff['changed']} changed, {diff['removed']} removed"
             print(f"✅ RSS content generated successfully!")
-            return True, len(latest_data)
+            return True, len(data), detail
         else:
             print("❌ No data found from scraper")
-            return False, "No data found"
+            metrics.SCRAPES.inc(result='failure')
+            return False, "No data found", detail
     except Exception as e:
         print(f"❌ Error in update_feed_data: {e}")
+        restore_upstream_cache(upstream_state)
+        metrics.SCRAPES.inc(result='failure')
         import traceback
         traceback.print_exc()
-        return False, str(e)
-    finally:
-        is_scraping = False
+        return False, str(e), None
+
+def scheduled_refresh_due():
+    """Skip timer refreshes if another worker published recently"""
+    published_at = snapshot_store.get_published_at()
+    if published_at is None:
+        return True
+    return time.time() - published_at >= refresh_scheduler.interval / 2
 
 def load_data_from_files():
-    """Load data from existing JSON files as fallback"""
-    global latest_data, latest_rss_content, last_update_time
-    
+    """Load the latest recorded snapshot from history as fallback"""
     try:
-        # Look for the most recent JSON file
-        json_files = glob.glob("ibm_deprecated_models_*.json")
-        if not json_files:
-            print("❌ No existing JSON files found")
-            return False, "No existing data files found"
-        
-        # Get the most recent file
-        latest_file = max(json_files, key=os.path.getctime)
-        print(f"📁 Loading data from existing file: {latest_file}")
+        latest = history_store.latest()
+        if latest is None:
+            print("❌ No recorded history found")
+            return False, "No recorded history or existing data files found"
         
-        with open(latest_file, 'r', encoding='utf-8') as f:
-            latest_data = json.load(f)
+        captured_at, data = latest
+        print(f"📁 Loading snapshot recorded at {captured_at:%Y-%m-%d %H:%M:%S}")
         
-        if latest_data:
+        if data:
+            # Captures recorded before date normalization only have raw strings
+            normalize_records(data)
             # Generate RSS content
-            latest_rss_content = generate_rss_content(latest_data)
-            last_update_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            print(f"✅ Loaded {len(latest_data)} models from existing file")
-            return True, len(latest_data)
+            publish_snapshot(data, generate_rss_content(data), record_history=False)
+            print(f"✅ Loaded {len(data)} models from history")
+            return True, len(data)
         else:
-            return False, "No data in existing file"
+            return False, "No data in recorded snapshot"
             
     except Exception as e:
-        print(f"❌ Error loading from files: {e}")
+        print(f"❌ Error loading from history: {e}")
         return False, str(e)
 
+def render_changes(change_events):
+    """Render the change feed for a snapshot"""
+    with metrics.RENDER_SECONDS.time(feed='changes'):
+        return render_changes_rss(change_events)
+
+def build_response_cache(data, rss_content, last_update, updated_at=None, change_events=()):
+    """Serialize and compress the response bodies for one data snapshot"""
+    responses = {
+        'changes': CachedResponse(render_changes(change_events), 'application/rss+xml; charset=utf-8', updated_at),
+        'api_data': CachedResponse(
+            app.json.dumps({
+                'last_update': last_update,
+                'models_count': len(data) if data else 0,
+                'data': data
+            }) + "\n",
+            'application/json',
+            updated_at
+        )
+    }
+    if rss_content:
+        responses['feed'] = CachedResponse(rss_content, 'application/rss+xml; charset=utf-8', updated_at)
+    return responses
+
+def build_snapshot(data, rss_content, previous_data=None, previous_changes=None):
+    """Bundle everything a worker needs to serve one version of the feed"""
+    last_update = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    updated_at = datetime.now(timezone.utc)
+    change_events, diff = record_changes(previous_changes, previous_data, data, updated_at.replace(microsecond=0))
+    return {
+        'data': data,
+        'rss_content': rss_content,
+        'last_update': last_update,
+        'changes': change_events,
+        'diff_summary': summarize_diff(diff),
+        'upstream': get_upstream_state(),
+        'responses': build_response_cache(data, rss_content, last_update, updated_at, change_events)
+    }
+
+def publish_snapshot(data, rss_content, record_history=True):
+    """Render a snapshot, store it for all workers and install it locally"""
+    snapshot = build_snapshot(data, rss_content, latest_data, latest_changes)
+    if record_history:
+        history_store.record(data)
+    version = snapshot_store.publish(snapshot)
+    save_snapshot_file(snapshot)
+    install_snapshot(version, snapshot)
+    notify(SNAPSHOT_CHANGED, version=version, last_update=snapshot['last_update'], diff=snapshot['diff_summary'],
+           models_count=latest_stats['models_count'],
+           models_with_alternatives=latest_stats['models_with_alternatives'],
+           models_without_alternatives=latest_stats['models_without_alternatives'])
+    # The new change events are at the front of the change feed
+    new_changes = snapshot['changes'][:sum(snapshot['diff_summary'].values())]
+    if new_changes:
+        queue_notifications(new_changes)
+    return snapshot
+
+def save_snapshot_file(snapshot, published_at=None):
+    """Keep the warm-start file in step with the store; never lets a failure break the caller"""
+    if not SNAPSHOT_FILE:
+        return
+    try:
+        write_snapshot_file(SNAPSHOT_FILE, snapshot, published_at)
+    except Exception as e:
+        print(f"❌ Error writing snapshot file: {e}")
+
+def seed_snapshot(snapshot, published_at=None):
+    """Publish a snapshot only if the store is still empty, then install whichever won"""
+    version = snapshot_store.seed(snapshot, published_at)
+    if version is None:
+        return sync_snapshot()
+    install_snapshot(version, snapshot)
+    return True
+
+def warm_start():
+    """
+    Install the last good snapshot without scraping: the shared store's,
+    else the snapshot file's, else the latest one recorded in history.
+    Runs at import, so with gunicorn's preload_app it runs once in the
+    master and the forked workers share the result copy-on-write.
+    """
+    started = time.perf_counter()
+    source = None
+    if sync_snapshot():
+        source = 'snapshot store'
+    if source is None and SNAPSHOT_FILE and os.path.exists(SNAPSHOT_FILE):
+        try:
+            published_at, snapshot = read_snapshot_file(SNAPSHOT_FILE)
+            if seed_snapshot(snapshot, published_at):
+                source = SNAPSHOT_FILE
+        except (OSError, SnapshotFileError) as e:
+            print(f"⚠️ Ignoring snapshot file: {e}")
+    if source is None:
+        latest = history_store.latest()
+        if latest is not None and latest[1]:
+            captured_at, data = latest
+            normalize_records(data)
+            snapshot = build_snapshot(data, generate_rss_content(data))
+            if seed_snapshot(snapshot, captured_at.timestamp()):
+                save_snapshot_file(snapshot, captured_at.timestamp())
+                source = 'history'
+    if source is None:
+        return False
+    print(f"⚡ Warm start: {len(latest_data)} models from {source} in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return True
+
+def import_legacy_history():
+    """Migrate timestamped JSON exports of older versions into history; never lets a failure break startup"""
+    try:
+        imported = history_store.import_legacy_files()
+        if imported:
+            print(f"📥 Imported {imported} existing JSON files into history")
+    except Exception as e:
+        print(f"❌ Error importing JSON files into history: {e}")
+
+def notify(event_type, **data):
+    """Send an /api/events event; never lets a failure break the caller"""
+    try:
+        event_broadcaster.publish(event_type, **data)
+    except Exception as e:
+        print(f"❌ Error publishing {event_type} event: {e}")
+
+def queue_notifications(change_events):
+    """Queue change notifications for subscribers; never lets a failure break the caller"""
+    try:
+        queued = notifier.publish(change_events)
+        if queued:
+            print(f"📨 Queued {len(change_events)} changes for {queued} subscribers")
+    except Exception as e:
+        print(f"❌ Error queuing notifications: {e}")
+
+def send_deadline_alerts(alerts):
+    """Queue due lead-time alerts; each goes out once across workers and restarts"""
+    for alert in notifier.publish_once(alerts):
+        print(f"⏰ {alert['title']}")
+        notify(DEADLINE_ALERT, id=alert['id'], title=alert['title'], model=alert['model'], **alert['deadline'])
+
+def install_snapshot(version, snapshot):
+    """Point this worker's globals at a snapshot"""
+    global latest_data, latest_rss_content, last_update_time, latest_responses, snapshot_version, latest_changes
+    global latest_index, latest_stats, latest_feeds
+    latest_data = snapshot['data']
+    latest_index = ModelIndex(latest_data)
+    latest_stats = dashboard_stats(latest_data, latest_index)
+    latest_changes = snapshot.get('changes', [])
+    latest_rss_content = snapshot['rss_content']
+    last_update_time = snapshot['last_update']
+    latest_responses = snapshot['responses']
+    latest_feeds = LazyFeeds(latest_data, latest_responses['api_data'].last_modified, latest_index)
+    snapshot_version = version
+    deadline_scheduler.sync(latest_data)
+    # Let this worker's next fetch be conditional on what was published
+    seed_upstream_cache(snapshot.get('upstream'))
+
+def sync_snapshot():
+    """Install the shared snapshot if another worker published a newer one"""
+    if snapshot_store.get_version() == snapshot_version:
+        return False
+    version, snapshot = snapshot_store.load()
+    if snapshot is None:
+        return False
+    install_snapshot(version, snapshot)
+    return True
+
+def send_cached(cached):
+    """Serve a CachedResponse, honouring conditional and Accept-Encoding headers"""
+    selected = cached.select(request.headers.get('Accept-Encoding'))
+    if selected is None:
+        return f"None of the available encodings ({', '.join(cached.available)}) is acceptable", 406, {
+            'Vary': 'Accept-Encoding'
+        }
+    encoding, body, etag = selected
+    headers = {
+        'ETag': etag,
+        'Vary': 'Accept-Encoding',
+        'Cache-Control': 'public, no-cache'
+    }
+    if cached.last_modified_header:
+        headers['Last-Modified'] = cached.last_modified_header
+
+    if cached.is_not_modified(request.headers.get('If-None-Match'),
+                              request.headers.get('If-Modified-Since')):
+        return Response(status=304, headers=headers)
+
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return Response(body, status=200, headers=headers, content_type=cached.content_type)
+
 def generate_rss_content(data):
     """Generate RSS XML content from data"""
-    from xml.etree.ElementTree import Element, SubElement, tostring
-    from xml.dom import minidom
-    
-    rss = Element("rss", version="2.0")
-    channel = SubElement(rss, "channel")
-    
-    # Add channel metadata
-    SubElement(channel, "title").text = "IBM Watson Deprecated Foundation Models"
-    SubElement(channel, "link").text = "https://www.ibm.com/docs/en/watsonx/saas?topic=model-foundation-lifecycle#foundation-model-deprecation"
-    SubElement(channel, "description").text = "List of deprecated foundation models from IBM WatsonX documentation with deprecation dates and recommended alternatives."
-    SubElement(channel, "language").text = "en-us"
-    SubElement(channel, "lastBuildDate").text = datetime.now().strftime("%a, %d %b %Y %H:%M:%S GMT")
-    
-    # Add items for each model
-    for model in data:
-        item = SubElement(channel, "item")
-        
-        # Create title from model name
-        title = model['foundation_model_name']
-        SubElement(item, "title").text = title
-        
-        # Create description with all model details
-        description = f"""
-        <strong>Model:</strong> {model['foundation_model_name']}<br/>
-        <strong>Availability Date:</strong> {model['availability_date']}<br/>
-        <strong>Deprecation Date:</strong> {model['deprecation_date']}<br/>
-        <strong>Withdrawal Date:</strong> {model['withdrawal_date']}<br/>
-        <strong>Recommended Alternative:</strong> {model['recommended_alternative']}
-        """
-        SubElement(item, "description").text = description.strip()
-        
-        # Use withdrawal date as pubDate if available, otherwise use current date
-        if model['withdrawal_date'] and model['withdrawal_date'] != '–':
-            try:
-                # Simple date parsing for common formats
-                date_str = model['withdrawal_date']
-                month_map = {
-                    'January': '01', 'February': '02', 'March': '03', 'April': '04',
-                    'May': '05', 'June': '06', 'July': '07', 'August': '08',
-                    'September': '09', 'October': '10', 'November': '11', 'December': '12'
-                }
-                
-                month = '01'
-                for month_name, month_num in month_map.items():
-                    if month_name in date_str:
-                        month = month_num
-                        break
-                
-                # Extract day and year
-                parts = date_str.split()
-                day = parts[0] if parts[0].isdigit() else '01'
-                year = parts[-1] if parts[-1].isdigit() else '2025'
-                
-                # Format as RSS date
-                pub_date = f"{day} {month} {year} 00:00:00 GMT"
-                SubElement(item, "pubDate").text = pub_date
-            except:
-                SubElement(item, "pubDate").text = datetime.now().strftime("%a, %d %b %Y %H:%M:%S GMT")
-        else:
-            SubElement(item, "pubDate").text = datetime.now().strftime("%a, %d %b %Y %H:%M:%S GMT")
-        
-        # Add unique GUID
-        SubElement(item, "guid").text = f"ibm-model-{hash(model['foundation_model_name'])}"
-        
-        # Add category
-        SubElement(item, "category").text = "AI/ML Models"
-    
-    # Convert to pretty XML string
-    rough_string = tostring(rss, 'unicode')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="  ")
+    with metrics.RENDER_SECONDS.time(feed='rss'):
+        return render_rss(data)
+
+@lru_cache(maxsize=1)
+def dashboard_template():
+    """Compile the dashboard template on first use"""
+    return app.jinja_env.from_string(HTML_TEMPLATE)
+
+def dashboard_stats(data, index):
+    """Dashboard numbers for a snapshot, computed once when it is installed"""
+    return {
+        'models_count': len(data) if data else 0,
+        'models_with_alternatives': len(index.alternative[True]),
+        'models_without_alternatives': len(index.alternative[False]),
+        'latest_data': data[:5] if data else []
+    }
 
 @app.route('/')
 def index():
     """Main web interface"""
-    models_count = len(latest_data) if latest_data else 0
-    models_with_alternatives = len([m for m in latest_data if m.get('recommended_alternative') and m.get('recommended_alternative') != '–']) if latest_data else 0
-    models_without_alternatives = models_count - models_with_alternatives
+    key = (snapshot_version, request.url_root)
+    with dashboard_lock:
+        cached = dashboard_pages.get(key)
+        if cached is not None:
+            dashboard_pages.move_to_end(key)
     
-    # Get the current URL for the feed
-    feed_url = request.url_root.rstrip('/') + '/feed.xml'
+    if cached is None:
+        # Get the current URL for the feed
+        feed_url = request.url_root.rstrip('/') + '/feed.xml'
+        html = dashboard_template().render(last_update_time=last_update_time, feed_url=feed_url, **latest_stats)
+        cached = CachedResponse(html, 'text/html; charset=utf-8', latest_responses['api_data'].last_modified)
+        with dashboard_lock:
+            dashboard_pages[key] = cached
+            while len(dashboard_pages) > MAX_DASHBOARD_PAGES:
+                dashboard_pages.popitem(last=False)
     
-    return render_template_string(HTML_TEMPLATE, 
-                                last_update_time=last_update_time,
-                                models_count=models_count,
-                                models_with_alternatives=models_with_alternatives,
-                                models_without_alternatives=models_without_alternatives,
-                                feed_url=feed_url,
-                                latest_data=latest_data[:5] if latest_data else [])
+    return send_cached(cached)
 
 @app.route('/feed.xml')
 def rss_feed():
-    """Serve the RSS feed"""
-    if not latest_rss_content:
+    """Serve the RSS feed, optionally filtered (?model=granite*&withdrawal_within=90d)"""
+    cached = latest_responses.get('feed')
+    if cached is None:
         return "No RSS feed available. Please update the feed first.", 404
+    if has_filters(request.args):
+        return send_filtered_feed(latest_feeds, 'rss')
     
-    return latest_rss_content, 200, {'Content-Type': 'application/rss+xml; charset=utf-8'}
+    return send_cached(cached)
+
+@app.route('/feed.<any(atom, json, ics):feed_format>')
+def alternate_feed(feed_format):
+    """Serve the feed as Atom, JSON Feed or iCalendar"""
+    feeds = latest_feeds
+    if not feeds.data:
+        return "No feed available. Please update the feed first.", 404
+    if has_filters(request.args):
+        return send_filtered_feed(feeds, feed_format)
+    return send_cached(feeds.response(feed_format))
+
+def send_filtered_feed(feeds, feed_format):
+    """Serve the subset of a feed selected by the query string, cached per filter"""
+    try:
+        # Paging parameters are for /api/data; feed URLs ignore them
+        query = ModelQuery(filter_args(request.args))
+    except QueryError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return send_cached(feeds.filtered_response(feed_format, query))
+
+@app.route('/changes.xml')
+def changes_feed():
+    """Serve the feed of detected lifecycle changes"""
+    return send_cached(latest_responses['changes'])
 
 @app.route('/api/update', methods=['POST'])
 def api_update():
-    """API endpoint to update the feed"""
-    try:
-        success, result = update_feed_data()
-        if success:
-            return jsonify({
-                'success': True,
-                'models_count': result,
-                'message': f'Feed updated successfully with {result} models'
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': result
-            })
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        })
+    """API endpoint to queue a feed update"""
+    job, coalesced = refresh_scheduler.submit()
+    payload = job.to_dict()
+    payload.update({
+        'success': True,
+        'coalesced': coalesced,
+        'status_url': f"/api/jobs/{job.id}"
+    })
+    return jsonify(payload), 202, {'Location': f"/api/jobs/{job.id}"}
+
+@app.route('/api/jobs/<job_id>')
+def api_job(job_id):
+    """API endpoint to get the status of an update job"""
+    job = refresh_scheduler.job_status(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown job id'}), 404
+    return jsonify(job)
 
 @app.route('/api/status')
 def api_status():
     """API endpoint to get current status"""
+    current_job = refresh_scheduler.current_job
+    age = snapshot_age()
     return jsonify({
         'is_scraping': is_scraping,
+        'current_job': current_job.id if current_job else None,
         'last_update': last_update_time,
-        'models_count': len(latest_data) if latest_data else 0
+        'models_count': len(latest_data) if latest_data else 0,
+        'data_age_seconds': age,
+        'stale': age is not None and age > STALE_AFTER_SECONDS
     })
 
 @app.route('/api/data')
 def api_data():
-    """API endpoint to get raw data"""
+    """API endpoint to get raw data, optionally filtered, sorted and paginated"""
+    if not is_query(request.args):
+        return send_cached(latest_responses['api_data'])
+
+    index = latest_index
+    full = latest_responses['api_data']
+    update_time = last_update_time
+
+    def render(total, page, next_cursor):
+        return CachedResponse(
+            app.json.dumps({
+                'last_update': update_time,
+                'models_count': len(page),
+                'total': total,
+                'next_cursor': next_cursor,
+                'data': page
+            }) + "\n",
+            'application/json',
+            full.last_modified
+        )
+
+    try:
+        cached = index.cached_response(ModelQuery(request.args), render)
+    except QueryError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return send_cached(cached)
+
+@app.route('/api/events')
+def api_events():
+    """Server-sent events: scrape-started, scrape-finished and snapshot-changed"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    return Response(
+        event_broadcaster.stream(last_event_id),
+        content_type='text/event-stream; charset=utf-8',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/upcoming')
+def api_upcoming():
+    """API endpoint to list deprecation and withdrawal dates in the next ?days= days"""
+    field = request.args.get('field')
+    try:
+        days = int(request.args.get('days', DEFAULT_UPCOMING_DAYS))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'days must be an integer'}), 400
+    if not 0 <= days <= MAX_UPCOMING_DAYS:
+        return jsonify({'success': False, 'error': f'days must be between 0 and {MAX_UPCOMING_DAYS}'}), 400
+    if field is not None and field not in ALERT_FIELDS:
+        return jsonify({'success': False, 'error': f"field must be one of {', '.join(ALERT_FIELDS)}"}), 400
+    upcoming = deadline_scheduler.upcoming(days, field)
     return jsonify({
-        'last_update': last_update_time,
-        'models_count': len(latest_data) if latest_data else 0,
-        'data': latest_data
+        'days': days,
+        'lead_days': list(deadline_scheduler.lead_days),
+        'count': len(upcoming),
+        'deadlines': upcoming
+    })
+
+@app.route('/api/history')
+def api_history():
+    """API endpoint to get the snapshot as of a date (?as_of=YYYY-MM-DD[THH:MM:SS])"""
+    as_of = request.args.get('as_of')
+    try:
+        found = history_store.as_of(datetime.fromisoformat(as_of)) if as_of else history_store.latest()
+    except ValueError:
+        return jsonify({'success': False, 'error': 'as_of must be an ISO 8601 date'}), 400
+    if found is None:
+        return jsonify({'success': False, 'error': 'No snapshot recorded for that date'}), 404
+    captured_at, data = found
+    return jsonify({
+        'captured_at': captured_at.strftime("%Y-%m-%d %H:%M:%S"),
+        'models_count': len(data),
+        'data': data
+    })
+
+@app.route('/api/history/models/<path:name>')
+def api_model_history(name):
+    """API endpoint to get how one model's entry changed over time"""
+    versions = history_store.model_history(name)
+    if not versions:
+        return jsonify({'success': False, 'error': 'Unknown model'}), 404
+    return jsonify({
+        'model': name,
+        'versions': [
+            {'first_seen': version['first_seen'].strftime("%Y-%m-%d %H:%M:%S"), 'record': version['record']}
+            for version in versions
+        ]
     })
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics for this worker"""
+    return metrics.REGISTRY.render(), 200, {'Content-Type': metrics.CONTENT_TYPE}
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Per-route latency and status code counters"""
+    started = g.pop('request_started', None)
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    if started is not None:
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, route=route, method=request.method)
+    metrics.REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+    return response
+
+def snapshot_age():
+    published_at = snapshot_store.get_published_at()
+    return None if published_at is None else round(time.time() - published_at, 3)
+
+# Routes serving snapshot data, which carry X-Data-Age / staleness headers
+DATA_ENDPOINTS = {'index', 'rss_feed', 'alternate_feed', 'changes_feed', 'api_data'}
+
+# Data older than this is served as stale and triggers a background refresh
+STALE_AFTER_SECONDS = float(os.environ.get(
+    'STALE_AFTER_SECONDS', 2 * max(float(os.environ.get('REFRESH_INTERVAL_SECONDS', 3600)), 3600)))
+REVALIDATE_INTERVAL_SECONDS = 60
+last_revalidation = 0.0
+
+def revalidate_in_background():
+    """Queue a refresh for stale data, at most once a minute per worker"""
+    global last_revalidation
+    now = time.monotonic()
+    if now - last_revalidation < REVALIDATE_INTERVAL_SECONDS:
+        return
+    last_revalidation = now
+    refresh_scheduler.submit(trigger='stale')
+
+@app.after_request
+def add_staleness_headers(response):
+    """Tell clients how old the served snapshot is; never wait for a refresh"""
+    if request.endpoint not in DATA_ENDPOINTS or response.status_code not in (200, 304):
+        return response
+    age = snapshot_age()
+    if age is None:
+        return response
+    response.headers['X-Data-Age'] = str(int(age))
+    if age > STALE_AFTER_SECONDS:
+        response.headers['X-Data-Stale'] = 'true'
+        response.headers['Warning'] = '110 - "Response is Stale"'
+        revalidate_in_background()
+    else:
+        response.headers['X-Data-Stale'] = 'false'
+    return response
+
+metrics.SNAPSHOT_AGE.set_function(snapshot_age)
+metrics.MODELS.set_function(lambda: len(latest_data) if latest_data else 0)
+metrics.NOTIFY_QUEUE.set_function(notification_store.pending_count)
+
+# Lead-time alerts for upcoming deprecation and withdrawal dates, kept in
+# step with every installed snapshot
+deadline_scheduler = DeadlineScheduler(send_deadline_alerts)
+
+# Serve an empty /api/data payload until the first snapshot arrives, unless
+# there is a last good snapshot to start from
+latest_responses = build_response_cache([], "", None)
+latest_stats = dashboard_stats([], latest_index)
+import_legacy_history()
+warm_start()
+
+# Periodic refresh; REFRESH_INTERVAL_SECONDS=0 disables the timer so
+# only /api/update triggers a scrape
+refresh_scheduler = RefreshScheduler(
+    update_feed_data,
+    should_run=scheduled_refresh_due,
+    interval=float(os.environ.get('REFRESH_INTERVAL_SECONDS', 3600)),
+    jitter=float(os.environ.get('REFRESH_JITTER', 0.1)),
+    job_store=snapshot_store
+)
+
+background_pid = None
+background_lock = threading.Lock()
+
+def startup_refresh_due():
+    """Refresh at startup only if there is nothing to serve or it is stale"""
+    age = snapshot_age()
+    return not latest_data or age is None or age > STALE_AFTER_SECONDS
+
+def start_background_tasks():
+    """
+    Start the scheduler, notifier and alert threads in this process, once,
+    and queue a refresh if the warm-started snapshot needs one. Called as
+    gunicorn workers start serving (see gunicorn.conf.py), before app.run()
+    and on requests, since threads never outlive a fork().
+    """
+    global background_pid
+    with background_lock:
+        if background_pid == os.getpid():
+            return
+        background_pid = os.getpid()
+    refresh_scheduler.start()
+    deadline_scheduler.start()
+    # Picks up deliveries left queued or due for retry by earlier runs
+    notifier.start()
+    if startup_refresh_due():
+        refresh_scheduler.submit(trigger='startup')
+
+@app.before_request
+def start_refresh_scheduler():
+    """Start background work in whichever process ends up serving"""
+    start_background_tasks()
+
+@app.before_request
+def check_snapshot_version():
+    """Cheap version check so every worker serves the latest snapshot"""
+    sync_snapshot()
+
 if __name__ == '__main__':
     print("🚀 Starting IBM Watson RSS Feed Server...")
     print("📡 RSS Feed will be available at: http://localhost:5000/feed.xml")
     print("🌐 Web interface available at: http://localhost:5000")
     print("=" * 60)
     
-    # Initial data load
-    print("🔄 Loading initial data...")
-    success, result = update_feed_data()
-    if success:
-        print(f"✅ Initial load successful! Found {result} models.")
+    # The last good snapshot was installed at import; refresh off the request path
+    if latest_data:
+        print(f"✅ Serving {len(latest_data)} models from the last snapshot")
     else:
-        print(f"⚠️ Initial load failed: {result}")
-        print("🔄 Trying to load from existing files...")
-        success, result = load_data_from_files()
-        if success:
-            print(f"✅ Loaded from existing files! Found {result} models.")
-        else:
-            print(f"❌ Failed to load from files: {result}")
+        print("🔄 No snapshot yet; fetching one in the background")
+    start_background_tasks()
     
     # Start the Flask server
-    app.run(host='0.0.0.0', port=5000, debug=False) 
\ No newline at end of file
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), debug=False) 
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Single-pass streaming RSS 2.0 writer.
+
+Items are serialized one at a time straight into strings, so rendering needs
+no element tree, no DOM and no re-parse. Used by both the server
+(generate_rss_content, the change feed) and the CLI (convert_to_rss_xml).
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from functools import lru_cache, partial
+from xml.sax.saxutils import escape, quoteattr
+
+from changes import model_guid
+from model_dates import date_epoch
+
+FEED_TITLE = "IBM Watson Deprecated Foundation Models"
+FEED_LINK = "https://www.ibm.com/docs/en/watsonx/saas?topic=model-foundation-lifecycle#foundation-model-deprecation"
+FEED_DESCRIPTION = "List of deprecated foundation models from IBM WatsonX documentation with deprecation dates and recommended alternatives."
+FEED_CATEGORY = "AI/ML Models"
+
+CHANGES_TITLE = "IBM Watson Foundation Model Lifecycle Changes"
+CHANGES_DESCRIPTION = "Foundation models added to, changed in or removed from the IBM WatsonX deprecation table."
+
+FIELD_LABELS = {
+    'availability_date': 'Availability Date',
+    'deprecation_date': 'Deprecation Date',
+    'withdrawal_date': 'Withdrawal Date',
+    'recommended_alternative': 'Recommended Alternative'
+}
+
+
+def rfc822_now():
+    return format_datetime(datetime.now(timezone.utc), usegmt=True)
+
+
+@lru_cache(maxsize=1024)
+def rfc822_date(epoch):
+    return format_datetime(datetime.fromtimestamp(epoch, timezone.utc), usegmt=True)
+
+
+def item_pub_date(model, default):
+    """
+    Use the withdrawal date as pubDate if available, otherwise ``default``.
+    """
+    epoch = date_epoch(model, 'withdrawal_date')
+    return rfc822_date(epoch) if epoch is not None else default
+
+
+def item_description(model):
+    """HTML description with all model details"""
+    return (
+        f"<strong>Model:</strong> {model['foundation_model_name']}<br/>\n"
+        f"<strong>Availability Date:</strong> {model['availability_date']}<br/>\n"
+        f"<strong>Deprecation Date:</strong> {model['deprecation_date']}<br/>\n"
+        f"<strong>Withdrawal Date:</strong> {model['withdrawal_date']}<br/>\n"
+        f"<strong>Recommended Alternative:</strong> {model['recommended_alternative']}"
+    )
+
+
+def item_fields(model, default_date):
+    """(tag, text) pairs for one <item>, in output order"""
+    return (
+        ('title', model['foundation_model_name']),
+        ('description', item_description(model)),
+        ('pubDate', item_pub_date(model, default_date)),
+        ('guid', model_guid(model)),
+        ('category', FEED_CATEGORY)
+    )
+
+
+def change_title(event):
+    name = event['model']['foundation_model_name']
+    if event['kind'] == 'changed':
+        return f"Changed: {name} ({', '.join(FIELD_LABELS.get(field, field) for field in event['fields'])})"
+    return f"{event['kind'].capitalize()}: {name}"
+
+
+def change_description(event):
+    """HTML description of one change event"""
+    if event['kind'] != 'changed':
+        return item_description(event['model'])
+    return "<br/>\n".join(
+        f"<strong>{FIELD_LABELS.get(field, field)}:</strong> {old or '–'} → {new or '–'}"
+        for field, (old, new) in event['fields'].items()
+    )
+
+
+def change_fields(event, default_date):
+    """(tag, text) pairs for one change event <item>"""
+    return (
+        ('title', change_title(event)),
+        ('description', change_description(event)),
+        ('pubDate', format_datetime(event['detected_at'], usegmt=True)),
+        ('guid', event['id']),
+        ('category', event['kind'])
+    )
+
+
+# Extra attributes per item tag; our GUIDs are not URLs
+ITEM_ATTRIBUTES = {'guid': ' isPermaLink="false"'}
+
+
+def iter_feed(items, title=FEED_TITLE, description=FEED_DESCRIPTION, indent="  ", build_date=None):
+    """
+    Yield an RSS document as string chunks, one chunk per item plus header
+    and footer. ``items`` is an iterable of callables taking the build date
+    and returning (tag, text) pairs. ``indent=None`` produces compact output.
+    """
+    build_date = build_date or rfc822_now()
+    if indent is None:
+        nl, i1, i2, i3 = "", "", "", ""
+    else:
+        nl, i1, i2, i3 = "\n", indent, indent * 2, indent * 3
+
+    channel_fields = (
+        ('title', title),
+        ('link', FEED_LINK),
+        ('description', description),
+        ('language', "en-us"),
+        ('lastBuildDate', build_date)
+    )
+    yield (
+        f'<?xml version="1.0" encoding="utf-8"?>{nl}'
+        f'<rss version={quoteattr("2.0")}>{nl}'
+        f'{i1}<channel>{nl}'
+        + ''.join(f'{i2}<{tag}>{escape(text)}</{tag}>{nl}' for tag, text in channel_fields)
+    )
+
+    for fields in items:
+        yield (
+            f'{i2}<item>{nl}'
+            + ''.join(
+                f'{i3}<{tag}{ITEM_ATTRIBUTES.get(tag, "")}>{escape(text)}</{tag}>{nl}'
+                for tag, text in fields(build_date)
+            )
+            + f'{i2}</item>{nl}'
+        )
+
+    yield f'{i1}</channel>{nl}</rss>{nl}'
+
+
+def iter_rss(data, indent="  ", build_date=None):
+    """Yield the model feed for ``data`` as string chunks"""
+    return iter_feed((partial(item_fields, model) for model in data), indent=indent, build_date=build_date)
+
+
+def write_rss(data, sink, indent="  ", build_date=None):
+    """Stream the RSS document into a file-like object with a write() method"""
+    for chunk in iter_rss(data, indent=indent, build_date=build_date):
+        sink.write(chunk)
+
+
+def render_rss(data, indent="  ", build_date=None):
+    """Return the whole RSS document as a string"""
+    return ''.join(iter_rss(data, indent=indent, build_date=build_date))
+
+
+def render_changes_rss(events, indent="  ", build_date=None):
+    """Return the change feed (one item per change event) as a string"""
+    return ''.join(iter_feed(
+        (partial(change_fields, event) for event in events),
+        title=CHANGES_TITLE,
+        description=CHANGES_DESCRIPTION,
+        indent=indent,
+        build_date=build_date
+    ))
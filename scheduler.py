@@ -0,0 +1,197 @@
+"""
+Background refresh scheduler for the RSS feed server.
+
+A single daemon thread runs the refresh function on a configurable interval
+(with random jitter so several deployments don't hit IBM at the same moment)
+and on demand. On-demand requests are single-flight: while a refresh is
+queued or running, further requests coalesce onto that same job.
+
+Jobs live in the process that runs them. With a job store (the shared
+SnapshotStore), every state change is also saved there, so a status poll
+answers whichever gunicorn worker it lands on.
+"""
+import json
+import os
+import random
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+# How many finished jobs are kept around for /api/jobs/<id>
+MAX_JOB_HISTORY = 100
+
+
+class RefreshJob:
+    """State of one refresh run"""
+
+    def __init__(self, trigger):
+        self.id = uuid.uuid4().hex
+        self.trigger = trigger
+        self.status = 'queued'
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.models_count = None
+        self.error = None
+        self.detail = None
+        self.done = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in ('succeeded', 'failed', 'skipped')
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'trigger': self.trigger,
+            'status': self.status,
+            'created_at': self.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            'started_at': self.started_at.strftime("%Y-%m-%d %H:%M:%S") if self.started_at else None,
+            'finished_at': self.finished_at.strftime("%Y-%m-%d %H:%M:%S") if self.finished_at else None,
+            'models_count': self.models_count,
+            'error': self.error,
+            'detail': self.detail
+        }
+
+
+class RefreshScheduler:
+    """
+    Runs ``refresh_func`` in a background thread. ``refresh_func`` must return
+    a ``(success, result)`` or ``(success, result, detail)`` tuple like
+    ``update_feed_data()``. If given,
+    ``should_run`` is asked before each timer-triggered run; returning False
+    marks that job as skipped. If given, ``job_store`` (a SnapshotStore)
+    receives every job state change for job_status() in other processes.
+    """
+
+    def __init__(self, refresh_func, interval=3600, jitter=0.1, should_run=None, job_store=None):
+        self.refresh_func = refresh_func
+        self.should_run = should_run
+        self.job_store = job_store
+        self.interval = interval
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._current = None
+        self._jobs = OrderedDict()
+
+    def start(self):
+        """Start the scheduler thread in this process (idempotent)"""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            # Threads do not survive fork(); a forked worker starts its own
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='refresh-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Ask the scheduler thread to exit after the current run"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def submit(self, trigger='manual'):
+        """
+        Request a refresh. Returns ``(job, coalesced)`` where ``coalesced`` is
+        True if the request joined a job that was already queued or running.
+        """
+        self.start()
+        with self._lock:
+            if self._current is not None:
+                return self._current, True
+            job = self._new_job(trigger)
+        # Saved before the caller hands out the job id
+        self._save(job)
+        self._wake.set()
+        return job, False
+
+    def get_job(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def job_status(self, job_id):
+        """``to_dict()`` of a job run by this or any process sharing the job store, or None"""
+        job = self.get_job(job_id)
+        if job is not None:
+            return job.to_dict()
+        if self.job_store is not None:
+            data = self.job_store.get_job(job_id)
+            if data is not None:
+                return json.loads(data)
+        return None
+
+    @property
+    def current_job(self):
+        return self._current
+
+    def next_delay(self):
+        """Seconds until the next scheduled refresh, including jitter"""
+        spread = self.interval * self.jitter
+        return max(1.0, self.interval + random.uniform(-spread, spread))
+
+    def _new_job(self, trigger):
+        # Caller holds self._lock
+        job = RefreshJob(trigger)
+        self._current = job
+        self._jobs[job.id] = job
+        while len(self._jobs) > MAX_JOB_HISTORY:
+            self._jobs.popitem(last=False)
+        return job
+
+    def _save(self, job):
+        if self.job_store is None:
+            return
+        try:
+            self.job_store.save_job(job.id, json.dumps(job.to_dict()))
+        except Exception as e:
+            print(f"❌ Error saving refresh job {job.id}: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            timeout = self.next_delay() if self.interval > 0 else None
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+
+            with self._lock:
+                job = self._current or self._new_job('scheduled')
+            self._execute(job)
+
+    def _execute(self, job):
+        job.status = 'running'
+        job.started_at = datetime.now()
+        self._save(job)
+        skipped = False
+        try:
+            if job.trigger == 'scheduled' and self.should_run is not None and not self.should_run():
+                skipped, success, result = True, True, None
+            else:
+                outcome = self.refresh_func()
+                success, result = outcome[:2]
+                job.detail = outcome[2] if len(outcome) > 2 else None
+        except Exception as e:
+            success, result = False, str(e)
+
+        job.finished_at = datetime.now()
+        if skipped:
+            job.status = 'skipped'
+        elif success:
+            job.status = 'succeeded'
+            job.models_count = result
+        else:
+            job.status = 'failed'
+            job.error = result
+
+        self._save(job)
+        with self._lock:
+            self._current = None
+        job.done.set()
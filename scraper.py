@@ -1,123 +1,433 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import json
+import argparse
+import hashlib
+import os
 from datetime import datetime
 import time
 import re
-import xml.etree.ElementTree as ET
+from rss_writer import write_rss
+from model_dates import normalize_records
+from resilience import ImplausibleResultError, check_plausible
+from metrics import PARSE_SECONDS, EXTRACTION_SECONDS
 
-def scrape_ibm_deprecated_models():
+IBM_LIFECYCLE_URL = 'https://www.ibm.com/docs/en/watsonx/saas?topic=model-foundation-lifecycle#foundation-model-deprecation'
+
+# Headers to mimic a real browser request
+REQUEST_HEADERS = {
+    'User-Agent': 'curl/8.5.0 (x86_64-pc-linux-gnu)'
+}
+
+# Only the tables matter for change detection; the rest of the page carries
+# per-request noise (timestamps, nonces) that would defeat the hash
+TABLE_PATTERN = re.compile(r'<table\b.*?</table>', re.IGNORECASE | re.DOTALL)
+
+_session = None
+
+# Per-URL validators, content hash and last parsed records
+_upstream_cache = {}
+
+def get_session():
     """
-    Scrape the IBM Watson documentation to extract deprecated foundation models table.
-    Returns structured data of the deprecated models.
+    Return the shared keep-alive session used for all upstream requests.
+    """
+    global _session
+    if _session is None:
+        # requests is imported on first use so that importing this module
+        # (e.g. at server start) stays cheap
+        import requests
+        import requests.adapters
+        
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(REQUEST_HEADERS)
+        _session = session
+    return _session
+
+def get_upstream_state():
+    """
+    Return a copy of the upstream cache (validators, content hash and
+    records per URL) so another process can seed its cache with it.
+    """
+    return {url: dict(entry) for url, entry in _upstream_cache.items()}
+
+def seed_upstream_cache(state):
+    """
+    Seed the upstream cache from state produced by another process.
+    """
+    for url, entry in (state or {}).items():
+        _upstream_cache[url] = dict(entry)
+
+def clear_upstream_cache():
     """
+    Forget all validators and records, forcing the next fetches to download
+    and parse in full.
+    """
+    _upstream_cache.clear()
+
+def restore_upstream_cache(state):
+    """
+    Put the upstream cache back to state from get_upstream_state(), e.g. to
+    forget fetches whose records were never published.
+    """
+    _upstream_cache.clear()
+    seed_upstream_cache(state)
+
+def get_cached_records(url):
+    """
+    Return the last records parsed from ``url``, or an empty list.
+    """
+    return (_upstream_cache.get(url) or {}).get('data') or []
+
+def content_hash(html):
+    """
+    Hash the table markup of a page.
+    """
+    digest = hashlib.sha256()
+    for match in TABLE_PATTERN.finditer(html):
+        digest.update(match.group(0).encode('utf-8'))
+    return digest.hexdigest()
+
+def extract_with_soup(html):
+    """
+    Extract the deprecated foundation models table with BeautifulSoup's
+    html.parser. Builds the whole document tree.
+    """
+    from bs4 import BeautifulSoup
     
-    url = 'https://www.ibm.com/docs/en/watsonx/saas?topic=model-foundation-lifecycle#foundation-model-deprecation'
+    with PARSE_SECONDS.time(backend='soup'):
+        soup = BeautifulSoup(html, 'html.parser')
     
-    # Headers to mimic a real browser request
-    headers = {
-        'User-Agent': 'curl/8.5.0 (x86_64-pc-linux-gnu)'
-    }
+    with EXTRACTION_SECONDS.time(backend='soup'):
+        return _extract_from_soup(soup)
+
+def _extract_from_soup(soup):
+
+    # Look for the specific table with deprecated models
+    # The table should have a caption or be near text about deprecated models
+    tables = soup.find_all('table')
     
-    try:
-        print(f"Fetching data from: {url}")
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Look for the specific table with deprecated models
-        # The table should have a caption or be near text about deprecated models
-        tables = soup.find_all('table')
-        
-        deprecated_models = []
-        
+    deprecated_models = []
+    
+    for table in tables:
+        # Check if this table contains deprecated model information
+        table_text = table.get_text().lower()
+        if 'deprecated' in table_text and 'foundation model' in table_text:
+            print("Found deprecated models table!")
+            
+            # Extract table data
+            rows = table.find_all('tr')
+            
+            for row in rows[1:]:  # Skip header row
+                cells = row.find_all(['td', 'th'])
+                if len(cells) >= 5:  # Ensure we have all expected columns
+                    model_data = {
+                        'foundation_model_name': cells[0].get_text(strip=True),
+                        'availability_date': cells[1].get_text(strip=True),
+                        'deprecation_date': cells[2].get_text(strip=True),
+                        'withdrawal_date': cells[3].get_text(strip=True),
+                        'recommended_alternative': cells[4].get_text(strip=True)
+                    }
+                    deprecated_models.append(model_data)
+    
+    if not deprecated_models:
+        print("No deprecated models table found. Trying alternative approach...")
+        # Fallback: look for any table with model information
         for table in tables:
-            # Check if this table contains deprecated model information
-            table_text = table.get_text().lower()
-            if 'deprecated' in table_text and 'foundation model' in table_text:
-                print("Found deprecated models table!")
-                
-                # Extract table data
-                rows = table.find_all('tr')
+            rows = table.find_all('tr')
+            if len(rows) > 1:
+                first_row = rows[0]
+                headers = [th.get_text(strip=True).lower() for th in first_row.find_all(['th', 'td'])]
                 
-                for row in rows[1:]:  # Skip header row
-                    cells = row.find_all(['td', 'th'])
-                    if len(cells) >= 5:  # Ensure we have all expected columns
-                        model_data = {
-                            'foundation_model_name': cells[0].get_text(strip=True),
-                            'availability_date': cells[1].get_text(strip=True),
-                            'deprecation_date': cells[2].get_text(strip=True),
-                            'withdrawal_date': cells[3].get_text(strip=True),
-                            'recommended_alternative': cells[4].get_text(strip=True)
-                        }
-                        deprecated_models.append(model_data)
+                if any('model' in header for header in headers) and any('date' in header for header in headers):
+                    print(f"Found potential table with headers: {headers}")
+                    
+                    for row in rows[1:]:
+                        cells = row.find_all(['td', 'th'])
+                        if len(cells) >= 3:
+                            model_data = {
+                                'foundation_model_name': cells[0].get_text(strip=True),
+                                'availability_date': cells[1].get_text(strip=True) if len(cells) > 1 else '',
+                                'deprecation_date': cells[2].get_text(strip=True) if len(cells) > 2 else '',
+                                'withdrawal_date': cells[3].get_text(strip=True) if len(cells) > 3 else '',
+                                'recommended_alternative': cells[4].get_text(strip=True) if len(cells) > 4 else ''
+                            }
+                            deprecated_models.append(model_data)
+    
+    return deprecated_models
+
+# Tables whose text mentions both "deprecated" and "foundation model"
+# (case-insensitive), evaluated entirely inside libxml2
+_UPPER = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_LOWER = 'abcdefghijklmnopqrstuvwxyz'
+LXML_DEPRECATED_TABLES = (
+    f"//table[contains(translate(string(.), '{_UPPER}', '{_LOWER}'), 'deprecated')"
+    f" and contains(translate(string(.), '{_UPPER}', '{_LOWER}'), 'foundation model')]"
+)
+
+_parser_cache = {}
+
+def _lxml_parser():
+    from lxml import html as lxml_html
+    
+    if 'utf-8' not in _parser_cache:
+        _parser_cache['utf-8'] = lxml_html.HTMLParser(encoding='utf-8', remove_comments=True)
+    return _parser_cache['utf-8']
+
+def _lxml_document(html):
+    from lxml import html as lxml_html
+    
+    return lxml_html.document_fromstring(html.encode('utf-8'), parser=_lxml_parser())
+
+def _cell_text(element):
+    """
+    Same text as BeautifulSoup's get_text(strip=True).
+    """
+    return ''.join(text.strip() for text in element.itertext())
+
+def _row_cells(row):
+    return row.xpath('.//td | .//th')
+
+def extract_with_lxml(html):
+    """
+    Extract the deprecated foundation models table with lxml. Candidate
+    tables are selected by XPath in C, so only matching tables and their rows
+    are turned into Python objects. Produces the same records as
+    extract_with_soup().
+    """
+    with PARSE_SECONDS.time(backend='lxml'):
+        document = _lxml_document(html)
+    
+    with EXTRACTION_SECONDS.time(backend='lxml'):
+        return _extract_from_lxml(document)
+
+def _extract_from_lxml(document):
+    deprecated_models = []
+    
+    for table in document.xpath(LXML_DEPRECATED_TABLES):
+        print("Found deprecated models table!")
         
-        if not deprecated_models:
-            print("No deprecated models table found. Trying alternative approach...")
-            # Fallback: look for any table with model information
-            for table in tables:
-                rows = table.find_all('tr')
-                if len(rows) > 1:
-                    first_row = rows[0]
-                    headers = [th.get_text(strip=True).lower() for th in first_row.find_all(['th', 'td'])]
+        for row in table.xpath('.//tr')[1:]:  # Skip header row
+            cells = _row_cells(row)
+            if len(cells) >= 5:  # Ensure we have all expected columns
+                deprecated_models.append({
+                    'foundation_model_name': _cell_text(cells[0]),
+                    'availability_date': _cell_text(cells[1]),
+                    'deprecation_date': _cell_text(cells[2]),
+                    'withdrawal_date': _cell_text(cells[3]),
+                    'recommended_alternative': _cell_text(cells[4])
+                })
+    
+    if not deprecated_models:
+        print("No deprecated models table found. Trying alternative approach...")
+        # Fallback: look for any table whose first row looks like a header
+        for table in document.xpath('//table'):
+            rows = table.xpath('.//tr')
+            if len(rows) > 1:
+                headers = [_cell_text(cell).lower() for cell in _row_cells(rows[0])]
+                
+                if any('model' in header for header in headers) and any('date' in header for header in headers):
+                    print(f"Found potential table with headers: {headers}")
                     
-                    if any('model' in header for header in headers) and any('date' in header for header in headers):
-                        print(f"Found potential table with headers: {headers}")
-                        
-                        for row in rows[1:]:
-                            cells = row.find_all(['td', 'th'])
-                            if len(cells) >= 3:
-                                model_data = {
-                                    'foundation_model_name': cells[0].get_text(strip=True),
-                                    'availability_date': cells[1].get_text(strip=True) if len(cells) > 1 else '',
-                                    'deprecation_date': cells[2].get_text(strip=True) if len(cells) > 2 else '',
-                                    'withdrawal_date': cells[3].get_text(strip=True) if len(cells) > 3 else '',
-                                    'recommended_alternative': cells[4].get_text(strip=True) if len(cells) > 4 else ''
-                                }
-                                deprecated_models.append(model_data)
+                    for row in rows[1:]:
+                        cells = [_cell_text(cell) for cell in _row_cells(row)]
+                        if len(cells) >= 3:
+                            cells += [''] * (5 - len(cells))
+                            deprecated_models.append({
+                                'foundation_model_name': cells[0],
+                                'availability_date': cells[1],
+                                'deprecation_date': cells[2],
+                                'withdrawal_date': cells[3],
+                                'recommended_alternative': cells[4]
+                            })
+    
+    return deprecated_models
+
+PARSER_BACKENDS = {
+    'soup': extract_with_soup,
+    'lxml': extract_with_lxml
+}
+
+def default_parser_backend():
+    """
+    The SCRAPER_PARSER environment variable, or lxml when it is installed.
+    """
+    backend = os.environ.get('SCRAPER_PARSER')
+    if backend:
+        return backend
+    try:
+        import lxml.html  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'soup'
+
+def extract_deprecated_models(html, backend=None):
+    """
+    Extract the deprecated foundation models table from a page using the
+    given parser backend ('lxml' or 'soup').
+    Returns structured data of the deprecated models.
+    """
+    return PARSER_BACKENDS[backend or default_parser_backend()](html)
+
+def extract_table(html, locator, columns):
+    """
+    Generic lxml table extraction for sources other than the default page.
+    Tables are located by keywords (lowercase) that must all appear in the
+    table text. ``columns`` maps each record field to a header keyword
+    (matched against the lowercased first row) or a column index.
+    """
+    with PARSE_SECONDS.time(backend='lxml'):
+        document = _lxml_document(html)
+    
+    with EXTRACTION_SECONDS.time(backend='lxml'):
+        return _extract_table_from_lxml(document, locator, columns)
+
+def _extract_table_from_lxml(document, locator, columns):
+    condition = ' and '.join(
+        f"contains(translate(string(.), '{_UPPER}', '{_LOWER}'), '{keyword}')" for keyword in locator
+    )
+    
+    records = []
+    for table in document.xpath(f'//table[{condition}]'):
+        rows = table.xpath('.//tr')
+        if len(rows) < 2:
+            continue
+        headers = [_cell_text(cell).lower() for cell in _row_cells(rows[0])]
         
-        return deprecated_models
+        indexes = {}
+        for field, column in columns.items():
+            if isinstance(column, int):
+                indexes[field] = column
+            else:
+                indexes[field] = next((i for i, header in enumerate(headers) if column in header), None)
+        if None in indexes.values():
+            continue  # Not the table we are looking for
         
+        width = max(indexes.values()) + 1
+        for row in rows[1:]:
+            cells = _row_cells(row)
+            if len(cells) >= width:
+                records.append({field: _cell_text(cells[i]) for field, i in indexes.items()})
+    
+    return records
+
+def fetch_deprecated_models(url=IBM_LIFECYCLE_URL, timeout=30, extract=None, baseline=None):
+    """
+    Fetch the lifecycle page with a conditional request and extract the
+    deprecated models, skipping the parse when the page is unchanged.
+    ``extract`` turns the page HTML into records and defaults to
+    extract_deprecated_models(). ``baseline`` is the page's records in the
+    snapshot being served, which a new parse must not fall far short of;
+    without one, the last parse of ``url`` is the baseline.
+    
+    Returns a dict with the records ('data'), whether they changed since the
+    last fetch ('changed'), and timings ('fetch_ms', 'parse_ms', 'bytes').
+    Network and HTTP errors, and ImplausibleResultError for a parse much
+    smaller than the previous one, are raised to the caller.
+    """
+    cached = _upstream_cache.get(url)
+    headers = {}
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    
+    print(f"Fetching data from: {url}")
+    started = time.perf_counter()
+    response = get_session().get(url, headers=headers, timeout=timeout)
+    fetch_ms = (time.perf_counter() - started) * 1000
+    
+    result = {
+        'url': url,
+        'data': cached['data'] if cached else [],
+        'changed': False,
+        'status_code': response.status_code,
+        'bytes': len(response.content),
+        'fetch_ms': fetch_ms,
+        'parse_ms': 0.0
+    }
+    
+    if response.status_code == 304 and cached:
+        print("Upstream page not modified (304)")
+        return result
+    
+    response.raise_for_status()
+    
+    html = response.text
+    digest = content_hash(html)
+    validators = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'content_hash': digest
+    }
+    
+    if cached and cached.get('content_hash') == digest:
+        print("Upstream tables unchanged, skipping parse")
+        _upstream_cache[url] = dict(validators, data=cached['data'])
+        return result
+    
+    started = time.perf_counter()
+    data = normalize_records((extract or extract_deprecated_models)(html))
+    result['parse_ms'] = (time.perf_counter() - started) * 1000
+    # An empty or much shorter table is more likely a broken page than mass
+    # removals; keep the cache (and validators) of the last good parse
+    if baseline is None:
+        baseline = cached['data'] if cached else []
+    check_plausible(baseline, data)
+    result['data'] = data
+    result['changed'] = True
+    
+    _upstream_cache[url] = dict(validators, data=data)
+    return result
+
+def describe_fetch(result):
+    """
+    One-line summary of a fetch result, e.g. "unchanged, 0 ms parse".
+    """
+    state = 'changed' if result['changed'] else 'unchanged'
+    return f"{state}, {result['parse_ms']:.0f} ms parse"
+
+def scrape_ibm_deprecated_models(url=IBM_LIFECYCLE_URL):
+    """
+    Scrape the IBM Watson documentation to extract deprecated foundation models table.
+    Returns structured data of the deprecated models.
+    """
+    import requests
+    
+    try:
+        return fetch_deprecated_models(url)['data']
     except requests.RequestException as e:
         print(f"Error fetching the webpage: {e}")
         return []
+    except ImplausibleResultError as e:
+        print(f"Rejected the parsed table: {e}")
+        return []
     except Exception as e:
         print(f"Error parsing the webpage: {e}")
         return []
 
-def save_data_to_files(data, base_filename='ibm_deprecated_models'):
+def save_data_to_files(data, base_filename='ibm_deprecated_models', formats=('csv', 'json', 'xlsx')):
     """
     Save the scraped data to multiple formats for easy access.
+    The formats are written in parallel by the streaming export pipeline.
     """
     if not data:
         print("No data to save.")
         return
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    # Save as CSV
-    df = pd.DataFrame(data)
-    csv_filename = f"{base_filename}_{timestamp}.csv"
-    df.to_csv(csv_filename, index=False)
-    print(f"Data saved to CSV: {csv_filename}")
+    from exporters import export_records
     
-    # Save as JSON
-    json_filename = f"{base_filename}_{timestamp}.json"
-    with open(json_filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"Data saved to JSON: {json_filename}")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    results = export_records(data, formats, f"{base_filename}_{timestamp}")
     
-    # Save as Excel (if pandas supports it)
-    try:
-        excel_filename = f"{base_filename}_{timestamp}.xlsx"
-        df.to_excel(excel_filename, index=False)
-        print(f"Data saved to Excel: {excel_filename}")
-    except ImportError:
-        print("Excel export not available (openpyxl not installed)")
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"{name.upper()} export failed: {result['error']}")
+        else:
+            print(f"Data saved to {name.upper()}: {result['path']}")
     
-    return csv_filename, json_filename
+    return tuple(results[name]['path'] for name in ('csv', 'json') if name in results)
 
 def convert_to_rss_xml(data, base_filename='ibm_deprecated_models'):
     """
@@ -127,95 +437,13 @@ def convert_to_rss_xml(data, base_filename='ibm_deprecated_models'):
         print("No data to convert to RSS.")
         return None
     
-    # Create RSS root element
-    rss = ET.Element("rss", version="2.0")
-    channel = ET.SubElement(rss, "channel")
-    
-    # Add channel metadata
-    ET.SubElement(channel, "title").text = "IBM Watson Deprecated Foundation Models"
-    ET.SubElement(channel, "link").text = "https://www.ibm.com/docs/en/watsonx/saas?topic=model-foundation-lifecycle#foundation-model-deprecation"
-    ET.SubElement(channel, "description").text = "List of deprecated foundation models from IBM WatsonX documentation with deprecation dates and recommended alternatives."
-    ET.SubElement(channel, "language").text = "en-us"
-    ET.SubElement(channel, "lastBuildDate").text = datetime.now().strftime("%a, %d %b %Y %H:%M:%S GMT")
-    
-    # Add items for each model
-    for model in data:
-        item = ET.SubElement(channel, "item")
-        
-        # Create title from model name
-        title = model['foundation_model_name']
-        ET.SubElement(item, "title").text = title
-        
-        # Create description with all model details
-        description = f"""
-        <strong>Model:</strong> {model['foundation_model_name']}<br/>
-        <strong>Availability Date:</strong> {model['availability_date']}<br/>
-        <strong>Deprecation Date:</strong> {model['deprecation_date']}<br/>
-        <strong>Withdrawal Date:</strong> {model['withdrawal_date']}<br/>
-        <strong>Recommended Alternative:</strong> {model['recommended_alternative']}
-        """
-        ET.SubElement(item, "description").text = description.strip()
-        
-        # Use withdrawal date as pubDate if available, otherwise use current date
-        if model['withdrawal_date'] and model['withdrawal_date'] != '–':
-            # Try to parse the date and format it for RSS
-            try:
-                # Simple date parsing for common formats
-                date_str = model['withdrawal_date']
-                if 'January' in date_str:
-                    month = '01'
-                elif 'February' in date_str:
-                    month = '02'
-                elif 'March' in date_str:
-                    month = '03'
-                elif 'April' in date_str:
-                    month = '04'
-                elif 'May' in date_str:
-                    month = '05'
-                elif 'June' in date_str:
-                    month = '06'
-                elif 'July' in date_str:
-                    month = '07'
-                elif 'August' in date_str:
-                    month = '08'
-                elif 'September' in date_str:
-                    month = '09'
-                elif 'October' in date_str:
-                    month = '10'
-                elif 'November' in date_str:
-                    month = '11'
-                elif 'December' in date_str:
-                    month = '12'
-                else:
-                    month = '01'
-                
-                # Extract day and year
-                parts = date_str.split()
-                day = parts[0] if parts[0].isdigit() else '01'
-                year = parts[-1] if parts[-1].isdigit() else '2025'
-                
-                # Format as RSS date
-                pub_date = f"{day} {month} {year} 00:00:00 GMT"
-                ET.SubElement(item, "pubDate").text = pub_date
-            except:
-                # Fallback to current date
-                ET.SubElement(item, "pubDate").text = datetime.now().strftime("%a, %d %b %Y %H:%M:%S GMT")
-        else:
-            ET.SubElement(item, "pubDate").text = datetime.now().strftime("%a, %d %b %Y %H:%M:%S GMT")
-        
-        # Add unique GUID
-        ET.SubElement(item, "guid").text = f"ibm-model-{hash(model['foundation_model_name'])}"
-        
-        # Add category
-        ET.SubElement(item, "category").text = "AI/ML Models"
-    
     # Generate filename with timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     xml_filename = f"{base_filename}_{timestamp}.xml"
     
-    # Write XML to file
-    tree = ET.ElementTree(rss)
-    tree.write(xml_filename, encoding='utf-8', xml_declaration=True)
+    # Stream the feed straight into the file
+    with open(xml_filename, 'w', encoding='utf-8') as f:
+        write_rss(data, f)
     print(f"RSS feed saved to: {xml_filename}")
     
     return xml_filename
@@ -244,6 +472,34 @@ def main():
     """
     Main function to orchestrate the scraping process.
     """
+    parser = argparse.ArgumentParser(description="IBM Watson Foundation Models Deprecation Scraper")
+    parser.add_argument('--history-db', default=os.environ.get('HISTORY_DB', 'wxnotif_history.db'),
+                        help='SQLite history database (default: wxnotif_history.db)')
+    parser.add_argument('--export', action='store_true',
+                        help='also write timestamped CSV/JSON/XLSX files')
+    parser.add_argument('--import-files', metavar='DIR',
+                        help='migrate existing ibm_deprecated_models_*.json files from DIR into the history and exit')
+    parser.add_argument('--backfill', metavar='ARCHIVE',
+                        help='record a directory or tarball of archived lifecycle pages in the history and exit '
+                             '(see backfill.py for more options)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='extraction processes for --backfill (default: CPU count)')
+    args = parser.parse_args()
+    
+    from history_store import HistoryStore
+    history = HistoryStore(args.history_db)
+    
+    if args.import_files:
+        imported = history.import_legacy_files(args.import_files)
+        print(f"Imported {imported} files into {args.history_db}")
+        return
+    
+    if args.backfill:
+        from backfill import backfill, default_checkpoint_path
+        summary = backfill(args.backfill, history, args.workers, default_checkpoint_path(args.backfill))
+        print(f"Recorded {summary['recorded']} captures from {summary['total_pages']} pages in {args.history_db}")
+        return
+    
     print("IBM Watson Foundation Models Deprecation Scraper")
     print("=" * 50)
     
@@ -254,8 +510,13 @@ def main():
         # Display results
         display_results(data)
         
+        # Record in the history database
+        _, is_new = history.record(data, origin='cli')
+        print(f"Snapshot recorded in {args.history_db}" + ("" if is_new else " (unchanged since a previous capture)"))
+        
         # Save to files
-        save_data_to_files(data)
+        if args.export:
+            save_data_to_files(data)
         
         # Convert to RSS XML
         rss_file = convert_to_rss_xml(data)
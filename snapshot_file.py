@@ -0,0 +1,137 @@
+"""
+Compact snapshot file for warm starts.
+
+The server writes the installed snapshot to SNAPSHOT_FILE on every publish
+and reads it back at import when the shared snapshot store is empty, e.g. in
+a fresh container or after the database was removed. Workers then serve the
+last good feed immediately instead of 404s until the first scrape.
+
+Layout:
+
+    magic           8 bytes, b'WXSNAP' + format version
+    published_at    8-byte big-endian double, rewritten in place by touch
+    metadata length 8-byte big-endian unsigned
+    metadata        pickle: the snapshot minus its bodies, plus per response
+                    its content type, Last-Modified and (encoding, ETag,
+                    length) of each body
+    bodies          the pre-encoded response bodies, back to back
+
+Every body is stored once, in every encoding it was served in, so loading
+is one read plus slicing; nothing is re-rendered or re-compressed. The RSS
+text is not stored separately, because it is the identity body of 'feed'.
+
+    python snapshot_file.py FILE                   describe a snapshot file
+    python snapshot_file.py FILE --from-db DB      write one from a snapshot store
+"""
+import argparse
+import os
+import pickle
+import struct
+import time
+from datetime import datetime
+
+from feed_cache import CachedResponse
+
+MAGIC = b'WXSNAP\x00\x01'
+HEADER = struct.Struct('>dQ')
+
+
+class SnapshotFileError(ValueError):
+    """The file is not a snapshot file this version can read"""
+
+
+def write_snapshot_file(path, snapshot, published_at=None):
+    """Write ``snapshot`` to ``path`` atomically; returns the bytes written"""
+    metadata = {key: value for key, value in snapshot.items() if key not in ('responses', 'rss_content')}
+    metadata['responses'] = {}
+    bodies = []
+    for name, response in snapshot['responses'].items():
+        encoded = []
+        for encoding, body in response.bodies.items():
+            encoded.append((encoding, response.etags[encoding], len(body)))
+            bodies.append(body)
+        metadata['responses'][name] = (response.content_type, response.last_modified, encoded)
+    metadata = pickle.dumps(metadata, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # Unique per process, so concurrent publishers never interleave writes
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER.pack(published_at or time.time(), len(metadata)))
+        f.write(metadata)
+        for body in bodies:
+            f.write(body)
+        size = f.tell()
+    os.replace(temporary, path)
+    return size
+
+
+def read_snapshot_file(path):
+    """``(published_at, snapshot)`` from a snapshot file; raises SnapshotFileError if unreadable"""
+    with open(path, 'rb') as f:
+        blob = f.read()
+    start = len(MAGIC) + HEADER.size
+    if len(blob) < start or blob[:len(MAGIC)] != MAGIC:
+        raise SnapshotFileError(f"{path} is not a snapshot file")
+    published_at, metadata_length = HEADER.unpack_from(blob, len(MAGIC))
+    try:
+        snapshot = pickle.loads(blob[start:start + metadata_length])
+    except Exception as e:
+        raise SnapshotFileError(f"{path} has unreadable metadata: {e}")
+
+    offset = start + metadata_length
+    responses = {}
+    for name, (content_type, last_modified, encoded) in snapshot['responses'].items():
+        bodies, etags = {}, {}
+        for encoding, etag, length in encoded:
+            bodies[encoding] = blob[offset:offset + length]
+            etags[encoding] = etag
+            offset += length
+        responses[name] = CachedResponse.from_encoded(content_type, last_modified, bodies, etags)
+    if offset != len(blob):
+        raise SnapshotFileError(f"{path} is truncated or has trailing data")
+
+    snapshot['responses'] = responses
+    snapshot['rss_content'] = responses['feed'].bodies['identity'].decode('utf-8') if 'feed' in responses else ''
+    return published_at, snapshot
+
+
+def touch_snapshot_file(path):
+    """Mark the file's snapshot as freshly verified, like SnapshotStore.touch()"""
+    try:
+        with open(path, 'r+b') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return False
+            f.write(struct.pack('>d', time.time()))
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or write a warm-start snapshot file')
+    parser.add_argument('file')
+    parser.add_argument('--from-db', metavar='DB', help='write the snapshot stored in this snapshot database')
+    args = parser.parse_args()
+
+    if args.from_db:
+        from snapshot_store import SnapshotStore
+
+        store = SnapshotStore(args.from_db)
+        _, snapshot = store.load()
+        if snapshot is None:
+            parser.exit(1, f"{args.from_db} holds no snapshot\n")
+        size = write_snapshot_file(args.file, snapshot, store.get_published_at())
+        print(f"Wrote {size} bytes to {args.file}")
+
+    started = time.perf_counter()
+    published_at, snapshot = read_snapshot_file(args.file)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{args.file}: {len(snapshot['data'])} models, published {datetime.fromtimestamp(published_at):%Y-%m-%d %H:%M:%S}, "
+          f"read in {elapsed:.1f} ms")
+    for name, response in snapshot['responses'].items():
+        print(f"  {name}: " + ', '.join(f"{encoding} {len(body)} bytes" for encoding, body in response.bodies.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Shared snapshot store for multi-worker (gunicorn) deployments.
+
+The latest snapshot (scraped data, rendered RSS and pre-encoded response
+bodies) lives in a single SQLite row in WAL mode together with a version
+counter. Publishing replaces the row in one transaction, so readers see either
+the old or the new snapshot, never a mix. Workers poll the version with a
+one-row lookup and only unpickle the payload when it changed, so no worker
+re-parses or re-renders what another worker produced.
+
+A lock file next to the database makes sure only one process scrapes at a time.
+
+The same database carries a short, append-only event log (scrape started or
+finished, snapshot changed) so every worker can push events to its own
+/api/events listeners whichever worker produced them, and the state of recent
+refresh jobs so /api/jobs/<id> answers whichever worker the poll lands on.
+"""
+import pickle
+import threading
+import time
+from contextlib import contextmanager
+
+from db_connections import ThreadConnections
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process scrape lock
+    fcntl = None
+
+# Seconds between attempts to take the scrape lock
+LOCK_POLL_INTERVAL = 0.05
+
+# Events kept for clients resuming with Last-Event-ID
+MAX_EVENTS = 1000
+
+# Refresh jobs kept for /api/jobs/<id>
+MAX_JOBS = 100
+
+
+class SnapshotStore:
+    """SQLite-backed, versioned snapshot shared between processes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + '.lock'
+        self._connections = ThreadConnections(path)
+        self._thread_lock = threading.Lock()
+        self._connect().execute("""
+            CREATE TABLE IF NOT EXISTS snapshot (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL,
+                published_at REAL NOT NULL,
+                payload BLOB NOT NULL
+            )
+        """)
+        self._connect().execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at REAL NOT NULL,
+                type TEXT NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        self._connect().execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+
+    def _connect(self):
+        return self._connections.get()
+
+    def get_version(self):
+        """Return the current snapshot version (0 if nothing was published)"""
+        row = self._connect().execute("SELECT version FROM snapshot WHERE id = 1").fetchone()
+        return row[0] if row else 0
+
+    def get_published_at(self):
+        """Return the epoch time of the last publish, or None"""
+        row = self._connect().execute("SELECT published_at FROM snapshot WHERE id = 1").fetchone()
+        return row[0] if row else None
+
+    def load(self):
+        """Return ``(version, snapshot)`` or ``(0, None)`` if the store is empty"""
+        row = self._connect().execute("SELECT version, payload FROM snapshot WHERE id = 1").fetchone()
+        if not row:
+            return 0, None
+        return row[0], pickle.loads(row[1])
+
+    def publish(self, snapshot):
+        """Atomically replace the stored snapshot and return its new version"""
+        payload = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = self.get_version() + 1
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshot (id, version, published_at, payload) VALUES (1, ?, ?, ?)",
+                (version, time.time(), payload)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return version
+
+    def seed(self, snapshot, published_at=None):
+        """
+        Store ``snapshot`` only if nothing was published yet, e.g. when warm
+        starting from a snapshot file. Returns its version, or None if another
+        snapshot got there first.
+        """
+        payload = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self.get_version():
+                conn.execute("ROLLBACK")
+                return None
+            conn.execute(
+                "INSERT INTO snapshot (id, version, published_at, payload) VALUES (1, 1, ?, ?)",
+                (published_at or time.time(), payload)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return 1
+
+    def touch(self):
+        """Mark the current snapshot as freshly verified without changing it"""
+        self._connect().execute("UPDATE snapshot SET published_at = ? WHERE id = 1", (time.time(),))
+
+    def append_event(self, event_type, data):
+        """Append an event (``data`` is a JSON string) and return its id"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            event_id = conn.execute(
+                "INSERT INTO events (created_at, type, data) VALUES (?, ?, ?)",
+                (time.time(), event_type, data)
+            ).lastrowid
+            conn.execute("DELETE FROM events WHERE id <= ?", (event_id - MAX_EVENTS,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return event_id
+
+    def events_after(self, event_id, limit=100):
+        """Return up to ``limit`` ``(id, type, data)`` rows newer than ``event_id``"""
+        return self._connect().execute(
+            "SELECT id, type, data FROM events WHERE id > ? ORDER BY id LIMIT ?", (event_id, limit)
+        ).fetchall()
+
+    def last_event_id(self):
+        row = self._connect().execute("SELECT MAX(id) FROM events").fetchone()
+        return row[0] or 0
+
+    def save_job(self, job_id, data):
+        """Insert or update a refresh job (``data`` is a JSON string), keeping the newest MAX_JOBS"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO jobs (id, updated_at, data) VALUES (?, ?, ?)",
+                         (job_id, time.time(), data))
+            conn.execute(
+                "DELETE FROM jobs WHERE id NOT IN (SELECT id FROM jobs ORDER BY updated_at DESC LIMIT ?)",
+                (MAX_JOBS,)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_job(self, job_id):
+        """Return the JSON string saved for a refresh job, or None"""
+        row = self._connect().execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    @contextmanager
+    def scrape_lock(self):
+        """
+        Hold the cross-process scrape lock. Blocks while another process
+        (or thread) is scraping.
+        """
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                # Poll instead of blocking in flock() so that a waiting
+                # gevent worker keeps serving its other connections
+                while True:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        time.sleep(LOCK_POLL_INTERVAL)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
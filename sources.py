@@ -0,0 +1,237 @@
+"""
+Registry of IBM foundation model lifecycle pages and concurrent fetching.
+
+Each source has a URL, a table locator (keywords the table text must contain)
+and a column mapping (record field -> header keyword or column index). All
+enabled sources are fetched in parallel on a bounded thread pool, so a refresh
+takes about as long as the slowest source, and the results are merged into one
+deduplicated dataset that records which sources listed each model.
+
+Only the SaaS page is scraped by default. Extra sources can be added with a
+JSON file named by SOURCES_FILE, a list of objects with the same keys as
+Source. sources.example.json lists the watsonx.ai software pages; their URLs
+and table locators are still unverified, so check them against the live
+pages before pointing SOURCES_FILE at it. SOURCES limits the refresh to a
+comma-separated list of source names.
+
+Each fetch is retried with backoff on transient errors behind a per-source
+circuit breaker, and the whole refresh runs within REFRESH_BUDGET_SECONDS.
+A source that fails, is skipped by its breaker or returns an implausibly
+small table contributes its last good records instead. "Implausibly small"
+is measured against the snapshot being served (each source against the
+records listing it), so the guard holds right after a warm start, before
+anything was fetched in this process.
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+
+from changes import model_key
+from metrics import CIRCUIT_OPEN, UPSTREAM_BYTES, UPSTREAM_FETCH_SECONDS, UPSTREAM_RETRIES
+from resilience import Budget, CircuitBreaker, ImplausibleResultError, RetryPolicy, check_plausible
+from scraper import IBM_LIFECYCLE_URL, extract_table, fetch_deprecated_models, get_cached_records
+
+# The columns every lifecycle table is expected to have
+DEFAULT_COLUMNS = {
+    'foundation_model_name': 'model',
+    'availability_date': 'availab',
+    'deprecation_date': 'deprecat',
+    'withdrawal_date': 'withdraw',
+    'recommended_alternative': 'alternative'
+}
+
+# Upper bound on parallel upstream requests
+MAX_WORKERS = 4
+
+# Wall-clock limit for one refresh of all sources, retries included
+REFRESH_BUDGET_SECONDS = float(os.environ.get('REFRESH_BUDGET_SECONDS', 120))
+
+RETRY_POLICY = RetryPolicy(
+    attempts=int(os.environ.get('UPSTREAM_ATTEMPTS', 4)),
+    base_delay=float(os.environ.get('UPSTREAM_BACKOFF_SECONDS', 0.5)),
+    max_delay=float(os.environ.get('UPSTREAM_BACKOFF_MAX_SECONDS', 8))
+)
+
+# Circuit breakers by source name
+_breakers = {}
+
+
+def _breaker_changed(breaker, state):
+    CIRCUIT_OPEN.set(1 if state == 'open' else 0, source=breaker.name)
+
+
+def get_breaker(name):
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers.setdefault(name, CircuitBreaker(
+            name,
+            failure_threshold=int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 5)),
+            reset_timeout=float(os.environ.get('CIRCUIT_RESET_SECONDS', 120)),
+            on_change=_breaker_changed
+        ))
+    return breaker
+
+
+class Source:
+    """One lifecycle page to scrape"""
+
+    def __init__(self, name, url, locator=None, columns=None, timeout=30):
+        self.name = name
+        self.url = url
+        # No locator means the default page extraction (with its fallbacks)
+        self.locator = tuple(keyword.lower() for keyword in locator) if locator else None
+        self.columns = columns or DEFAULT_COLUMNS
+        self.timeout = timeout
+
+    def extractor(self):
+        if self.locator is None:
+            return None
+        return partial(extract_table, locator=self.locator, columns=self.columns)
+
+    def served_records(self, served):
+        """The records of a served snapshot that this source listed"""
+        return [record for record in served if self.name in record.get('sources', ())]
+
+    def fetch(self, budget=None, baseline=None):
+        """
+        Fetch with retries, behind this source's circuit breaker, within
+        ``budget``. ``baseline`` is passed on to fetch_deprecated_models().
+        """
+        breaker = get_breaker(self.name)
+
+        def attempt():
+            breaker.before_call()
+            timeout = self.timeout if budget is None else max(1.0, min(self.timeout, budget.remaining()))
+            try:
+                result = fetch_deprecated_models(self.url, timeout=timeout, extract=self.extractor(),
+                                                 baseline=baseline)
+            except ImplausibleResultError:
+                # Upstream answered; the page content is the problem
+                breaker.record_success()
+                raise
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            return result
+
+        def on_retry(attempt_number, delay, error):
+            UPSTREAM_RETRIES.inc(source=self.name)
+            print(f"Retrying {self.name} in {delay:.1f} s (attempt {attempt_number} failed: {error})")
+
+        return RETRY_POLICY.call(attempt, budget, on_retry)
+
+
+DEFAULT_SOURCES = [
+    Source('saas', IBM_LIFECYCLE_URL),
+]
+
+
+def load_sources(path=None, names=None):
+    """
+    Return the default sources plus any defined in the JSON file at ``path``,
+    optionally limited to ``names``.
+    """
+    sources = list(DEFAULT_SOURCES)
+    path = path or os.environ.get('SOURCES_FILE')
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            sources += [Source(**entry) for entry in json.load(f)]
+
+    names = names or [name.strip() for name in os.environ.get('SOURCES', '').split(',') if name.strip()]
+    if names:
+        sources = [source for source in sources if source.name in names]
+    return sources
+
+
+def merge_records(results):
+    """
+    Merge per-source records in registry order. The first source listing a
+    model provides its fields; every source listing it is kept in 'sources'.
+    """
+    merged = {}
+    for name, records in results:
+        for record in records:
+            key = model_key(record)
+            if key in merged:
+                if name not in merged[key]['sources']:
+                    merged[key]['sources'].append(name)
+            else:
+                merged[key] = dict(record, sources=[name])
+    return list(merged.values())
+
+
+def fetch_all_sources(sources=None, max_workers=MAX_WORKERS, budget=None, served=None):
+    """
+    Fetch all sources concurrently and merge their records.
+
+    ``served`` is the data of the snapshot currently served. Each source's
+    parse is checked against the records there that list it. If none of the
+    served records say which source listed them (captures from before the
+    source registry), the merged result is checked against all of them.
+
+    A source that fails or misses the refresh budget contributes its last
+    good records, so one bad page never looks like mass removals. Returns a
+    dict shaped like fetch_deprecated_models()'s result with a per-source
+    breakdown in 'sources'. Raises the first error if every source failed,
+    and ImplausibleResultError if the merged result is implausible.
+    """
+    sources = sources if sources is not None else load_sources()
+    budget = budget or Budget(REFRESH_BUDGET_SECONDS)
+    started = time.perf_counter()
+    served = served or []
+    attributed = any('sources' in record for record in served)
+    baselines = {source.name: source.served_records(served) if attributed else None for source in sources}
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(sources)), thread_name_prefix='source')
+    futures = {executor.submit(source.fetch, budget, baselines[source.name]): source for source in sources}
+    wait(futures, timeout=budget.remaining())
+    # Don't wait for stragglers; their threads finish in the background
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    per_source = {}
+    merged_input = []
+    errors = []
+    for future, source in futures.items():
+        if future.done() and not future.cancelled() and future.exception() is None:
+            result = future.result()
+            UPSTREAM_FETCH_SECONDS.observe(result['fetch_ms'] / 1000, source=source.name)
+            UPSTREAM_BYTES.observe(result['bytes'], source=source.name)
+            per_source[source.name] = {
+                'status': 'changed' if result['changed'] else 'unchanged',
+                'records': len(result['data']),
+                'fetch_ms': result['fetch_ms'],
+                'parse_ms': result['parse_ms'],
+                'bytes': result['bytes']
+            }
+            merged_input.append((source.name, result['data']))
+            continue
+
+        if future.done() and not future.cancelled():
+            error = future.exception()
+        else:
+            error = TimeoutError(f"{source.name} did not finish within the {budget.seconds:.0f} s refresh budget")
+        errors.append(error)
+        print(f"Error fetching source {source.name}: {error}")
+        fallback = get_cached_records(source.url) or baselines[source.name] or []
+        per_source[source.name] = {'status': 'error', 'error': str(error), 'records': len(fallback)}
+        merged_input.append((source.name, fallback))
+
+    if len(errors) == len(sources):
+        raise errors[0]
+
+    data = merge_records(merged_input)
+    if not attributed:
+        check_plausible(served, data)
+
+    results = [per_source[source.name] for source in sources]
+    return {
+        'data': data,
+        'changed': any(entry['status'] == 'changed' for entry in results),
+        'bytes': sum(entry.get('bytes', 0) for entry in results),
+        'fetch_ms': (time.perf_counter() - started) * 1000,
+        'parse_ms': sum(entry.get('parse_ms', 0.0) for entry in results),
+        'sources': per_source
+    }
@@ -0,0 +1,88 @@
+import os
+import re
+import sys
+import tempfile
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The server's modules live at the repository root, the upstream stub and
+# its fixture page with the benchmarks
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, 'benchmarks'))
+
+# rss_server opens its stores at import; keep them out of the working tree
+SCRATCH_DIR = tempfile.mkdtemp(prefix='wxnotif-tests-')
+os.environ.update({
+    'SNAPSHOT_DB': os.path.join(SCRATCH_DIR, 'snapshot.db'),
+    'HISTORY_DB': os.path.join(SCRATCH_DIR, 'history.db'),
+    'NOTIFY_DB': os.path.join(SCRATCH_DIR, 'notify.db'),
+    'SNAPSHOT_FILE': '',
+    'REFRESH_INTERVAL_SECONDS': '0',
+    'UPSTREAM_ATTEMPTS': '1'
+})
+
+from upstream_stub import DEFAULT_PAGE, UpstreamStub  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def page():
+    """The recorded lifecycle page"""
+    with open(DEFAULT_PAGE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture(scope='session')
+def truncated_page(page):
+    """The recorded page with only the first four models of each table, like a half-loaded page"""
+    def cut(table):
+        rows = list(re.finditer(r'<tr\b.*?</tr>', table.group(0), re.S))
+        return table.group(0)[:rows[4].end()] + table.group(0)[rows[-1].end():]
+
+    return re.sub(r'<table\b.*?</table>', cut, page, flags=re.S)
+
+
+@pytest.fixture
+def upstream():
+    """A stand-in for the IBM docs site serving the recorded page at /lifecycle"""
+    import scraper
+
+    scraper.clear_upstream_cache()
+    with UpstreamStub() as stub:
+        yield stub
+    scraper.clear_upstream_cache()
+
+
+@pytest.fixture
+def source(upstream, monkeypatch):
+    """The only source of a refresh, pointed at the stub, with a fresh circuit breaker"""
+    import sources
+
+    stub_source = sources.Source('stub', upstream.url, timeout=5)
+    monkeypatch.setattr(sources, 'DEFAULT_SOURCES', [stub_source])
+    monkeypatch.setattr(sources, '_breakers', {})
+    monkeypatch.delenv('SOURCES_FILE', raising=False)
+    monkeypatch.delenv('SOURCES', raising=False)
+    return stub_source
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch, source):
+    """
+    rss_server with empty stores of its own, nothing served yet and no
+    background threads, scraping the stub.
+    """
+    import rss_server
+    from history_store import HistoryStore
+    from snapshot_store import SnapshotStore
+
+    monkeypatch.setattr(rss_server, 'snapshot_store', SnapshotStore(str(tmp_path / 'snapshot.db')))
+    monkeypatch.setattr(rss_server, 'history_store', HistoryStore(str(tmp_path / 'history.db')))
+    monkeypatch.setattr(rss_server, 'snapshot_version', 0)
+    monkeypatch.setattr(rss_server, 'latest_data', [])
+    monkeypatch.setattr(rss_server, 'latest_changes', [])
+    monkeypatch.setattr(rss_server, 'latest_responses', rss_server.build_response_cache([], "", None))
+    # Requests would otherwise start the refresh, notifier and alert threads
+    monkeypatch.setattr(rss_server, 'background_pid', os.getpid())
+    return rss_server
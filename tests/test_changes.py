@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from changes import MAX_CHANGE_EVENTS, diff_events, diff_snapshots, model_guid, model_key, record_changes
+from conftest import REPO_DIR
+from rss_writer import render_changes_rss, render_rss
+
+GRANITE = {'foundation_model_name': 'granite-13b-chat-v2', 'availability_date': '24 August 2023',
+           'deprecation_date': '10 October 2024', 'withdrawal_date': '3 February 2025',
+           'recommended_alternative': 'mistral-small-24b-instruct-2501'}
+LLAMA = {'foundation_model_name': 'llama-2-70b-chat', 'availability_date': '–', 'deprecation_date': '–',
+         'withdrawal_date': '–', 'recommended_alternative': '–'}
+MIXTRAL = dict(LLAMA, foundation_model_name='mixtral-8x7b-instruct-v01')
+
+DETECTED_AT = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+def test_model_key_ignores_case_and_spacing():
+    assert model_key({'foundation_model_name': '  Granite-13B-chat-v2 '}) == 'granite-13b-chat-v2'
+    assert model_key({'foundation_model_name': 'llama 2\t70b'}) == 'llama 2 70b'
+
+
+def test_guids_are_stable():
+    assert model_guid(GRANITE) == 'ibm-model-3e2f30ee6805b02e'
+    assert model_guid(dict(GRANITE, foundation_model_name='Granite-13b-Chat-v2')) == model_guid(GRANITE)
+    assert model_guid(dict(GRANITE, withdrawal_date='3 March 2025')) == model_guid(GRANITE)
+    assert model_guid(LLAMA) != model_guid(GRANITE)
+
+
+def test_guids_do_not_depend_on_hash_randomization():
+    script = "from changes import model_guid; print(model_guid({'foundation_model_name': 'granite-13b-chat-v2'}))"
+    for seed in ('1', '2'):
+        output = subprocess.run([sys.executable, '-c', script], cwd=REPO_DIR, capture_output=True, text=True,
+                                check=True, env=dict(os.environ, PYTHONHASHSEED=seed)).stdout
+        assert output.strip() == model_guid(GRANITE)
+
+
+def test_rss_items_carry_the_model_guid():
+    assert f'<guid isPermaLink="false">{model_guid(GRANITE)}</guid>' in render_rss([GRANITE])
+
+
+def test_diff_classifies_models():
+    moved = dict(GRANITE, withdrawal_date='3 March 2025', sources=['saas'])
+    diff = diff_snapshots([GRANITE, LLAMA], [moved, MIXTRAL])
+    assert diff['added'] == [MIXTRAL]
+    assert diff['removed'] == [LLAMA]
+    assert diff['changed'] == [{'model': moved, 'fields': {'withdrawal_date': ['3 February 2025', '3 March 2025']}}]
+
+
+def test_untracked_fields_are_not_changes():
+    assert diff_snapshots([GRANITE], [dict(GRANITE, sources=['saas', 'software-2.2.x'])])['changed'] == []
+    assert diff_snapshots([GRANITE], [dict(GRANITE, foundation_model_name='GRANITE-13b-chat-v2')]) == {
+        'added': [], 'changed': [], 'removed': []
+    }
+
+
+def test_change_event_ids_are_deterministic():
+    diff = diff_snapshots([GRANITE], [LLAMA])
+    events = diff_events(diff, DETECTED_AT)
+    assert [event['kind'] for event in events] == ['added', 'removed']
+    assert [event['id'] for event in events] == [event['id'] for event in diff_events(diff, DETECTED_AT)]
+    later = diff_events(diff, DETECTED_AT.replace(hour=4))
+    assert not {event['id'] for event in events} & {event['id'] for event in later}
+    assert f'<guid isPermaLink="false">{events[0]["id"]}</guid>' in render_changes_rss(events)
+
+
+def test_first_snapshot_records_no_changes():
+    events, diff = record_changes([], [], [GRANITE, LLAMA], DETECTED_AT)
+    assert events == [] and diff == {'added': [], 'changed': [], 'removed': []}
+
+
+def test_change_log_is_newest_first_and_bounded():
+    events, _ = record_changes([], [GRANITE], [GRANITE, LLAMA], DETECTED_AT)
+    events, _ = record_changes(events, [GRANITE, LLAMA], [GRANITE], DETECTED_AT.replace(hour=4))
+    assert [event['kind'] for event in events] == ['removed', 'added']
+
+    many = [{'id': str(number)} for number in range(MAX_CHANGE_EVENTS)]
+    events, _ = record_changes(many, [GRANITE], [LLAMA], DETECTED_AT)
+    assert len(events) == MAX_CHANGE_EVENTS
+    assert events[2] == many[0]
@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+import threading
+import types
+
+import pytest
+
+from conftest import REPO_DIR
+from db_connections import ThreadConnections, native_thread_id
+from snapshot_store import SnapshotStore
+
+
+def in_thread(function):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(function()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_one_connection_per_thread(tmp_path):
+    connections = ThreadConnections(str(tmp_path / 'test.db'))
+    assert connections.get() is connections.get()
+    assert in_thread(connections.get) is not connections.get()
+    assert len(connections) == 2
+
+
+def test_fork_opens_new_connections(tmp_path, monkeypatch):
+    connections = ThreadConnections(str(tmp_path / 'test.db'))
+    inherited = connections.get()
+    monkeypatch.setattr(os, 'getpid', lambda: -1)
+    assert connections.get() is not inherited
+    assert len(connections) == 1
+
+
+def test_greenlet_locals_do_not_split_connections(tmp_path, monkeypatch):
+    # gevent's patched threading hands every greenlet its own identifier;
+    # the original get_ident still names the OS thread
+    patched_ids = iter(range(1000))
+    original_get_ident = threading.get_ident
+    monkey = types.SimpleNamespace(
+        is_module_patched=lambda name: name == 'threading',
+        get_original=lambda module, name: original_get_ident
+    )
+    monkeypatch.setitem(sys.modules, 'gevent.monkey', monkey)
+    monkeypatch.setattr(threading, 'get_ident', lambda: next(patched_ids))
+    assert native_thread_id() == native_thread_id()
+
+    store = SnapshotStore(str(tmp_path / 'snapshot.db'))
+    for _ in range(50):
+        store.get_version()
+    assert len(store._connections) == 1
+
+
+GEVENT_SCRIPT = """
+from gevent import monkey
+monkey.patch_all()
+import sys
+import gevent
+from snapshot_store import SnapshotStore
+
+store = SnapshotStore(sys.argv[1])
+gevent.joinall([gevent.spawn(store.get_version) for _ in range(50)])
+print(len(store._connections))
+"""
+
+
+def test_gevent_greenlets_share_a_connection(tmp_path):
+    pytest.importorskip('gevent')
+    output = subprocess.run([sys.executable, '-c', GEVENT_SCRIPT, str(tmp_path / 'snapshot.db')],
+                            cwd=REPO_DIR, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == '1'
@@ -0,0 +1,72 @@
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from deadlines import DAY, DeadlineScheduler
+from model_dates import normalize_records
+
+WITHDRAWAL = datetime(2026, 3, 1, tzinfo=timezone.utc).timestamp()
+
+
+def models(withdrawal_date='1 March 2026'):
+    return normalize_records([{'foundation_model_name': 'granite-13b-chat-v2', 'withdrawal_date': withdrawal_date,
+                               'deprecation_date': '–', 'recommended_alternative': '–'}])
+
+
+class FlakyCallback:
+    """on_alert that fails its first ``failures`` calls, like a locked database"""
+
+    def __init__(self, failures=1):
+        self.failures = failures
+        self.delivered = []
+
+    def __call__(self, alerts):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError('database is locked')
+        self.delivered += [alert['id'] for alert in alerts]
+
+
+def test_alerts_fire_at_each_lead_time():
+    callback = FlakyCallback(failures=0)
+    scheduler = DeadlineScheduler(callback, lead_days=(30, 7))
+    scheduler.sync(models(), now=WITHDRAWAL - 60 * DAY)
+    assert scheduler.fire(now=WITHDRAWAL - 31 * DAY) == []
+    assert [alert['deadline']['lead_days'] for alert in scheduler.fire(now=WITHDRAWAL - 30 * DAY)] == [30]
+    assert [alert['deadline']['lead_days'] for alert in scheduler.fire(now=WITHDRAWAL - 7 * DAY)] == [7]
+    assert len(callback.delivered) == 2
+
+
+def test_only_the_latest_passed_lead_time_fires():
+    scheduler = DeadlineScheduler(lead_days=(30, 7, 1))
+    scheduler.sync(models(), now=WITHDRAWAL - 5 * DAY)
+    assert [alert['deadline']['lead_days'] for alert in scheduler.due(now=WITHDRAWAL - 5 * DAY)] == [7]
+
+
+def test_failed_callback_is_retried():
+    callback = FlakyCallback()
+    scheduler = DeadlineScheduler(callback, lead_days=(30,))
+    scheduler.sync(models(), now=WITHDRAWAL - 60 * DAY)
+    now = WITHDRAWAL - 30 * DAY
+
+    with pytest.raises(sqlite3.OperationalError):
+        scheduler.fire(now=now, retry_delay=60)
+    assert scheduler.upcoming(days=60, now=now)[0]['next_alert']['lead_days'] == 30
+    assert scheduler.fire(now=now + 59) == []
+
+    alerts = scheduler.fire(now=now + 60)
+    assert callback.delivered == [alerts[0]['id']]
+    assert alerts[0]['id'].endswith('-withdrawal-date-2026-03-01-30d')
+    assert scheduler.fire(now=now + 120) == []
+
+
+def test_failed_alert_for_a_moved_date_is_dropped():
+    scheduler = DeadlineScheduler(FlakyCallback(), lead_days=(30,))
+    scheduler.sync(models(), now=WITHDRAWAL - 60 * DAY)
+    now = WITHDRAWAL - 30 * DAY
+    with pytest.raises(sqlite3.OperationalError):
+        scheduler.fire(now=now, retry_delay=60)
+
+    assert scheduler.sync(models('1 June 2026'), now=now + 1) == 1
+    assert scheduler.fire(now=now + 60) == []
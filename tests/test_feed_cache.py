@@ -0,0 +1,68 @@
+import gzip
+from datetime import datetime, timezone
+
+import pytest
+
+from feed_cache import CachedResponse, negotiate_encoding
+
+UPDATED_AT = datetime(2025, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def cached():
+    return CachedResponse('<rss>' + 'model ' * 200 + '</rss>', 'application/rss+xml; charset=utf-8', UPDATED_AT)
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('', 'identity'),
+    ('gzip', 'gzip'),
+    ('gzip, deflate', 'gzip'),
+    ('deflate', 'identity'),
+    ('gzip;q=0', 'identity'),
+    ('gzip;q=0.5, identity;q=0.8', 'identity'),
+    ('*', 'gzip'),
+    ('*;q=0, gzip', 'gzip'),
+    ('identity;q=0, gzip', 'gzip'),
+    ('*;q=0, identity', 'identity'),
+    ('identity;q=0', None),
+    ('*;q=0', None),
+    ('gzip;q=0, identity;q=0', None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header, ('gzip', 'identity')) == expected
+
+
+def test_bodies_are_encoded_once_with_an_etag_each(cached):
+    assert cached.available[-2:] == ('gzip', 'identity')
+    assert gzip.decompress(cached.bodies['gzip']) == cached.bodies['identity']
+    assert len(set(cached.etags.values())) == len(cached.bodies)
+    assert cached.select('gzip') == ('gzip', cached.bodies['gzip'], cached.etags['gzip'])
+    assert cached.select('identity;q=0') is None
+
+
+def test_identical_bodies_get_the_same_etag(cached):
+    again = CachedResponse(cached.bodies['identity'], cached.content_type, UPDATED_AT)
+    assert again.etags == cached.etags
+
+
+def test_etag_of_any_encoding_matches(cached):
+    for etag in cached.etags.values():
+        assert cached.is_not_modified(etag, None)
+        assert cached.is_not_modified(f'"other", W/{etag}', None)
+    assert cached.is_not_modified('*', None)
+    assert not cached.is_not_modified('"other"', None)
+
+
+def test_last_modified_has_second_resolution(cached):
+    assert cached.last_modified_header == 'Thu, 02 Jan 2025 03:04:05 GMT'
+    assert cached.is_not_modified(None, 'Thu, 02 Jan 2025 03:04:05 GMT')
+    assert not cached.is_not_modified(None, 'Thu, 02 Jan 2025 03:04:04 GMT')
+    assert not cached.is_not_modified(None, 'not a date')
+    # If-None-Match wins over If-Modified-Since
+    assert not cached.is_not_modified('"other"', 'Thu, 02 Jan 2025 03:04:05 GMT')
+
+
+def test_rebuilt_response_keeps_bodies_and_etags(cached):
+    rebuilt = CachedResponse.from_encoded(cached.content_type, cached.last_modified, cached.bodies, cached.etags)
+    assert rebuilt.select('gzip') == cached.select('gzip')
+    assert rebuilt.last_modified_header == cached.last_modified_header
@@ -0,0 +1,88 @@
+import json
+import random
+from datetime import datetime
+
+from history_store import HistoryStore
+
+GRANITE = {'foundation_model_name': 'granite-13b-chat-v2', 'availability_date': '24 August 2023',
+           'deprecation_date': '10 October 2024', 'withdrawal_date': '3 February 2025',
+           'recommended_alternative': 'mistral-small-24b-instruct-2501'}
+GRANITE_MOVED = dict(GRANITE, withdrawal_date='3 March 2025')
+LLAMA = {'foundation_model_name': 'llama-2-70b-chat', 'availability_date': '–', 'deprecation_date': '–',
+         'withdrawal_date': '–', 'recommended_alternative': '–'}
+
+
+def versions(history):
+    return [(entry['first_seen'].timestamp(), entry['record']) for entry in history]
+
+
+def scan_history(store, name):
+    """model_history() the slow way: every capture, oldest first"""
+    history = []
+    for captured_at, digest, _ in store.captures():
+        payload = store._connect().execute("SELECT payload FROM contents WHERE content_hash = ?", (digest,)).fetchone()[0]
+        record = next((r for r in json.loads(payload) if r['foundation_model_name'] == name), None)
+        if (history or record is not None) and (not history or history[-1][1] != record):
+            history.append((captured_at.timestamp(), record))
+    return history
+
+
+def test_model_history_tracks_changes_and_absences(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    store.record([LLAMA], captured_at=100)
+    store.record([GRANITE, LLAMA], captured_at=200)
+    store.record([GRANITE, LLAMA], captured_at=300)
+    store.record([GRANITE_MOVED, LLAMA], captured_at=400)
+    store.record([LLAMA], captured_at=500)
+    store.record([LLAMA], captured_at=600)
+    store.record([GRANITE_MOVED], captured_at=700)
+
+    assert versions(store.model_history('granite-13b-chat-v2')) == [
+        (200, GRANITE), (400, GRANITE_MOVED), (500, None), (700, GRANITE_MOVED)
+    ]
+    assert versions(store.model_history('llama-2-70b-chat')) == [(100, LLAMA), (700, None)]
+    assert store.model_history('mixtral-8x7b') == []
+
+
+def test_model_history_matches_a_full_scan(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    rng = random.Random(7)
+    choices = [[], [GRANITE], [GRANITE_MOVED], [GRANITE, LLAMA], [LLAMA]]
+    for step in range(200):
+        # Some captures share a timestamp
+        store.record(rng.choice(choices), captured_at=1000 + step // 3)
+
+    for name in ('granite-13b-chat-v2', 'llama-2-70b-chat'):
+        assert versions(store.model_history(name)) == scan_history(store, name)
+
+
+def test_model_history_reads_only_the_models_captures(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    plan = ' '.join(row[3] for row in store._connect().execute(
+        "EXPLAIN QUERY PLAN SELECT 1 FROM model_records WHERE model_key = ?", ('x',)))
+    assert 'model_records_by_model' in plan
+
+
+def test_latest_and_as_of(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    store.record([GRANITE], captured_at=100)
+    store.record([GRANITE_MOVED], captured_at=200)
+    assert store.latest() == (datetime.fromtimestamp(200), [GRANITE_MOVED])
+    assert store.as_of(150) == (datetime.fromtimestamp(100), [GRANITE])
+    assert store.as_of(50) is None
+
+
+def test_history_fallback_does_not_rescan_legacy_files(server, monkeypatch):
+    server.history_store.record([GRANITE, LLAMA], captured_at=100)
+    monkeypatch.setattr(server.history_store, 'import_legacy_files', None)
+    assert server.load_data_from_files() == (True, 2)
+    assert len(server.latest_data) == 2
+
+
+def test_legacy_files_are_imported_once(tmp_path):
+    legacy = tmp_path / 'ibm_deprecated_models_20240101_120000.json'
+    legacy.write_text(json.dumps([GRANITE]), encoding='utf-8')
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    assert store.import_legacy_files(str(tmp_path)) == 1
+    assert store.import_legacy_files(str(tmp_path)) == 0
+    assert store.latest() == (datetime(2024, 1, 1, 12), [GRANITE])
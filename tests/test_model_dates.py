@@ -0,0 +1,56 @@
+import pytest
+
+from model_dates import date_epoch, date_iso, date_value, normalize_record, normalize_records, parse_date
+
+
+@pytest.mark.parametrize('raw, iso', [
+    ('3 February 2025', '2025-02-03'),
+    ('3 Feb 2025', '2025-02-03'),
+    ('3 February, 2025', '2025-02-03'),
+    ('February 3, 2025', '2025-02-03'),
+    ('Feb 3, 2025', '2025-02-03'),
+    ('2025-02-03', '2025-02-03'),
+    ('February 2025', '2025-02-01'),
+    ('  3 February\n2025 ', '2025-02-03'),
+])
+def test_parse_date_formats(raw, iso):
+    assert parse_date(raw)['iso'] == iso
+
+
+@pytest.mark.parametrize('raw', [None, '', '–', ' – ', 'TBD', '3 February', '31 February 2025'])
+def test_empty_and_unparseable_cells_have_no_date(raw):
+    assert parse_date(raw) is None
+
+
+def test_epoch_is_midnight_utc():
+    assert parse_date('3 February 2025')['epoch'] == 1738540800
+
+
+def test_normalize_attaches_every_date_field():
+    record = normalize_record({'foundation_model_name': 'granite-13b-chat-v2', 'availability_date': '–',
+                               'deprecation_date': '10 October 2024', 'withdrawal_date': '3 February 2025'})
+    assert record['dates'] == {
+        'availability_date': None,
+        'deprecation_date': {'iso': '2024-10-10', 'epoch': 1728518400},
+        'withdrawal_date': {'iso': '2025-02-03', 'epoch': 1738540800}
+    }
+
+
+def test_normalized_values_are_not_shared():
+    first, second = normalize_records([{'withdrawal_date': '3 February 2025'}, {'withdrawal_date': '3 February 2025'}])
+    first['dates']['withdrawal_date']['iso'] = 'mutated'
+    assert second['dates']['withdrawal_date']['iso'] == '2025-02-03'
+    assert parse_date('3 February 2025')['iso'] == '2025-02-03'
+
+
+def test_accessors_fall_back_for_records_never_normalized():
+    record = {'withdrawal_date': '3 February 2025'}
+    assert date_value(record, 'withdrawal_date') == {'iso': '2025-02-03', 'epoch': 1738540800}
+    assert date_iso(record, 'withdrawal_date') == '2025-02-03'
+    assert date_epoch(record, 'deprecation_date') is None
+
+
+def test_accessors_prefer_the_normalized_value():
+    record = normalize_record({'withdrawal_date': '3 February 2025'})
+    record['withdrawal_date'] = 'garbled'
+    assert date_iso(record, 'withdrawal_date') == '2025-02-03'
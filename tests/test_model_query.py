@@ -0,0 +1,73 @@
+import base64
+import json
+
+import pytest
+
+from model_query import ModelIndex, ModelQuery, QueryError, decode_cursor, encode_cursor, filter_args
+
+MODELS = [
+    {'foundation_model_name': name, 'withdrawal_date': withdrawal, 'recommended_alternative': '–'}
+    for name, withdrawal in (('granite-13b', '3 February 2025'), ('llama-2-70b', '–'), ('mixtral-8x7b', '1 May 2025'))
+]
+
+
+def crafted(payload):
+    """A cursor carrying any JSON payload, encoded the way encode_cursor() does"""
+    raw = json.dumps(payload).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor('-withdrawal_date', (False, 0, 'x', 2)), '-withdrawal_date') == (False, 0, 'x', 2)
+
+
+@pytest.mark.parametrize('payload', [
+    ['name', 5],
+    ['name', None],
+    ['name', 'granite'],
+    ['name', [['granite'], 0]],
+    ['name', [None, 0]],
+    ['name'],
+    ['name', ['granite', 0], 'extra'],
+    {'sort': 'name'},
+    'name',
+    None
+])
+def test_crafted_cursor_is_a_query_error(payload):
+    with pytest.raises(QueryError, match='Invalid cursor'):
+        decode_cursor(crafted(payload), 'name')
+
+
+@pytest.mark.parametrize('cursor', ['!!!', 'bm90IGpzb24', crafted(['name', ['granite', 0]])[:-3] + 'é'])
+def test_garbled_cursor_is_a_query_error(cursor):
+    with pytest.raises(QueryError, match='Invalid cursor'):
+        decode_cursor(cursor, 'name')
+
+
+def test_cursor_for_another_sort_is_rejected():
+    with pytest.raises(QueryError, match='different sort order'):
+        decode_cursor(encode_cursor('withdrawal_date', (False, 0, 'x', 0)), 'name')
+
+
+def test_crafted_cursor_fails_before_reaching_the_index():
+    with pytest.raises(QueryError):
+        ModelQuery({'sort': 'name', 'cursor': crafted(['name', 5])})
+
+
+def test_cursor_pages_through_the_index():
+    index = ModelIndex(MODELS)
+    first = list(index.sort_orders['name'].walk())[0][0]
+    query = ModelQuery({'sort': 'name', 'cursor': encode_cursor('name', first)})
+    assert [key for key, _ in index.sort_orders['name'].walk(query.cursor)] == [('llama-2-70b', 1), ('mixtral-8x7b', 2)]
+
+
+def test_feed_filters_ignore_paging_parameters():
+    args = {'model': 'granite*', 'sort': 'bogus', 'limit': 'all', 'cursor': '!!!', 'fields': 'nope'}
+    query = ModelQuery(filter_args(args))
+    assert query.models == ('granite*',)
+    assert sorted(ModelIndex(MODELS).matching(query)) == [0]
+
+
+def test_feed_filters_are_still_validated():
+    with pytest.raises(QueryError, match='withdrawal_within'):
+        ModelQuery(filter_args({'withdrawal_within': 'soon', 'limit': '10'}))
@@ -0,0 +1,92 @@
+import sqlite3
+
+
+def fail_once(monkeypatch, obj, name):
+    """Make ``obj.name`` raise "database is locked" on its next call only"""
+    original = getattr(obj, name)
+    calls = []
+
+    def flaky(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError('database is locked')
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(obj, name, flaky)
+    return calls
+
+
+def test_scrape_publishes_a_snapshot(server):
+    ok, count, _ = server.scrape_and_publish()
+    assert ok and count == 40
+    assert server.snapshot_store.get_version() == server.snapshot_version > 0
+    assert len(server.latest_data) == 40
+
+
+def test_unchanged_upstream_keeps_the_snapshot(server, upstream):
+    server.scrape_and_publish()
+    version = server.snapshot_version
+    ok, _, detail = server.scrape_and_publish()
+    assert ok and upstream.not_modified == 1
+    assert server.snapshot_version == version
+
+
+def test_change_is_published_after_a_failed_publish(server, upstream, page, monkeypatch):
+    server.scrape_and_publish()
+    upstream.set_page('/lifecycle', page.replace('3 February 2025', '3 March 2025'))
+
+    fail_once(monkeypatch, server.snapshot_store, 'publish')
+    ok, error, _ = server.scrape_and_publish()
+    assert not ok and 'locked' in error
+    assert server.latest_data[0]['withdrawal_date'] == '3 February 2025'
+
+    # Upstream would answer 304 to the validators of the unpublished fetch
+    ok, _, _ = server.scrape_and_publish()
+    assert ok and upstream.not_modified == 0
+    assert server.latest_data[0]['withdrawal_date'] == '3 March 2025'
+    assert server.snapshot_store.load()[1]['data'][0]['withdrawal_date'] == '3 March 2025'
+
+
+def test_first_scrape_is_retried_in_full_after_a_failed_history_write(server, upstream, monkeypatch):
+    fail_once(monkeypatch, server.history_store, 'record')
+    assert not server.scrape_and_publish()[0]
+    assert server.scrape_and_publish()[0]
+    assert len(server.latest_data) == 40 and upstream.not_modified == 0
+
+
+def test_feed_is_served_pre_encoded(server):
+    server.scrape_and_publish()
+    client = server.app.test_client()
+    cached = server.latest_responses['feed']
+
+    response = client.get('/feed.xml', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'] == cached.etags['gzip']
+    assert response.get_data() == cached.bodies['gzip']
+
+    response = client.get('/feed.xml')
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == cached.bodies['identity']
+
+
+def test_conditional_request_is_not_modified(server):
+    server.scrape_and_publish()
+    client = server.app.test_client()
+    etag = client.get('/api/data').headers['ETag']
+
+    response = client.get('/api/data', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.get_data() == b''
+    assert response.headers['ETag'] == etag
+
+    last_modified = client.get('/api/data').headers['Last-Modified']
+    assert client.get('/api/data', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+
+def test_refused_identity_is_not_acceptable(server):
+    server.scrape_and_publish()
+    client = server.app.test_client()
+    response = client.get('/feed.xml', headers={'Accept-Encoding': 'identity;q=0, *;q=0'})
+    assert response.status_code == 406
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert client.get('/feed.xml', headers={'Accept-Encoding': 'identity;q=0, gzip'}).status_code == 200
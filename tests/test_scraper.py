@@ -0,0 +1,44 @@
+import pytest
+
+from resilience import ImplausibleResultError
+from scraper import fetch_deprecated_models, get_cached_records
+
+
+def test_first_fetch_parses_the_page(upstream):
+    result = fetch_deprecated_models(upstream.url)
+    assert result['changed'] and result['status_code'] == 200
+    assert len(result['data']) == 40
+    assert get_cached_records(upstream.url) == result['data']
+
+
+def test_unchanged_page_is_not_modified(upstream):
+    first = fetch_deprecated_models(upstream.url)
+    second = fetch_deprecated_models(upstream.url)
+    assert upstream.not_modified == 1
+    assert second['status_code'] == 304 and not second['changed']
+    assert second['data'] == first['data'] and second['parse_ms'] == 0.0
+
+
+def test_page_with_unchanged_tables_skips_the_parse(upstream, page):
+    first = fetch_deprecated_models(upstream.url)
+    # A new ETag, but only the markup around the tables differs
+    upstream.set_page('/lifecycle', page.replace('<title>', '<title>Updated: '))
+    second = fetch_deprecated_models(upstream.url)
+    assert second['status_code'] == 200 and not second['changed']
+    assert second['data'] == first['data'] and second['parse_ms'] == 0.0
+
+
+def test_changed_tables_are_parsed(upstream, page):
+    fetch_deprecated_models(upstream.url)
+    upstream.set_page('/lifecycle', page.replace('3 February 2025', '3 March 2025'))
+    result = fetch_deprecated_models(upstream.url)
+    assert result['changed']
+    assert result['data'][0]['withdrawal_date'] == '3 March 2025'
+
+
+def test_implausible_parse_keeps_the_last_good_records(upstream, page):
+    first = fetch_deprecated_models(upstream.url)
+    upstream.set_page('/lifecycle', page[:page.index('<table')])
+    with pytest.raises(ImplausibleResultError):
+        fetch_deprecated_models(upstream.url)
+    assert get_cached_records(upstream.url) == first['data']
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from scheduler import RefreshScheduler
+from snapshot_store import MAX_JOBS, SnapshotStore
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """Two workers' views of one snapshot database"""
+    path = str(tmp_path / 'snapshot.db')
+    return SnapshotStore(path), SnapshotStore(path)
+
+
+def test_publish_is_seen_by_other_instances(stores):
+    publisher, reader = stores
+    assert reader.get_version() == 0 and reader.load() == (0, None)
+
+    assert publisher.publish({'data': [1]}) == 1
+    assert reader.get_version() == 1
+    assert reader.load() == (1, {'data': [1]})
+
+    assert publisher.publish({'data': [2]}) == 2
+    assert reader.load() == (2, {'data': [2]})
+
+
+def test_seed_only_fills_an_empty_store(stores):
+    first, second = stores
+    assert first.seed({'data': ['file']}, published_at=100) == 1
+    assert second.seed({'data': ['other']}) is None
+    assert second.load() == (1, {'data': ['file']})
+    assert second.get_published_at() == 100
+
+
+def test_touch_keeps_the_version(stores):
+    publisher, reader = stores
+    publisher.seed({'data': []}, published_at=100)
+    publisher.touch()
+    assert reader.get_version() == 1 and reader.get_published_at() > 100
+
+
+def test_jobs_are_shared_and_pruned(stores):
+    writer, reader = stores
+    for number in range(MAX_JOBS + 5):
+        writer.save_job(f"job-{number}", json.dumps({'number': number}))
+    assert json.loads(reader.get_job(f"job-{MAX_JOBS + 4}")) == {'number': MAX_JOBS + 4}
+    assert reader._connect().execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == MAX_JOBS
+
+
+def test_job_status_answers_in_every_worker(stores):
+    running, polled = (RefreshScheduler(lambda: (True, 40, 'ok'), interval=0, job_store=store) for store in stores)
+    job, _ = running.submit()
+    assert job.done.wait(5)
+    running.stop(5)
+
+    status = polled.job_status(job.id)
+    assert status['status'] == 'succeeded' and status['models_count'] == 40
+    assert polled.job_status('unknown') is None
+
+
+def test_worker_installs_a_snapshot_published_elsewhere(server):
+    other_worker = SnapshotStore(server.snapshot_store.path)
+    records = [{'foundation_model_name': 'granite-13b-chat-v2', 'availability_date': '–', 'deprecation_date': '–',
+                'withdrawal_date': '3 February 2025', 'recommended_alternative': '–'}]
+    version = other_worker.publish(server.build_snapshot(records, server.generate_rss_content(records)))
+
+    assert server.sync_snapshot()
+    assert server.snapshot_version == version and server.latest_data == records
+    assert not server.sync_snapshot()
+    response = server.app.test_client().get('/api/data')
+    assert json.loads(response.get_data())['models_count'] == 1
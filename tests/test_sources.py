@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+from conftest import REPO_DIR
+from resilience import ImplausibleResultError, check_plausible
+from scraper import IBM_LIFECYCLE_URL, clear_upstream_cache, extract_deprecated_models
+from sources import Source, fetch_all_sources, load_sources
+
+EXAMPLE_FILE = os.path.join(REPO_DIR, 'sources.example.json')
+
+
+def test_only_the_saas_page_is_scraped_by_default(monkeypatch):
+    monkeypatch.delenv('SOURCES_FILE', raising=False)
+    monkeypatch.delenv('SOURCES', raising=False)
+    assert [(source.name, source.url) for source in load_sources()] == [('saas', IBM_LIFECYCLE_URL)]
+
+
+def test_example_sources_file_loads(monkeypatch):
+    monkeypatch.delenv('SOURCES', raising=False)
+    sources = load_sources(EXAMPLE_FILE)
+    assert [source.name for source in sources] == ['saas', 'software-2.1.x', 'software-2.2.x']
+    assert all(source.locator == ('deprecated', 'foundation model') for source in sources[1:])
+    assert [source.name for source in load_sources(EXAMPLE_FILE, ['software-2.2.x'])] == ['software-2.2.x']
+
+
+def mirrored(upstream, page, source):
+    """The stub source plus a second one serving its own copy of the page"""
+    upstream.set_page('/mirror', page)
+    return [source, Source('mirror', upstream.url_for('/mirror'), timeout=5)]
+
+
+def listed_by(data):
+    return {record['foundation_model_name']: record['sources'] for record in data}
+
+
+def test_plausibility_threshold():
+    check_plausible([], [])
+    check_plausible([1] * 40, [1] * 20)
+    with pytest.raises(ImplausibleResultError, match='parsed 19 records where the last good result had 40'):
+        check_plausible([1] * 40, [1] * 19)
+
+
+def test_truncated_page_parses_to_a_few_models(truncated_page):
+    assert 0 < len(extract_deprecated_models(truncated_page)) < 10
+
+
+def test_warm_started_refresh_rejects_a_truncated_page(source, upstream, truncated_page):
+    served = fetch_all_sources()['data']
+    clear_upstream_cache()  # a fresh process, warm started from the snapshot
+    upstream.set_page('/lifecycle', truncated_page)
+    with pytest.raises(ImplausibleResultError, match='last good result had 40'):
+        fetch_all_sources(served=served)
+
+
+def test_truncated_source_falls_back_to_its_served_records(source, upstream, page, truncated_page):
+    sources = mirrored(upstream, page, source)
+    served = fetch_all_sources(sources)['data']
+    clear_upstream_cache()
+    upstream.set_page('/lifecycle', truncated_page)
+
+    result = fetch_all_sources(sources, served=served)
+    assert result['sources']['stub']['status'] == 'error'
+    assert result['sources']['stub']['records'] == 40
+    assert listed_by(result['data']) == listed_by(served)
+
+
+def test_each_source_is_checked_against_its_own_records(source, upstream):
+    served = fetch_all_sources()['data']
+    # Many more models, listed only by a source that is not refreshed here
+    served += [{'foundation_model_name': f'other-{number}', 'withdrawal_date': '–', 'sources': ['other']}
+               for number in range(100)]
+    clear_upstream_cache()
+
+    result = fetch_all_sources(served=served)
+    assert result['sources']['stub']['status'] == 'changed'
+    assert len(result['data']) == 40
+
+
+def test_unattributed_snapshot_is_checked_as_a_whole(source, upstream, truncated_page):
+    served = [{key: value for key, value in record.items() if key != 'sources'}
+              for record in fetch_all_sources()['data']]
+    clear_upstream_cache()
+    upstream.set_page('/lifecycle', truncated_page)
+    with pytest.raises(ImplausibleResultError):
+        fetch_all_sources(served=served)
+
+
+def test_failed_source_falls_back_to_its_last_records(source, upstream, page):
+    sources = mirrored(upstream, page, source)
+    served = fetch_all_sources(sources)['data']
+    del upstream.pages['/mirror']  # answered with a 404
+
+    result = fetch_all_sources(sources, served=served)
+    assert result['sources']['mirror']['status'] == 'error'
+    assert result['sources']['mirror']['records'] == 40
+    assert listed_by(result['data']) == listed_by(served)
+
+
+def test_every_source_failing_raises(source, upstream):
+    upstream.pages.clear()
+    with pytest.raises(Exception, match='404'):
+        fetch_all_sources()
+
+
+def test_server_keeps_serving_through_a_truncated_page(server, upstream, truncated_page):
+    assert server.scrape_and_publish()[0]
+    version = server.snapshot_version
+    clear_upstream_cache()  # as after a warm start from the snapshot file
+    upstream.set_page('/lifecycle', truncated_page)
+
+    ok, error, _ = server.scrape_and_publish()
+    assert not ok and 'last good result had 40' in error
+    assert len(server.latest_data) == 40 and server.snapshot_version == version